@@ -0,0 +1,95 @@
+"""Compact per-hand action log.
+
+Each entry is ``(seat, street, action, amount)`` stored column-wise in typed
+arrays, so a hand's log costs seven bytes per action and can be scanned
+without building objects. Streets and action types use the same indices as
+the hand-history format.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import Iterator, NamedTuple, Optional
+
+from .actions import ActionType
+from .hand_history import (
+    ACTION_TYPE_INDEX,
+    ACTION_TYPES,
+    STREET_INDEX,
+    STREETS,
+    HandRecord,
+)
+
+FOLD = ACTION_TYPE_INDEX[ActionType.FOLD]
+CHECK = ACTION_TYPE_INDEX[ActionType.CHECK]
+CALL = ACTION_TYPE_INDEX[ActionType.CALL]
+RAISE = ACTION_TYPE_INDEX[ActionType.RAISE]
+PREFLOP = STREET_INDEX["preflop"]
+
+
+class ActionEntry(NamedTuple):
+    seat: int
+    street: str
+    action: ActionType
+    amount: int
+
+
+class ActionLog:
+    def __init__(self) -> None:
+        self.seats = array("B")
+        self.streets = array("B")
+        self.actions = array("B")
+        self.amounts = array("I")
+
+    @classmethod
+    def from_record(cls, record: HandRecord) -> "ActionLog":
+        log = cls()
+        seat_of = {player: seat for seat, player in enumerate(record.players)}
+        for action in record.actions:
+            log.append(
+                seat_of[action.player], action.street, action.action, action.amount
+            )
+        return log
+
+    def append(self, seat: int, street: str, action: ActionType, amount: int) -> None:
+        self.seats.append(seat)
+        self.streets.append(STREET_INDEX[street])
+        self.actions.append(ACTION_TYPE_INDEX[action])
+        self.amounts.append(amount)
+
+    def clear(self) -> None:
+        del self.seats[:]
+        del self.streets[:]
+        del self.actions[:]
+        del self.amounts[:]
+
+    def __len__(self) -> int:
+        return len(self.seats)
+
+    def __getitem__(self, position: int) -> ActionEntry:
+        return ActionEntry(
+            self.seats[position],
+            STREETS[self.streets[position]],
+            ACTION_TYPES[self.actions[position]],
+            self.amounts[position],
+        )
+
+    def __iter__(self) -> Iterator[ActionEntry]:
+        for position in range(len(self.seats)):
+            yield self[position]
+
+    def count(
+        self,
+        seat: int,
+        action: ActionType,
+        street: Optional[str] = None,
+    ) -> int:
+        action_index = ACTION_TYPE_INDEX[action]
+        street_index = None if street is None else STREET_INDEX[street]
+        return sum(
+            1
+            for position in range(len(self.seats))
+            if self.seats[position] == seat
+            and self.actions[position] == action_index
+            and (street_index is None or self.streets[position] == street_index)
+        )
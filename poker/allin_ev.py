@@ -0,0 +1,89 @@
+"""All-in equity over the remaining runouts.
+
+When every player left in a hand is all-in before the river, the chips each
+one *expects* to win (averaged over the cards still to come) is a much less
+noisy measure of their result than the single runout that gets dealt.
+Small runout spaces (turn and flop all-ins) are enumerated exactly; larger
+ones (preflop) are sampled.
+"""
+
+from __future__ import annotations
+
+import random
+from itertools import combinations
+from math import comb
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+
+from .cards import CARD_INDEX, Card
+from .hand_evaluator import evaluate_holding
+from .hand_history import AllInEV, PotEquity
+
+DEFAULT_EXACT_LIMIT = 5000
+DEFAULT_SAMPLES = 5000
+
+
+def compute_allin_ev(
+    players: Sequence[str],
+    hands: Mapping[str, Sequence[Card]],
+    board: Sequence[Card],
+    remaining: Sequence[Card],
+    pots: Sequence[Mapping[str, object]],
+    street: str,
+    samples: int = DEFAULT_SAMPLES,
+    exact_limit: int = DEFAULT_EXACT_LIMIT,
+    rng: Optional[random.Random] = None,
+) -> AllInEV:
+    missing = 5 - len(board)
+    board_cards = [CARD_INDEX[card] for card in board]
+    deck = [CARD_INDEX[card] for card in remaining]
+    holes = {player: [CARD_INDEX[card] for card in hands[player]] for player in players}
+    # Keep seat order inside each pot so results are reproducible.
+    pot_players = [
+        [player for player in players if player in pot["eligible"]] for pot in pots
+    ]
+    contested = [
+        player
+        for player in players
+        if any(player in eligible for eligible in pot_players)
+    ]
+    wins: List[Dict[str, float]] = [
+        {player: 0.0 for player in eligible} for eligible in pot_players
+    ]
+
+    total = comb(len(deck), missing)
+    runouts: Iterable[Sequence[int]]
+    if total <= exact_limit:
+        runouts = combinations(deck, missing)
+        count = total
+        exact = True
+    else:
+        sampler = rng or random.Random()
+        runouts = (sampler.sample(deck, missing) for _ in range(samples))
+        count = samples
+        exact = False
+
+    for runout in runouts:
+        full_board = board_cards + list(runout)
+        values = {
+            player: evaluate_holding(holes[player], full_board) for player in contested
+        }
+        for eligible, pot_wins in zip(pot_players, wins):
+            best = max(values[player] for player in eligible)
+            winners = [player for player in eligible if values[player] == best]
+            share = 1.0 / len(winners)
+            for player in winners:
+                pot_wins[player] += share
+
+    return AllInEV(
+        street=street,
+        runouts=count,
+        exact=exact,
+        pots=[
+            PotEquity(
+                amount=pot["amount"],
+                eligible=eligible,
+                equity={player: won / count for player, won in pot_wins.items()},
+            )
+            for pot, eligible, pot_wins in zip(pots, pot_players, wins)
+        ],
+    )
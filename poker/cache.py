@@ -0,0 +1,242 @@
+"""Precomputed artifact cache: catalog, prebuild and startup check.
+
+Every precomputed table lives in the shared table cache (see
+``shared_tables``), under a per-user directory (``$POKER_CACHE_DIR``, else
+``$XDG_CACHE_HOME/poker-game`` or ``~/.cache/poker-game``). Tables are
+versioned by file name and built or memory-mapped lazily the first time they
+are used, so nothing here is imported or loaded by ``import poker.engine``.
+
+The catalog only names the module that registers each artifact; modules are
+imported when an artifact is actually listed or built. From the command
+line::
+
+    python -m poker.cache list
+    python -m poker.cache build [ARTIFACT ...] [--force]
+    python -m poker.cache clear
+    python -m poker.cache startup [--runs N]
+"""
+
+from __future__ import annotations
+
+import importlib
+import os
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from .shared_tables import TableRegistry, get_registry
+
+
+@dataclass(frozen=True)
+class Artifact:
+    name: str
+    module: str
+    description: str
+
+
+ARTIFACTS: Dict[str, Artifact] = {
+    artifact.name: artifact
+    for artifact in (
+        Artifact(
+            "preflop-equity",
+            "poker.pushfold",
+            "169x169 preflop class equities for the push/fold solver",
+        ),
+        Artifact(
+            "hand-buckets",
+            "poker.hand_strength",
+            "EHS² buckets for preflop classes and suit-isomorphic flops",
+        ),
+        Artifact(
+            "hand-states",
+            "poker.state_table",
+            "7-card state-machine evaluator (~120 MB)",
+        ),
+    )
+}
+
+# Modules that must not be loaded by a plain ``import poker.engine``.
+STARTUP_FORBIDDEN = (
+    "numpy",
+    "mmap",
+    "concurrent.futures",
+    "poker.shared_tables",
+    "poker.pushfold",
+    "poker.hand_strength",
+    "poker.state_table",
+    "poker.equity_service",
+    "poker.events",
+)
+
+
+def register_artifact(name: str, registry: TableRegistry) -> List[str]:
+    try:
+        artifact = ARTIFACTS[name]
+    except KeyError:
+        raise ValueError(f"Unknown artifact: {name}") from None
+    return importlib.import_module(artifact.module).register_tables(registry)
+
+
+def artifact_status(
+    names: Optional[Iterable[str]] = None, cache_dir: Optional[str] = None
+) -> List[Dict[str, object]]:
+    registry = get_registry(cache_dir)
+    status = []
+    for name in names or ARTIFACTS:
+        for table in register_artifact(name, registry):
+            path = registry.path_for(table)
+            built = registry.is_built(table)
+            status.append(
+                {
+                    "artifact": name,
+                    "table": table,
+                    "path": path,
+                    "built": built,
+                    "bytes": os.path.getsize(path) if built else 0,
+                }
+            )
+    return status
+
+
+def prebuild(
+    names: Optional[Iterable[str]] = None,
+    cache_dir: Optional[str] = None,
+    force: bool = False,
+) -> List[str]:
+    registry = get_registry(cache_dir)
+    paths = []
+    for name in names or ARTIFACTS:
+        for table in register_artifact(name, registry):
+            paths.append(registry.build(table, force=force))
+    return paths
+
+
+def clear_cache(cache_dir: Optional[str] = None) -> int:
+    registry = get_registry(cache_dir)
+    registry.close()
+    removed = 0
+    if not os.path.isdir(registry.directory):
+        return removed
+    for entry in os.listdir(registry.directory):
+        if entry.endswith(".tbl") or entry.endswith(".tmp"):
+            os.remove(os.path.join(registry.directory, entry))
+            removed += 1
+    return removed
+
+
+def measure_startup(
+    module: str = "poker.engine", runs: int = 10
+) -> Dict[str, object]:
+    """Import time of ``module`` in fresh interpreters, and what it loaded."""
+    # "forbidden" lists the ``STARTUP_FORBIDDEN`` modules the import pulled in.
+    script = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = time.perf_counter() - start\n"
+        "print(elapsed)\n"
+        "print(' '.join(sorted(sys.modules)))\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, (root, env.get("PYTHONPATH")))
+    )
+    timings = []
+    loaded: List[str] = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", script],
+            check=True,
+            capture_output=True,
+            text=True,
+            env=env,
+        ).stdout.split("\n")
+        timings.append(float(output[0]))
+        loaded = output[1].split()
+    timings.sort()
+    return {
+        "module": module,
+        "runs": runs,
+        "median_ms": timings[len(timings) // 2] * 1000,
+        "min_ms": timings[0] * 1000,
+        "forbidden": [name for name in STARTUP_FORBIDDEN if name in loaded],
+    }
+
+
+def measure_attach(
+    names: Optional[Iterable[str]] = None, cache_dir: Optional[str] = None
+) -> Dict[str, float]:
+    # First-use cost of tables that are already built: a header check and
+    # an mmap, independent of the table size.
+    registry = get_registry(cache_dir)
+    timings = {}
+    for name in names or ARTIFACTS:
+        for table in register_artifact(name, registry):
+            if not registry.is_built(table):
+                continue
+            start = time.perf_counter()
+            registry.get(table)
+            timings[table] = (time.perf_counter() - start) * 1000
+    return timings
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="python -m poker.cache", description=__doc__.split("\n")[0]
+    )
+    parser.add_argument("--cache-dir", help="cache directory (default: per user)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="show known artifacts and whether they are built")
+    build = commands.add_parser("build", help="build artifacts ahead of time")
+    build.add_argument(
+        "artifacts",
+        nargs="*",
+        metavar="ARTIFACT",
+        help="any of: " + ", ".join(ARTIFACTS) + " (default: all)",
+    )
+    build.add_argument("--force", action="store_true", help="rebuild existing tables")
+    commands.add_parser("clear", help="delete every cached table")
+    startup = commands.add_parser("startup", help="benchmark import and attach time")
+    startup.add_argument("--runs", type=int, default=10)
+    startup.add_argument("--module", default="poker.engine")
+    args = parser.parse_args(argv)
+    unknown = [name for name in getattr(args, "artifacts", ()) if name not in ARTIFACTS]
+    if unknown:
+        parser.error("unknown artifact(s): " + ", ".join(unknown))
+
+    if args.command == "list":
+        status = artifact_status(cache_dir=args.cache_dir)
+        for artifact in ARTIFACTS.values():
+            print(f"{artifact.name}: {artifact.description}")
+            for entry in status:
+                if entry["artifact"] != artifact.name:
+                    continue
+                size = entry["bytes"] / 1e6
+                state = f"{size:.1f} MB" if entry["built"] else "not built"
+                print(f"  {entry['table']:<20} {state:>10}  {entry['path']}")
+    elif args.command == "build":
+        for path in prebuild(args.artifacts or None, args.cache_dir, args.force):
+            print(path)
+    elif args.command == "clear":
+        print(f"Removed {clear_cache(args.cache_dir)} file(s).")
+    else:
+        report = measure_startup(args.module, args.runs)
+        print(
+            f"import {report['module']}: median {report['median_ms']:.1f} ms, "
+            f"min {report['min_ms']:.1f} ms over {report['runs']} runs"
+        )
+        for table, elapsed in measure_attach(cache_dir=args.cache_dir).items():
+            print(f"attach {table}: {elapsed:.2f} ms")
+        if report["forbidden"]:
+            print("Loaded at startup: " + ", ".join(report["forbidden"]))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -22,3 +22,17 @@ class Card:
 
     def __repr__(self) -> str:
         return str(self)
+
+
+# Cards are also addressed by a compact integer index (rank * 4 + suit) so the
+# fast evaluation paths can work on plain ints instead of dataclass instances.
+FULL_DECK = tuple(Card(rank=rank, suit=suit) for rank in RANKS for suit in SUITS)
+CARD_INDEX = {card: index for index, card in enumerate(FULL_DECK)}
+
+
+def card_to_index(card: Card) -> int:
+    return CARD_INDEX[card]
+
+
+def index_to_card(index: int) -> Card:
+    return FULL_DECK[index]
@@ -0,0 +1,480 @@
+"""Binary checkpoints of a running ``PokerEngine``.
+
+Layout (little-endian)::
+
+    magic "PKCP" | version u16 | flags u8
+    name table: count u16, then (length u8 | UTF-8 name) per player id
+    engine section | [game state] | [deck] | [in-progress hand record] | [rng]
+
+Player ids are stored once and referenced by u16 index (0xFFFF for none).
+Lists and dicts keep their order. Sets are written in seat order: their own
+iteration order depends on per-process string hashing, and the engine never
+relies on it.
+The RNG section is the state of the module-level ``random`` generator, which
+``Deck.shuffle`` and the Monte Carlo helpers draw from.
+
+The engine section also records the all-in EV settings and which showdown
+evaluator is in use: the default one, a state table (reloaded from the table
+cache on restore unless the engine already holds one) or a custom callable,
+which cannot be serialized; restoring then keeps the engine's own evaluator.
+"""
+
+from __future__ import annotations
+
+import random
+import struct
+import sys
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+from .actions import Action
+from .cards import CARD_INDEX, FULL_DECK, Card
+from .deck import Deck
+from .game_state import GameState
+from .hand_evaluator import evaluate_holding
+from .hand_history import ACTION_TYPE_INDEX, ACTION_TYPES, decode_hand, encode_hand
+from .variants import VARIANTS
+
+if TYPE_CHECKING:
+    from .engine import PokerEngine
+
+CHECKPOINT_MAGIC = b"PKCP"
+CHECKPOINT_VERSION = 4
+
+FLAG_GAME_STATE = 1
+FLAG_DECK = 2
+FLAG_HAND_RECORD = 4
+FLAG_RNG = 8
+
+EVALUATOR_DEFAULT = 0
+EVALUATOR_STATE_TABLE = 1
+EVALUATOR_CUSTOM = 2
+
+ENGINE_STREETS = ("preflop", "flop", "turn", "river", "showdown")
+_STREET_INDEX = {street: index for index, street in enumerate(ENGINE_STREETS)}
+NO_NAME = 0xFFFF
+
+_HEADER = struct.Struct("<4sHB")
+_U8 = struct.Struct("<B")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_ENGINE = struct.Struct("<IIIIIBHBBIIB")
+_STATE = struct.Struct("<IBHIIIIIIHIHB")
+_ACTION = struct.Struct("<BBI")
+_LOG_ENTRY = struct.Struct("<BBBI")
+_MT_WORDS = 625
+_RNG = struct.Struct(f"<I{_MT_WORDS}IBd")
+
+
+class _Writer:
+    def __init__(self) -> None:
+        self.body = bytearray()
+        self.names: Dict[str, int] = {}
+
+    def ref(self, player: Optional[str]) -> int:
+        if player is None:
+            return NO_NAME
+        index = self.names.get(player)
+        if index is None:
+            index = len(self.names)
+            if index >= NO_NAME:
+                raise ValueError("Too many player ids for a checkpoint.")
+            self.names[player] = index
+        return index
+
+    def group(self, players: Iterable[str], seats: List[str]) -> None:
+        seat_of = {player: seat for seat, player in enumerate(seats)}
+        self.players(
+            sorted(players, key=lambda player: (seat_of.get(player, NO_NAME), player))
+        )
+
+    def u8(self, value: int) -> None:
+        self.body += _U8.pack(value)
+
+    def u32(self, value: int) -> None:
+        self.body += _U32.pack(value)
+
+    def text(self, value: Optional[str]) -> None:
+        if value is None:
+            self.u8(255)
+            return
+        data = value.encode("utf-8")
+        if len(data) >= 255:
+            raise ValueError("Checkpoint strings are limited to 254 bytes.")
+        self.u8(len(data))
+        self.body += data
+
+    def players(self, players: Iterable[str]) -> None:
+        refs = [self.ref(player) for player in players]
+        self.body += _U16.pack(len(refs))
+        self.body += struct.pack(f"<{len(refs)}H", *refs)
+
+    def chips(self, amounts: Mapping[str, int]) -> None:
+        self.body += _U16.pack(len(amounts))
+        for player, amount in amounts.items():
+            self.body += _U16.pack(self.ref(player))
+            self.u32(amount)
+
+    def cards(self, cards: Iterable[Card]) -> None:
+        data = bytes(CARD_INDEX[card] for card in cards)
+        self.u8(len(data))
+        self.body += data
+
+    def blob(self, data: bytes) -> None:
+        self.u32(len(data))
+        self.body += data
+
+
+class _Reader:
+    def __init__(self, data: bytes, offset: int) -> None:
+        self.view = memoryview(data)
+        self.offset = offset
+        self.names: List[str] = []
+
+    def unpack(self, layout: struct.Struct) -> Tuple:
+        values = layout.unpack_from(self.view, self.offset)
+        self.offset += layout.size
+        return values
+
+    def u8(self) -> int:
+        return self.unpack(_U8)[0]
+
+    def u32(self) -> int:
+        return self.unpack(_U32)[0]
+
+    def name(self, ref: int) -> Optional[str]:
+        return None if ref == NO_NAME else self.names[ref]
+
+    def raw(self, length: int) -> bytes:
+        data = bytes(self.view[self.offset : self.offset + length])
+        if len(data) != length:
+            raise ValueError("Truncated checkpoint.")
+        self.offset += length
+        return data
+
+    def text(self) -> Optional[str]:
+        length = self.u8()
+        if length == 255:
+            return None
+        return self.raw(length).decode("utf-8")
+
+    def players(self) -> List[str]:
+        (count,) = self.unpack(_U16)
+        refs = struct.unpack_from(f"<{count}H", self.view, self.offset)
+        self.offset += 2 * count
+        return [self.names[ref] for ref in refs]
+
+    def chips(self) -> Dict[str, int]:
+        (count,) = self.unpack(_U16)
+        amounts: Dict[str, int] = {}
+        for _ in range(count):
+            (ref,) = self.unpack(_U16)
+            amounts[self.names[ref]] = self.u32()
+        return amounts
+
+    def cards(self) -> List[Card]:
+        return [FULL_DECK[index] for index in self.raw(self.u8())]
+
+    def blob(self) -> bytes:
+        return self.raw(self.u32())
+
+
+def encode_checkpoint(engine: "PokerEngine", include_rng: bool = True) -> bytes:
+    writer = _Writer()
+    flags = 0
+
+    writer.body += _ENGINE.pack(
+        engine.starting_stack,
+        engine.small_blind,
+        engine.big_blind,
+        engine.dealer_index,
+        engine.current_player_index,
+        int(engine.verbose),
+        writer.ref(engine.showdown_winner),
+        VARIANTS.index(engine.variant),
+        int(engine.allin_ev),
+        engine.allin_ev_samples,
+        engine.allin_ev_exact_limit,
+        _evaluator_kind(engine.evaluator),
+    )
+    writer.text(engine.showdown_hand_rank)
+    writer.players(engine.players)
+    writer.players(engine.eliminated)
+    writer.players(engine.last_eliminated)
+    writer.chips(engine._initial_stacks)
+    writer.chips(engine._hand_start_stacks)
+
+    state = engine.game_state
+    if state is not None:
+        flags |= FLAG_GAME_STATE
+        _write_state(writer, state, engine.players)
+    if engine.deck is not None:
+        flags |= FLAG_DECK
+        writer.cards(engine.deck._cards)
+    if engine.hand_record is not None:
+        flags |= FLAG_HAND_RECORD
+        writer.blob(encode_hand(engine.hand_record))
+    if include_rng:
+        flags |= FLAG_RNG
+        version, words, gauss_next = random.getstate()
+        writer.body += _RNG.pack(
+            version,
+            *words,
+            gauss_next is not None,
+            gauss_next if gauss_next is not None else 0.0,
+        )
+
+    names = bytearray(_U16.pack(len(writer.names)))
+    for player in writer.names:
+        data = player.encode("utf-8")
+        if len(data) > 255:
+            raise ValueError("Player ids are limited to 255 bytes.")
+        names += _U8.pack(len(data))
+        names += data
+    header = _HEADER.pack(CHECKPOINT_MAGIC, CHECKPOINT_VERSION, flags)
+    return b"".join((header, bytes(names), bytes(writer.body)))
+
+
+def _evaluator_kind(evaluator: Callable) -> int:
+    if evaluator is evaluate_holding:
+        return EVALUATOR_DEFAULT
+    # A state table is only in use if its module was imported already.
+    state_table = sys.modules.get("poker.state_table")
+    owner = getattr(evaluator, "__self__", None)
+    if state_table is not None and isinstance(owner, state_table.StateTable):
+        return EVALUATOR_STATE_TABLE
+    return EVALUATOR_CUSTOM
+
+
+def _restored_evaluator(engine: "PokerEngine", kind: int) -> Callable:
+    if kind == EVALUATOR_DEFAULT:
+        return evaluate_holding
+    if kind == EVALUATOR_STATE_TABLE:
+        if _evaluator_kind(engine.evaluator) == EVALUATOR_STATE_TABLE:
+            return engine.evaluator
+        from .state_table import load_state_table
+
+        return load_state_table().evaluate_holding
+    if kind == EVALUATOR_CUSTOM:
+        return engine.evaluator
+    raise ValueError(f"Unknown evaluator in checkpoint: {kind}")
+
+
+def _write_state(writer: _Writer, state: GameState, seats: List[str]) -> None:
+    writer.body += _STATE.pack(
+        state.pot,
+        _STREET_INDEX[state.street],
+        writer.ref(state.current_player),
+        state.dealer_index,
+        state.sb_index,
+        state.bb_index,
+        state.small_blind,
+        state.big_blind,
+        state.current_bet,
+        writer.ref(state.last_raiser),
+        state.hand_number,
+        writer.ref(state.last_winner),
+        VARIANTS.index(state.variant),
+    )
+    # ``players`` is normally the engine's own seat list; keep that aliasing.
+    writer.u8(1 if state.players is seats else 0)
+    writer.players(state.players)
+    writer.chips(state.stacks)
+    writer.cards(state.board)
+    writer.body += _U16.pack(len(state.hands))
+    for player, cards in state.hands.items():
+        writer.body += _U16.pack(writer.ref(player))
+        writer.cards(cards)
+    writer.body += _U16.pack(len(state.action_history))
+    for action in state.action_history:
+        writer.body += _ACTION.pack(
+            ACTION_TYPE_INDEX[action.type],
+            action.amount is not None,
+            action.amount or 0,
+        )
+    log = state.action_log
+    writer.body += _U16.pack(len(log))
+    for entry in zip(log.seats, log.streets, log.actions, log.amounts):
+        writer.body += _LOG_ENTRY.pack(*entry)
+    writer.group(state.players_in_hand, state.players)
+    writer.group(state.players_acted, state.players)
+    writer.group(state.players_to_act, state.players)
+    writer.group(state.all_in_players, state.players)
+    writer.chips(state.bets)
+    writer.chips(state.total_contrib)
+    writer.body += _U16.pack(len(state.side_pots))
+    for pot in state.side_pots:
+        writer.u32(pot["amount"])
+        writer.group(pot["eligible"], state.players)
+
+
+def restore_checkpoint(engine: "PokerEngine", data: bytes) -> None:
+    if len(data) < _HEADER.size:
+        raise ValueError("Truncated checkpoint.")
+    magic, version, flags = _HEADER.unpack_from(data, 0)
+    if magic != CHECKPOINT_MAGIC:
+        raise ValueError("Not an engine checkpoint.")
+    if version != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version: {version}")
+    reader = _Reader(data, _HEADER.size)
+    try:
+        (name_count,) = reader.unpack(_U16)
+        reader.names = [
+            reader.raw(reader.u8()).decode("utf-8") for _ in range(name_count)
+        ]
+        _restore(engine, reader, flags)
+    except struct.error as exc:
+        raise ValueError("Truncated checkpoint.") from exc
+
+
+def _restore(engine: "PokerEngine", reader: _Reader, flags: int) -> None:
+    (
+        starting_stack,
+        small_blind,
+        big_blind,
+        dealer_index,
+        current_player_index,
+        verbose,
+        showdown_winner,
+        variant,
+        allin_ev,
+        allin_ev_samples,
+        allin_ev_exact_limit,
+        evaluator_kind,
+    ) = reader.unpack(_ENGINE)
+    showdown_hand_rank = reader.text()
+    players = reader.players()
+    eliminated = reader.players()
+    last_eliminated = reader.players()
+    initial_stacks = reader.chips()
+    hand_start_stacks = reader.chips()
+    state = _read_state(reader, players) if flags & FLAG_GAME_STATE else None
+    deck = Deck.from_cards(reader.cards()) if flags & FLAG_DECK else None
+    record = None
+    if flags & FLAG_HAND_RECORD:
+        record = decode_hand(reader.blob())
+        # In-progress records carry no results yet.
+        record.contributions = []
+        record.payouts = []
+    rng_state = None
+    if flags & FLAG_RNG:
+        values = reader.unpack(_RNG)
+        gauss_next = values[-1] if values[-2] else None
+        rng_state = (values[0], tuple(values[1 : 1 + _MT_WORDS]), gauss_next)
+    evaluator = _restored_evaluator(engine, evaluator_kind)
+
+    # Everything decoded; only now touch the engine so a bad checkpoint
+    # leaves it unchanged.
+    engine.starting_stack = starting_stack
+    engine.small_blind = small_blind
+    engine.big_blind = big_blind
+    engine.dealer_index = dealer_index
+    engine.current_player_index = current_player_index
+    engine.verbose = bool(verbose)
+    engine.variant = VARIANTS[variant]
+    engine.allin_ev = bool(allin_ev)
+    engine.allin_ev_samples = allin_ev_samples
+    engine.allin_ev_exact_limit = allin_ev_exact_limit
+    engine.evaluator = evaluator
+    engine.showdown_winner = reader.name(showdown_winner)
+    engine.showdown_hand_rank = showdown_hand_rank
+    engine.players = players
+    engine.eliminated = eliminated
+    engine.last_eliminated = last_eliminated
+    engine._initial_stacks = initial_stacks
+    engine._hand_start_stacks = hand_start_stacks
+    engine.game_state = state
+    engine.deck = deck
+    engine.hand_record = record
+    if rng_state is not None:
+        random.setstate(rng_state)
+
+
+def _read_state(reader: _Reader, seats: List[str]) -> GameState:
+    (
+        pot,
+        street,
+        current_player,
+        dealer_index,
+        sb_index,
+        bb_index,
+        small_blind,
+        big_blind,
+        current_bet,
+        last_raiser,
+        hand_number,
+        last_winner,
+        variant,
+    ) = reader.unpack(_STATE)
+    aliased = reader.u8()
+    players = reader.players()
+    if aliased:
+        players = seats
+    stacks = reader.chips()
+    board = reader.cards()
+    hands: Dict[str, List[Card]] = {}
+    (hand_count,) = reader.unpack(_U16)
+    for _ in range(hand_count):
+        (ref,) = reader.unpack(_U16)
+        hands[reader.names[ref]] = reader.cards()
+    (action_count,) = reader.unpack(_U16)
+    action_history: List[Action] = []
+    for _ in range(action_count):
+        action_type, has_amount, amount = reader.unpack(_ACTION)
+        action_history.append(
+            Action(ACTION_TYPES[action_type], amount if has_amount else None)
+        )
+    (log_count,) = reader.unpack(_U16)
+    log_entries = [reader.unpack(_LOG_ENTRY) for _ in range(log_count)]
+    players_in_hand = set(reader.players())
+    players_acted = set(reader.players())
+    players_to_act = set(reader.players())
+    all_in_players = set(reader.players())
+    bets = reader.chips()
+    total_contrib = reader.chips()
+    side_pots: List[Dict[str, object]] = []
+    (pot_count,) = reader.unpack(_U16)
+    for _ in range(pot_count):
+        amount = reader.u32()
+        side_pots.append({"amount": amount, "eligible": set(reader.players())})
+
+    state = GameState(players=players, stacks=stacks)
+    # Assigned directly: the constructor replaces empty collections with
+    # defaults, which would not round-trip.
+    state.pot = pot
+    state.board = board
+    state.hands = hands
+    state.current_player = reader.name(current_player)
+    state.street = ENGINE_STREETS[street]
+    state.action_history = action_history
+    state.players_in_hand = players_in_hand
+    state.players_acted = players_acted
+    state.dealer_index = dealer_index
+    state.sb_index = sb_index
+    state.bb_index = bb_index
+    state.small_blind = small_blind
+    state.big_blind = big_blind
+    state.current_bet = current_bet
+    state.bets = bets
+    state.players_to_act = players_to_act
+    state.last_raiser = reader.name(last_raiser)
+    state.hand_number = hand_number
+    state.last_winner = reader.name(last_winner)
+    state.total_contrib = total_contrib
+    state.all_in_players = all_in_players
+    state.side_pots = side_pots
+    state.variant = VARIANTS[variant]
+    for seat, street, action, amount in log_entries:
+        state.action_log.seats.append(seat)
+        state.action_log.streets.append(street)
+        state.action_log.actions.append(action)
+        state.action_log.amounts.append(amount)
+    return state
@@ -1,16 +1,31 @@
 """Deck implementation for the poker game."""
 
 import random
-from typing import List, Union
+from typing import List, Sequence, Union
 
-from .cards import RANKS, SUITS, Card
+from .cards import CARD_INDEX, FULL_DECK, RANKS, SUITS, Card
+
+# Unshuffled order (suit by suit), built once from the shared card instances.
+_NEW_DECK_ORDER = tuple(
+    FULL_DECK[CARD_INDEX[Card(rank=rank, suit=suit)]]
+    for suit in SUITS
+    for rank in RANKS
+)
 
 
 class Deck:
     def __init__(self) -> None:
-        self._cards: List[Card] = [
-            Card(rank=rank, suit=suit) for suit in SUITS for rank in RANKS
-        ]
+        self._cards: List[Card] = list(_NEW_DECK_ORDER)
+
+    @classmethod
+    def from_cards(cls, cards: Sequence[Card]) -> "Deck":
+        # The last card in ``cards`` is the top of the deck (dealt first).
+        deck = cls()
+        deck._cards = list(cards)
+        return deck
+
+    def remaining(self) -> List[Card]:
+        return list(self._cards)
 
     def shuffle(self) -> None:
         random.shuffle(self._cards)
@@ -1,11 +1,21 @@
 """Poker engine interface."""
 
-from typing import List, Optional
+import random
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence
 
 from .actions import Action, ActionType
+from .allin_ev import DEFAULT_EXACT_LIMIT, DEFAULT_SAMPLES, compute_allin_ev
+from .cards import CARD_INDEX
+from .checkpoint import encode_checkpoint, restore_checkpoint
 from .deck import Deck
 from .game_state import GameState
-from .hand_evaluator import HAND_RANK_NAMES, evaluate_hand
+from .hand_history import ActionRecord, AllInEV, HandRecord
+from .hand_evaluator import HAND_RANK_NAMES, evaluate_holding, hand_category
+from .showdown import ShowdownResult, resolve_pots
+from .variants import HOLDEM, HOLE_CARD_COUNTS, validate_variant
+
+if TYPE_CHECKING:
+    from .events import EventFeed
 
 
 class PokerEngine:
@@ -15,9 +25,24 @@ class PokerEngine:
         starting_stack: int,
         small_blind: int = 5,
         big_blind: int = 10,
+        verbose: bool = True,
+        variant: str = HOLDEM,
+        allin_ev: bool = False,
+        allin_ev_samples: int = DEFAULT_SAMPLES,
+        allin_ev_exact_limit: int = DEFAULT_EXACT_LIMIT,
+        evaluator: Optional[Callable[[Sequence[int], Sequence[int]], int]] = None,
     ) -> None:
         self.players = players
+        self.variant = validate_variant(variant)
+        # When set, hands that go all-in before the river also record each
+        # player's expected result over the remaining runouts.
+        self.allin_ev = allin_ev
+        self.allin_ev_samples = allin_ev_samples
+        self.allin_ev_exact_limit = allin_ev_exact_limit
+        # Showdown hand values; e.g. ``load_state_table().evaluate_holding``.
+        self.evaluator = evaluator or evaluate_holding
         self.starting_stack = starting_stack
+        self.verbose = verbose
         self.game_state: Optional[GameState] = None
         self.deck: Optional[Deck] = None
         self.current_player_index = 0
@@ -26,14 +51,93 @@ class PokerEngine:
         self.small_blind = small_blind
         self.big_blind = big_blind
         self.dealer_index = 0
+        self.eliminated: List[str] = []
+        self.last_eliminated: List[str] = []
+        self._initial_stacks: Dict[str, int] = {}
+        self._hand_start_stacks: Dict[str, int] = {}
+        self.hand_record: Optional[HandRecord] = None
+        self.last_hand_record: Optional[HandRecord] = None
+        self.last_showdown: Optional[ShowdownResult] = None
+        self.hand_listeners: List[Callable[[HandRecord], None]] = []
+        self._events: Optional["EventFeed"] = None
+
+    @property
+    def events(self) -> "EventFeed":
+        # Created (and ``poker.events`` imported) on first use.
+        if self._events is None:
+            from .events import EventFeed
+
+            self._events = EventFeed()
+        return self._events
+
+    @events.setter
+    def events(self, feed: "EventFeed") -> None:
+        self._events = feed
+
+    def set_blinds(self, small_blind: int, big_blind: int) -> None:
+        if small_blind < 0 or big_blind < small_blind:
+            raise ValueError("Blinds must satisfy 0 <= small blind <= big blind.")
+        self.small_blind = small_blind
+        self.big_blind = big_blind
 
-    def start_hand(self) -> None:
-        self.deck = Deck()
-        self.deck.shuffle()
-
-        hands = {player: self.deck.deal(2) for player in self.players}
+    def add_player(self, player_id: str, stack: int) -> None:
+        self._require_between_hands()
+        if player_id in self.players:
+            raise ValueError(f"Player {player_id} is already seated.")
+        if stack <= 0:
+            raise ValueError("A seated player needs a positive stack.")
+        self.players.append(player_id)
         if self.game_state is None:
-            stacks = {player: self.starting_stack for player in self.players}
+            self._initial_stacks[player_id] = stack
+        else:
+            self.game_state.stacks[player_id] = stack
+            self.game_state.players_in_hand.add(player_id)
+
+    def remove_player(self, player_id: str) -> int:
+        self._require_between_hands()
+        if player_id not in self.players:
+            raise ValueError(f"Player {player_id} is not seated.")
+        seat = self.players.index(player_id)
+        self.players.pop(seat)
+        if seat < self.dealer_index:
+            self.dealer_index -= 1
+        if self.players:
+            self.dealer_index %= len(self.players)
+        else:
+            self.dealer_index = 0
+        if self.game_state is None:
+            return self._initial_stacks.pop(player_id, self.starting_stack)
+        self.game_state.players_in_hand.discard(player_id)
+        self.game_state.total_contrib.pop(player_id, None)
+        return self.game_state.stacks.pop(player_id, 0)
+
+    def checkpoint(self, include_rng: bool = True) -> bytes:
+        return encode_checkpoint(self, include_rng=include_rng)
+
+    def restore(self, data: bytes) -> None:
+        # Hand listeners and event subscribers are left in place; they are not
+        # part of the checkpoint.
+        restore_checkpoint(self, data)
+
+    @classmethod
+    def from_checkpoint(cls, data: bytes) -> "PokerEngine":
+        engine = cls(players=[], starting_stack=0)
+        engine.restore(data)
+        return engine
+
+    def start_hand(self, deck: Optional[Deck] = None) -> None:
+        if deck is None:
+            deck = Deck()
+            deck.shuffle()
+        self.deck = deck
+
+        hole_count = HOLE_CARD_COUNTS[self.variant]
+        hands = {player: self.deck.deal(hole_count) for player in self.players}
+        if self.game_state is None:
+            stacks = {
+                player: self._initial_stacks.get(player, self.starting_stack)
+                for player in self.players
+            }
             hand_number = 0
         else:
             stacks = self.game_state.stacks
@@ -57,11 +161,40 @@ class PokerEngine:
             total_contrib={player: 0 for player in self.players},
             all_in_players=set(),
             side_pots=[],
+            variant=self.variant,
+        )
+        self._hand_start_stacks = dict(stacks)
+        self.last_eliminated = []
+        self.hand_record = HandRecord(
+            hand_number=hand_number,
+            players=list(self.players),
+            stacks=[stacks[player] for player in self.players],
+            dealer_index=self.dealer_index,
+            small_blind=self.small_blind,
+            big_blind=self.big_blind,
+            hole_cards=[list(hands[player]) for player in self.players],
         )
         self._post_blinds()
         self.showdown_winner = None
         self.showdown_hand_rank = None
-        if self.game_state and not self._can_act_players():
+        # An empty feed is falsy, so unobserved tables skip building payloads.
+        if self._events:
+            self._events.publish(
+                "hand_started",
+                hand_number,
+                {
+                    "players": list(self.players),
+                    "stacks": dict(self._hand_start_stacks),
+                    "dealer": self.players[self.dealer_index],
+                    "small_blind": self.small_blind,
+                    "big_blind": self.big_blind,
+                    "hole_cards": {
+                        player: [str(card) for card in cards]
+                        for player, cards in hands.items()
+                    },
+                },
+            )
+        if self.game_state and self._betting_closed():
             self._fast_forward_to_showdown()
 
     def get_legal_actions(self, player_id: str) -> List[ActionType]:
@@ -105,6 +238,7 @@ class PokerEngine:
 
         if action.type == ActionType.FOLD:
             self.game_state.record_action(action)
+            self._record_action(player_id, action, 0)
             self.game_state.players_in_hand.discard(player_id)
             self.game_state.players_to_act.discard(player_id)
             self.game_state.all_in_players.discard(player_id)
@@ -117,6 +251,7 @@ class PokerEngine:
             if call_amt != 0:
                 raise ValueError("Cannot check when facing a bet.")
             self.game_state.record_action(action)
+            self._record_action(player_id, action, 0)
             self.game_state.players_to_act.discard(player_id)
         elif action.type == ActionType.CALL:
             if call_amt <= 0:
@@ -127,6 +262,7 @@ class PokerEngine:
             self.game_state.add_to_pot(contribution)
             self.game_state.add_contribution(player_id, contribution)
             self.game_state.record_action(action)
+            self._record_action(player_id, action, contribution)
             self.game_state.players_to_act.discard(player_id)
             if self.game_state.stacks[player_id] == 0:
                 self.game_state.all_in_players.add(player_id)
@@ -142,6 +278,9 @@ class PokerEngine:
                 and self.game_state.stacks[player_id] >= needed
             ):
                 raise ValueError("Raise must meet the minimum raise size.")
+            limit = self.game_state.max_raise_to(player_id)
+            if limit is not None and raise_to > limit:
+                raise ValueError("Raise exceeds the pot limit.")
             contribution = min(self.game_state.stacks[player_id], needed)
             self.game_state.stacks[player_id] -= contribution
             self.game_state.bets[player_id] += contribution
@@ -158,6 +297,7 @@ class PokerEngine:
             else:
                 self.game_state.players_to_act.discard(player_id)
             self.game_state.record_action(action)
+            self._record_action(player_id, action, contribution)
             if self.game_state.stacks[player_id] == 0:
                 self.game_state.all_in_players.add(player_id)
         else:
@@ -166,7 +306,7 @@ class PokerEngine:
         if self.game_state.street == "showdown":
             return
 
-        if not self._can_act_players():
+        if self._betting_closed():
             self._fast_forward_to_showdown()
             return
 
@@ -196,8 +336,9 @@ class PokerEngine:
             self.resolve_showdown()
 
         if self.game_state.street != "showdown":
+            self._publish_street()
             self.game_state.reset_betting_round()
-            if not self.game_state.players_to_act:
+            if self._betting_closed():
                 self._fast_forward_to_showdown()
                 return
             first_to_act = self._first_to_act_postflop()
@@ -207,73 +348,82 @@ class PokerEngine:
                 self.current_player_index = first_to_act
                 self.game_state.current_player = self.players[self.current_player_index]
 
-    def resolve_showdown(self) -> None:
+    def resolve_showdown(self) -> ShowdownResult:
         if self.game_state is None:
             raise RuntimeError("Hand has not been started.")
-
-        results = {}
-        for player in self.game_state.players_in_hand:
-            player_cards = self.game_state.hands.get(player, [])
-            combined = player_cards + self.game_state.board
-            results[player] = evaluate_hand(combined)
-
-        self.game_state.side_pots = self.game_state.compute_side_pots(
-            self.game_state.players_in_hand
-        )
-        dead_money = sum(
+        state = self.game_state
+
+        in_hand = [player for player in self.players if player in state.players_in_hand]
+        if self.hand_record is not None:
+            self.hand_record.showdown = list(in_hand)
+
+        board = [CARD_INDEX[card] for card in state.board]
+        values = {
+            player: self.evaluator(
+                [CARD_INDEX[card] for card in state.hands.get(player, [])], board
+            )
+            for player in in_hand
+        }
+        result = resolve_pots(in_hand, values, state.total_contrib, self._dead_money())
+        self.last_showdown = result
+        state.side_pots = result.side_pots()
+        if self._events:
+            self._events.publish(
+                "showdown",
+                state.hand_number,
+                {
+                    "board": [str(card) for card in state.board],
+                    "hands": {
+                        player: [str(card) for card in state.hands.get(player, [])]
+                        for player in in_hand
+                    },
+                    **result.to_dict(),
+                },
+            )
+
+        if not result.pots:
+            winner = result.winner
+            winning_rank = HAND_RANK_NAMES[hand_category(values[winner])]
+            self.showdown_hand_rank = winning_rank
+            if self.verbose:
+                print(f"Winner: {winner} with {winning_rank}")
+            state.stacks[winner] += state.pot
+            state.pot = 0
+            self.end_hand(winner)
+            return result
+
+        for player, amount in result.payouts.items():
+            state.stacks[player] += amount
+        state.pot = 0
+        if self.verbose:
+            for pot in result.pots:
+                print(f"Pot {pot.amount} winner(s): {pot.winners} with {pot.hand_rank}")
+        self.end_hand(result.winner)
+        return result
+
+    def _dead_money(self) -> int:
+        return sum(
             amount
             for player, amount in self.game_state.total_contrib.items()
             if player not in self.game_state.players_in_hand
         )
+
+    def _showdown_pots(self) -> List[Dict[str, object]]:
+        if self.game_state is None:
+            return []
+        pots = self.game_state.compute_side_pots(self.game_state.players_in_hand)
+        dead_money = self._dead_money()
         if dead_money:
-            if self.game_state.side_pots:
-                self.game_state.side_pots[0]["amount"] += dead_money
+            if pots:
+                pots[0]["amount"] += dead_money
             else:
-                self.game_state.side_pots = [
+                pots = [
                     {
                         "amount": dead_money,
                         "eligible": set(self.game_state.players_in_hand),
                     }
                 ]
-
-        winners_summary = []
-        main_pot_winner = None
-        for pot in self.game_state.side_pots:
-            eligible = pot["eligible"]
-            eligible_results = {player: results[player] for player in eligible}
-            winner = max(eligible_results, key=eligible_results.get)
-            best_value = eligible_results[winner]
-            tied = [
-                player
-                for player, value in eligible_results.items()
-                if value == best_value
-            ]
-            share = pot["amount"] // len(tied)
-            remainder = pot["amount"] % len(tied)
-            for player in tied:
-                self.game_state.stacks[player] += share
-            ordered = [player for player in self.players if player in tied]
-            if remainder:
-                self.game_state.stacks[ordered[0]] += remainder
-            winning_rank = HAND_RANK_NAMES[best_value[0]]
-            winners_summary.append((tied, winning_rank, pot["amount"]))
-            main_pot_winner = ordered[0]
-
-        if not self.game_state.side_pots:
-            winner = max(results, key=results.get)
-            winning_rank = HAND_RANK_NAMES[results[winner][0]]
-            self.showdown_hand_rank = winning_rank
-            print(f"Winner: {winner} with {winning_rank}")
-            self.game_state.stacks[winner] += self.game_state.pot
-            self.game_state.pot = 0
-            self.end_hand(winner)
-            return
-
-        self.game_state.pot = 0
-        if winners_summary:
-            for tied, rank, amount in winners_summary:
-                print(f"Pot {amount} winner(s): {tied} with {rank}")
-        self.end_hand(main_pot_winner or self.players[0])
+        return pots
 
     def _post_blinds(self) -> None:
         if self.game_state is None:
@@ -364,9 +514,24 @@ class PokerEngine:
             if player not in self.game_state.all_in_players
         ]
 
+    def _betting_closed(self) -> bool:
+        # With everyone else all-in, a lone player who owes nothing has nobody
+        # left to bet against: the rest of the board is just dealt out.
+        can_act = self._can_act_players()
+        if len(can_act) > 1:
+            return False
+        return all(self.game_state.to_call(player) == 0 for player in can_act)
+
     def _fast_forward_to_showdown(self) -> None:
         if self.game_state is None or self.deck is None:
             return
+        if (
+            self.allin_ev
+            and self.hand_record is not None
+            and len(self.game_state.players_in_hand) > 1
+            and len(self.game_state.board) < 5
+        ):
+            self.hand_record.allin_ev = self._compute_allin_ev()
         while self.game_state.street != "showdown":
             if self.game_state.street == "preflop":
                 self.game_state.board.extend(self.deck.deal(3))
@@ -381,6 +546,30 @@ class PokerEngine:
                 self.game_state.street = "showdown"
                 self.resolve_showdown()
                 return
+            self._publish_street()
+
+    def _compute_allin_ev(self) -> AllInEV:
+        state = self.game_state
+        remaining = self.deck.remaining()
+        # A private generator keeps the sampled runouts from shifting the
+        # global random stream, so enabling EV does not change the deals.
+        # Seeding it from the undealt cards (already shuffled by that stream)
+        # decorrelates tables at the same hand number, while a replay or a
+        # restored checkpoint with the same deck samples the same runouts.
+        rng = random.Random(bytes(CARD_INDEX[card] for card in remaining))
+        return compute_allin_ev(
+            players=[
+                player for player in self.players if player in state.players_in_hand
+            ],
+            hands=state.hands,
+            board=state.board,
+            remaining=remaining,
+            pots=self._showdown_pots(),
+            street=state.street,
+            samples=self.allin_ev_samples,
+            exact_limit=self.allin_ev_exact_limit,
+            rng=rng,
+        )
 
     def _award_pot(self, winner: str, hand_rank: str) -> None:
         if self.game_state is None:
@@ -399,20 +588,140 @@ class PokerEngine:
             self._award_pot(winner_id, hand_rank)
 
         self.game_state.last_winner = winner_id
+        if self._events:
+            self._publish_payout(winner_id)
+        self._finish_hand_record(winner_id)
         self.game_state.pot = 0
         self.game_state.board = []
         self.game_state.hands = {}
         self.game_state.bets = {}
         self.game_state.players_to_act = set()
         self.game_state.players_acted = set()
-        self.game_state.players_in_hand = set(self.players)
         self.game_state.current_player = None
         self.game_state.current_bet = 0
         self.game_state.last_raiser = None
         self.game_state.street = "showdown"
         self.game_state.hand_number += 1
 
-        if self.players:
-            self.dealer_index = (self.dealer_index + 1) % len(self.players)
+        self._rotate_button_and_eliminate()
+        self.game_state.players = self.players
+        self.game_state.players_in_hand = set(self.players)
 
         return self.players
+
+    def _record_action(self, player_id: str, action: Action, amount: int) -> None:
+        if self.game_state is None:
+            return
+        self.game_state.action_log.append(
+            self.players.index(player_id), self.game_state.street, action.type, amount
+        )
+        if self._events:
+            self._events.publish(
+                "action",
+                self.game_state.hand_number,
+                {
+                    "player": player_id,
+                    "street": self.game_state.street,
+                    "action": action.type.value,
+                    "amount": amount,
+                    "raise_to": (
+                        action.amount if action.type == ActionType.RAISE else None
+                    ),
+                    "pot": self.game_state.pot,
+                    "stack": self.game_state.stacks[player_id],
+                },
+            )
+        if self.hand_record is None:
+            return
+        self.hand_record.actions.append(
+            ActionRecord(
+                player=player_id,
+                street=self.game_state.street,
+                action=action.type,
+                amount=amount,
+                raise_to=action.amount if action.type == ActionType.RAISE else None,
+            )
+        )
+
+    def _publish_street(self) -> None:
+        if not self._events:
+            return
+        state = self.game_state
+        self._events.publish(
+            "street_dealt",
+            state.hand_number,
+            {
+                "street": state.street,
+                "board": [str(card) for card in state.board],
+                "pot": state.pot,
+            },
+        )
+
+    def _publish_payout(self, winner_id: str) -> None:
+        state = self.game_state
+        self._events.publish(
+            "payout",
+            state.hand_number,
+            {
+                "winner": winner_id,
+                # Chips each player took back from the pot.
+                "payouts": {
+                    player: state.stacks.get(player, 0)
+                    - stack
+                    + state.total_contrib.get(player, 0)
+                    for player, stack in self._hand_start_stacks.items()
+                },
+                "stacks": dict(state.stacks),
+            },
+        )
+
+    def _finish_hand_record(self, winner_id: str) -> None:
+        record = self.hand_record
+        if record is None or self.game_state is None:
+            return
+        record.board = list(self.game_state.board)
+        record.contributions = [
+            self.game_state.total_contrib.get(player, 0) for player in record.players
+        ]
+        record.payouts = [
+            self.game_state.stacks.get(player, 0) - stack + contribution
+            for player, stack, contribution in zip(
+                record.players, record.stacks, record.contributions
+            )
+        ]
+        record.winner = winner_id
+        self.hand_record = None
+        self.last_hand_record = record
+        for listener in self.hand_listeners:
+            listener(record)
+
+    def _rotate_button_and_eliminate(self) -> None:
+        if self.game_state is None or not self.players:
+            return
+        busted = [
+            player for player in self.players if self.game_state.stacks.get(player, 0) <= 0
+        ]
+        # The button moves to the next seat that still has chips; busted seats
+        # are then removed and the button index re-resolved in the new seating.
+        player_count = len(self.players)
+        next_dealer = None
+        for offset in range(1, player_count + 1):
+            candidate = self.players[(self.dealer_index + offset) % player_count]
+            if candidate not in busted:
+                next_dealer = candidate
+                break
+        if busted:
+            # Players busting on the same hand finish in order of the stacks
+            # they started the hand with (shortest first).
+            busted.sort(key=lambda player: self._hand_start_stacks.get(player, 0))
+            self.players = [player for player in self.players if player not in busted]
+            for player in busted:
+                self.game_state.stacks.pop(player, None)
+                self.game_state.total_contrib.pop(player, None)
+            self.last_eliminated = busted
+            self.eliminated.extend(busted)
+        self.dealer_index = self.players.index(next_dealer) if next_dealer else 0
+
+    def _require_between_hands(self) -> None:
+        if self.game_state is not None and self.game_state.street != "showdown":
+            raise RuntimeError("Seats can only change between hands.")
@@ -0,0 +1,225 @@
+"""Shared, request-coalescing equity estimation.
+
+Bots at many tables ask for ``estimate_equity`` on the same or equivalent
+spots. ``EquityService`` puts every request behind a single worker thread and
+reduces it to a suit-canonical key; a request for a key already queued or
+running waits on that evaluation instead of starting its own. Distinct keys
+are still evaluated one call each: the worker only drains whatever is queued
+together, and with a process pool (``workers`` or a ``ProcessPoolExecutor``)
+those calls run in parallel. A thread pool adds nothing under the GIL.
+
+Results are not cached by default. With ``cache_size`` set, a cached value is
+one Monte Carlo estimate reused, noise included, by every request for that
+spot until it is evicted or ``cache_ttl`` seconds pass.
+"""
+
+from __future__ import annotations
+
+import queue
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import permutations
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .cards import CARD_INDEX, FULL_DECK, Card
+from .monte_carlo import estimate_equity
+
+DEFAULT_ITERATIONS = 300
+DEFAULT_MAX_BATCH = 64
+# Off: a cached estimate would make every bot share one sample per spot.
+DEFAULT_CACHE_SIZE = 0
+
+# (sorted hero indices, sorted board indices, iterations)
+EquityKey = Tuple[Tuple[int, ...], Tuple[int, ...], int]
+# (estimate, ``time.monotonic()`` at which it expires, or None)
+CacheEntry = Tuple[float, Optional[float]]
+
+_SUIT_PERMUTATIONS = tuple(permutations(range(4)))
+_STOP = None
+
+
+def canonical_key(
+    hero_cards: Sequence[Card],
+    board_cards: Sequence[Card],
+    iterations: int = DEFAULT_ITERATIONS,
+) -> EquityKey:
+    """Smallest relabelling of the suits, so isomorphic spots share a key."""
+    hero = [CARD_INDEX[card] for card in hero_cards]
+    board = [CARD_INDEX[card] for card in board_cards]
+    best = None
+    for mapping in _SUIT_PERMUTATIONS:
+        candidate = (
+            tuple(sorted((index & ~3) | mapping[index & 3] for index in board)),
+            tuple(sorted((index & ~3) | mapping[index & 3] for index in hero)),
+        )
+        if best is None or candidate < best:
+            best = candidate
+    board_key, hero_key = best
+    return hero_key, board_key, iterations
+
+
+def evaluate_key(key: EquityKey) -> float:
+    hero, board, iterations = key
+    return estimate_equity(
+        [FULL_DECK[index] for index in hero],
+        [FULL_DECK[index] for index in board],
+        iterations=iterations,
+    )
+
+
+@dataclass
+class EquityServiceStats:
+    requests: int = 0
+    cache_hits: int = 0
+    # Requests that joined an evaluation already queued or running.
+    coalesced: int = 0
+    evaluations: int = 0
+    batches: int = 0
+
+
+class EquityService:
+    def __init__(
+        self,
+        iterations: int = DEFAULT_ITERATIONS,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        executor: Optional[Executor] = None,
+        workers: int = 0,
+        cache_ttl: Optional[float] = None,
+    ) -> None:
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1.")
+        if executor is not None and workers:
+            raise ValueError("Pass either an executor or workers, not both.")
+        self.iterations = iterations
+        self.max_batch = max_batch
+        self.cache_size = cache_size
+        # Seconds a cached estimate is served before it is sampled again.
+        self.cache_ttl = cache_ttl
+        # With a process pool each batch is split across its workers; without
+        # one the service thread evaluates the batch itself. A pool created
+        # from ``workers`` belongs to the service and is shut down with it;
+        # each worker reseeds so forked processes do not share one stream.
+        self._owns_executor = workers > 0
+        if workers > 0:
+            executor = ProcessPoolExecutor(workers, initializer=random.seed)
+        self.executor = executor
+        self.stats = EquityServiceStats()
+        self._cache: "OrderedDict[EquityKey, CacheEntry]" = OrderedDict()
+        self._pending: Dict[EquityKey, List[Future]] = {}
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[EquityKey]]" = queue.Queue()
+        self._closed = False
+        self._worker = threading.Thread(
+            target=self._run, name="equity-service", daemon=True
+        )
+        self._worker.start()
+
+    def submit(
+        self,
+        hero_cards: Sequence[Card],
+        board_cards: Sequence[Card],
+        iterations: Optional[int] = None,
+    ) -> "Future[float]":
+        key = canonical_key(hero_cards, board_cards, iterations or self.iterations)
+        future: "Future[float]" = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Equity service is closed.")
+            self.stats.requests += 1
+            cached = self._cache.get(key)
+            if cached is not None:
+                value, expires = cached
+                if expires is None or time.monotonic() < expires:
+                    self._cache.move_to_end(key)
+                    self.stats.cache_hits += 1
+                    future.set_result(value)
+                    return future
+                del self._cache[key]
+            waiters = self._pending.get(key)
+            if waiters is not None:
+                self.stats.coalesced += 1
+                waiters.append(future)
+                return future
+            self._pending[key] = [future]
+        self._queue.put(key)
+        return future
+
+    def estimate(
+        self,
+        hero_cards: Sequence[Card],
+        board_cards: Sequence[Card],
+        iterations: Optional[int] = None,
+    ) -> float:
+        return self.submit(hero_cards, board_cards, iterations).result()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(_STOP)
+        self._worker.join()
+        if self._owns_executor:
+            self.executor.shutdown()
+
+    def __enter__(self) -> "EquityService":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _run(self) -> None:
+        while True:
+            key = self._queue.get()
+            if key is _STOP:
+                return
+            batch = [key]
+            stop = False
+            while len(batch) < self.max_batch:
+                try:
+                    key = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if key is _STOP:
+                    stop = True
+                    break
+                batch.append(key)
+            self._evaluate(batch)
+            if stop:
+                return
+
+    def _evaluate(self, batch: List[EquityKey]) -> None:
+        try:
+            if self.executor is None:
+                results = [evaluate_key(key) for key in batch]
+            else:
+                results = list(self.executor.map(evaluate_key, batch))
+        except Exception as exc:
+            with self._lock:
+                waiting = [self._pending.pop(key, []) for key in batch]
+            for futures in waiting:
+                for future in futures:
+                    future.set_exception(exc)
+            return
+
+        with self._lock:
+            self.stats.batches += 1
+            self.stats.evaluations += len(batch)
+            waiting = []
+            expires = None
+            if self.cache_ttl is not None:
+                expires = time.monotonic() + self.cache_ttl
+            for key, value in zip(batch, results):
+                waiting.append((self._pending.pop(key, []), value))
+                if self.cache_size > 0:
+                    self._cache[key] = (value, expires)
+                    if len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+        for futures, value in waiting:
+            for future in futures:
+                future.set_result(value)
@@ -0,0 +1,318 @@
+"""Publish/subscribe feed of engine events with bounded per-subscriber queues."""
+
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+)
+
+HAND_STARTED = "hand_started"
+ACTION = "action"
+STREET_DEALT = "street_dealt"
+SHOWDOWN = "showdown"
+PAYOUT = "payout"
+EVENT_KINDS = (HAND_STARTED, ACTION, STREET_DEALT, SHOWDOWN, PAYOUT)
+
+# What a full subscriber queue does with a new event. DROP_OLDEST discards the
+# oldest one, so the table never waits. COALESCE replaces the newest queued
+# event with the same key (the kind by default), else drops the oldest. BLOCK
+# makes the publishing table wait up to ``block_timeout`` seconds, then drops
+# the oldest; only for consumers on another thread, or it deadlocks.
+BLOCK = "block"
+DROP_OLDEST = "drop_oldest"
+COALESCE = "coalesce"
+POLICIES = (BLOCK, DROP_OLDEST, COALESCE)
+
+DEFAULT_MAXSIZE = 1024
+
+
+class Event(NamedTuple):
+    # One instance is shared by every subscriber; treat payloads as read-only.
+    seq: int
+    kind: str
+    hand_number: int
+    payload: Dict[str, object]
+    # ``time.perf_counter()`` at publication.
+    timestamp: float
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "seq": self.seq,
+            "kind": self.kind,
+            "hand_number": self.hand_number,
+            **self.payload,
+        }
+
+
+@dataclass
+class SubscriberStats:
+    published: int = 0
+    delivered: int = 0
+    dropped: int = 0
+    coalesced: int = 0
+    # Times the publisher had to wait on a full ``BLOCK`` queue.
+    blocked: int = 0
+    blocked_seconds: float = 0.0
+    max_depth: int = 0
+    # Largest publication-to-delivery delay seen so far.
+    max_lag_seconds: float = 0.0
+
+
+def _kind_key(event: Event) -> Hashable:
+    return event.kind
+
+
+class Subscription:
+    def __init__(
+        self,
+        feed: "EventFeed",
+        name: str,
+        kinds: Optional[Iterable[str]] = None,
+        maxsize: int = DEFAULT_MAXSIZE,
+        policy: str = DROP_OLDEST,
+        block_timeout: Optional[float] = None,
+        coalesce_key: Optional[Callable[[Event], Hashable]] = None,
+    ) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1.")
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        if kinds is not None:
+            kinds = frozenset(kinds)
+            unknown = kinds.difference(EVENT_KINDS)
+            if unknown:
+                raise ValueError("Unknown event kind(s): " + ", ".join(sorted(unknown)))
+        self.feed = feed
+        self.name = name
+        self.kinds = kinds
+        self.maxsize = maxsize
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.coalesce_key = coalesce_key or _kind_key
+        self.stats = SubscriberStats()
+        self.closed = False
+        self._queue: Deque[Event] = deque()
+        # As in ``queue.Queue``: one lock, two conditions. Waiters are counted
+        # so the publisher only pays for a notify when someone is waiting.
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._readers_waiting = 0
+        self._writers_waiting = 0
+
+    def offer(self, event: Event) -> None:
+        if self.kinds is not None and event.kind not in self.kinds:
+            return
+        with self._lock:
+            if self.closed:
+                return
+            stats = self.stats
+            stats.published += 1
+            queue = self._queue
+            if len(queue) >= self.maxsize:
+                if self.policy == BLOCK:
+                    self._wait_for_room()
+                    if self.closed:
+                        return
+                elif self.policy == COALESCE and self._coalesce(event):
+                    return
+                if len(queue) >= self.maxsize:
+                    queue.popleft()
+                    stats.dropped += 1
+            queue.append(event)
+            if len(queue) > stats.max_depth:
+                stats.max_depth = len(queue)
+            if self._readers_waiting:
+                self._not_empty.notify()
+
+    def _wait_for_room(self) -> None:
+        stats = self.stats
+        stats.blocked += 1
+        start = time.perf_counter()
+        self._writers_waiting += 1
+        try:
+            self._not_full.wait_for(
+                lambda: self.closed or len(self._queue) < self.maxsize,
+                self.block_timeout,
+            )
+        finally:
+            self._writers_waiting -= 1
+        stats.blocked_seconds += time.perf_counter() - start
+
+    def _coalesce(self, event: Event) -> bool:
+        key = self.coalesce_key(event)
+        queue = self._queue
+        for offset, queued in enumerate(reversed(queue)):
+            if self.coalesce_key(queued) == key:
+                del queue[len(queue) - 1 - offset]
+                queue.append(event)
+                self.stats.coalesced += 1
+                return True
+        return False
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Event]:
+        """Next event, or ``None`` on timeout or once closed and drained."""
+        with self._lock:
+            if not self._queue and not self.closed:
+                self._readers_waiting += 1
+                try:
+                    self._not_empty.wait_for(
+                        lambda: self._queue or self.closed, timeout
+                    )
+                finally:
+                    self._readers_waiting -= 1
+            if not self._queue:
+                return None
+            event = self._queue.popleft()
+            self._delivered(event)
+            if self._writers_waiting:
+                self._not_full.notify()
+            return event
+
+    def drain(self, max_events: Optional[int] = None) -> List[Event]:
+        """Every queued event (up to ``max_events``) without waiting."""
+        with self._lock:
+            count = len(self._queue)
+            if max_events is not None:
+                count = min(count, max_events)
+            events = [self._queue.popleft() for _ in range(count)]
+            for event in events:
+                self._delivered(event)
+            if events and self._writers_waiting:
+                self._not_full.notify()
+            return events
+
+    def _delivered(self, event: Event) -> None:
+        stats = self.stats
+        stats.delivered += 1
+        lag = time.perf_counter() - event.timestamp
+        if lag > stats.max_lag_seconds:
+            stats.max_lag_seconds = lag
+
+    def __iter__(self) -> Iterator[Event]:
+        while True:
+            event = self.get()
+            if event is None:
+                return
+            yield event
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    @property
+    def lag_seconds(self) -> float:
+        # Age of the oldest event still waiting to be read.
+        with self._lock:
+            if not self._queue:
+                return 0.0
+            return time.perf_counter() - self._queue[0].timestamp
+
+    def metrics(self) -> Dict[str, object]:
+        with self._lock:
+            stats = self.stats
+            return {
+                "name": self.name,
+                "policy": self.policy,
+                "maxsize": self.maxsize,
+                "depth": len(self._queue),
+                "lag_seconds": (
+                    time.perf_counter() - self._queue[0].timestamp
+                    if self._queue
+                    else 0.0
+                ),
+                "published": stats.published,
+                "delivered": stats.delivered,
+                "dropped": stats.dropped,
+                "coalesced": stats.coalesced,
+                "blocked": stats.blocked,
+                "blocked_seconds": stats.blocked_seconds,
+                "max_depth": stats.max_depth,
+                "max_lag_seconds": stats.max_lag_seconds,
+            }
+
+    def close(self) -> None:
+        """Stop receiving events; queued events can still be read."""
+        self.feed.unsubscribe(self)
+        with self._lock:
+            self.closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+# Publishing with no subscribers is a single truth test, and the engine only
+# builds payloads when someone is listening.
+class EventFeed:
+    def __init__(self) -> None:
+        # Replaced, never mutated, so publishing needs no lock.
+        self._subscriptions: tuple = ()
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+
+    def subscribe(
+        self,
+        name: Optional[str] = None,
+        kinds: Optional[Iterable[str]] = None,
+        maxsize: int = DEFAULT_MAXSIZE,
+        policy: str = DROP_OLDEST,
+        block_timeout: Optional[float] = None,
+        coalesce_key: Optional[Callable[[Event], Hashable]] = None,
+    ) -> Subscription:
+        with self._lock:
+            subscription = Subscription(
+                self,
+                name or f"subscriber-{len(self._subscriptions)}",
+                kinds=kinds,
+                maxsize=maxsize,
+                policy=policy,
+                block_timeout=block_timeout,
+                coalesce_key=coalesce_key,
+            )
+            self._subscriptions = self._subscriptions + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions = tuple(
+                current
+                for current in self._subscriptions
+                if current is not subscription
+            )
+
+    def publish(self, kind: str, hand_number: int, payload: Dict[str, object]) -> None:
+        subscriptions = self._subscriptions
+        if not subscriptions:
+            return
+        event = Event(
+            next(self._seq), kind, hand_number, payload, time.perf_counter()
+        )
+        for subscription in subscriptions:
+            subscription.offer(event)
+
+    def metrics(self) -> Dict[str, Dict[str, object]]:
+        return {
+            subscription.name: subscription.metrics()
+            for subscription in self._subscriptions
+        }
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
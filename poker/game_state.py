@@ -4,8 +4,10 @@ from __future__ import annotations
 
 from typing import Dict, List, Optional, Set
 
+from .action_log import ActionLog
 from .actions import Action
 from .cards import Card
+from .variants import HOLDEM, is_pot_limit
 
 
 class GameState:
@@ -35,6 +37,7 @@ class GameState:
         total_contrib: Optional[Dict[str, int]] = None,
         all_in_players: Optional[Set[str]] = None,
         side_pots: Optional[List[Dict[str, object]]] = None,
+        variant: str = HOLDEM,
     ) -> None:
         self.players = players
         self.stacks = stacks
@@ -60,6 +63,10 @@ class GameState:
         self.total_contrib = total_contrib or {player: 0 for player in self.players}
         self.all_in_players = all_in_players or set()
         self.side_pots = side_pots or []
+        self.variant = variant
+        # Who did what on which street this hand; ``action_history`` only
+        # keeps the bare actions.
+        self.action_log = ActionLog()
 
     def add_to_pot(self, amount: int) -> None:
         self.pot += amount
@@ -76,6 +83,12 @@ class GameState:
     def to_call(self, player_id: str) -> int:
         return max(0, self.current_bet - self.bets.get(player_id, 0))
 
+    def max_raise_to(self, player_id: str) -> Optional[int]:
+        # Pot limit: call first, then raise by the size of the pot after the call.
+        if not is_pot_limit(self.variant):
+            return None
+        return self.current_bet + self.pot + self.to_call(player_id)
+
     def add_contribution(self, player_id: str, amount: int) -> None:
         self.total_contrib[player_id] = self.total_contrib.get(player_id, 0) + amount
 
@@ -119,6 +132,7 @@ class GameState:
             f"last_winner={self.last_winner}, "
             f"total_contrib={self.total_contrib}, "
             f"all_in_players={self.all_in_players}, "
-            f"side_pots={self.side_pots}"
+            f"side_pots={self.side_pots}, "
+            f"variant={self.variant}"
             ")"
         )
@@ -1,12 +1,12 @@
-"""Texas Hold'em hand evaluator."""
+"""Hand evaluators for Texas Hold'em and Omaha."""
 
 from __future__ import annotations
 
 from collections import Counter
 from itertools import combinations
-from typing import Iterable, List, Tuple
+from typing import Dict, Iterable, List, Sequence, Tuple
 
-from .cards import Card, RANKS
+from .cards import CARD_INDEX, Card, RANKS
 
 HIGH_CARD = 1
 ONE_PAIR = 2
@@ -108,3 +108,252 @@ def _is_straight(ranks: List[int]) -> Tuple[bool, int]:
         return True, unique[0]
 
     return False, 0
+
+
+# Integer hand values.
+#
+# ``score_value`` packs an ``evaluate_hand`` tuple into a single int (category in
+# the high bits, then up to five 4-bit rank values), so comparing values gives
+# exactly the same ordering as comparing the tuples. ``evaluate_indices`` computes
+# that value directly from card indices without building 5-card combinations:
+# suited cards are resolved through a table keyed by the suit's rank bitmask and
+# everything else through a table keyed by the rank-count multiset. Both tables
+# are filled lazily on first use.
+
+_RANK_KEY_BASE = 5
+_RANK_BITS = tuple(1 << (index >> 2) for index in range(52))
+_RANK_KEYS = tuple(_RANK_KEY_BASE ** (index >> 2) for index in range(52))
+_FLUSH_VALUES: Dict[int, int] = {}
+_MULTISET_VALUES: Dict[int, int] = {}
+
+
+def hand_category(value: int) -> int:
+    return value >> 20
+
+
+def score_value(score: Sequence[int]) -> int:
+    value = score[0]
+    for position in range(1, 6):
+        value <<= 4
+        if position < len(score):
+            value |= score[position]
+    return value
+
+
+def evaluate_hand_value(cards: List[Card]) -> int:
+    return evaluate_indices([CARD_INDEX[card] for card in cards])
+
+
+def evaluate_indices(indices: Sequence[int]) -> int:
+    if len(indices) < 5:
+        raise ValueError("evaluate_indices expects at least 5 cards")
+
+    key = 0
+    suit_counts = [0, 0, 0, 0]
+    suit_masks = [0, 0, 0, 0]
+    for index in indices:
+        suit = index & 3
+        key += _RANK_KEYS[index]
+        suit_counts[suit] += 1
+        suit_masks[suit] |= _RANK_BITS[index]
+
+    for suit in range(4):
+        if suit_counts[suit] >= 5:
+            mask = suit_masks[suit]
+            value = _FLUSH_VALUES.get(mask)
+            if value is None:
+                value = _flush_value(mask)
+                _FLUSH_VALUES[mask] = value
+            return value
+
+    value = _MULTISET_VALUES.get(key)
+    if value is None:
+        value = _multiset_value(key)
+        _MULTISET_VALUES[key] = value
+    return value
+
+
+def rank_key(indices: Iterable[int]) -> int:
+    """Base-5 rank-count key of the cards, as used by the multiset table."""
+    return sum(_RANK_KEYS[index] for index in indices)
+
+
+def evaluate_rank_key(key: int, flush_mask: int = 0) -> int:
+    """Hand value from its rank key, or from the flush suit's rank bitmask."""
+    # Up to seven cards a flush always outranks what the rank counts make.
+    table = _FLUSH_VALUES if flush_mask else _MULTISET_VALUES
+    lookup = flush_mask or key
+    value = table.get(lookup)
+    if value is None:
+        value = _flush_value(flush_mask) if flush_mask else _multiset_value(key)
+        table[lookup] = value
+    return value
+
+
+def evaluate_pairs(board: Sequence[int], pairs: Iterable[Tuple[int, int]]) -> List[int]:
+    """Same values as ``evaluate_indices`` for many holdings on one board."""
+    # The board's rank key and suit masks are computed once; each holding only
+    # adds its two cards.
+    if not 3 <= len(board) <= 5:
+        raise ValueError("evaluate_pairs expects 3 to 5 board cards")
+
+    board_key = 0
+    suit_counts = [0, 0, 0, 0]
+    suit_masks = [0, 0, 0, 0]
+    for index in board:
+        suit = index & 3
+        board_key += _RANK_KEYS[index]
+        suit_counts[suit] += 1
+        suit_masks[suit] |= _RANK_BITS[index]
+    # At most five board cards can hold only one suit three or more times.
+    flush_suit = next((suit for suit in range(4) if suit_counts[suit] >= 3), -1)
+    needed = 5 - suit_counts[flush_suit] if flush_suit >= 0 else 3
+
+    values = []
+    for first, second in pairs:
+        if flush_suit >= 0:
+            mask = suit_masks[flush_suit]
+            suited = 0
+            if first & 3 == flush_suit:
+                mask |= _RANK_BITS[first]
+                suited += 1
+            if second & 3 == flush_suit:
+                mask |= _RANK_BITS[second]
+                suited += 1
+            if suited >= needed:
+                value = _FLUSH_VALUES.get(mask)
+                if value is None:
+                    value = _flush_value(mask)
+                    _FLUSH_VALUES[mask] = value
+                values.append(value)
+                continue
+        key = board_key + _RANK_KEYS[first] + _RANK_KEYS[second]
+        value = _MULTISET_VALUES.get(key)
+        if value is None:
+            value = _multiset_value(key)
+            _MULTISET_VALUES[key] = value
+        values.append(value)
+    return values
+
+
+def _straight_high(rank_mask: int) -> int:
+    for high in range(14, 5, -1):
+        window = 0b11111 << (high - 6)
+        if rank_mask & window == window:
+            return high
+    wheel = (1 << 12) | 0b1111
+    if rank_mask & wheel == wheel:
+        return 5
+    return 0
+
+
+def _flush_value(rank_mask: int) -> int:
+    straight_high = _straight_high(rank_mask)
+    if straight_high:
+        return score_value((STRAIGHT_FLUSH, straight_high))
+    ranks = [rank + 2 for rank in range(12, -1, -1) if rank_mask & (1 << rank)]
+    return score_value((FLUSH, *ranks[:5]))
+
+
+def _multiset_value(key: int) -> int:
+    counts = {}
+    for rank in range(13):
+        key, count = divmod(key, _RANK_KEY_BASE)
+        if count:
+            counts[rank + 2] = count
+
+    present = sorted(counts, reverse=True)
+    rank_mask = 0
+    for rank in present:
+        rank_mask |= 1 << (rank - 2)
+    quads = [rank for rank in present if counts[rank] == 4]
+    trips = [rank for rank in present if counts[rank] == 3]
+    pairs = [rank for rank in present if counts[rank] == 2]
+
+    if quads:
+        kicker = max(rank for rank in present if rank != quads[0])
+        return score_value((FOUR_OF_A_KIND, quads[0], kicker))
+
+    if trips and (len(trips) > 1 or pairs):
+        pair_rank = max(rank for rank in trips[1:] + pairs)
+        return score_value((FULL_HOUSE, trips[0], pair_rank))
+
+    straight_high = _straight_high(rank_mask)
+    if straight_high:
+        return score_value((STRAIGHT, straight_high))
+
+    if trips:
+        kickers = [rank for rank in present if rank != trips[0]][:2]
+        return score_value((THREE_OF_A_KIND, trips[0], *kickers))
+
+    if len(pairs) >= 2:
+        kicker = max(rank for rank in present if rank not in pairs[:2])
+        return score_value((TWO_PAIR, pairs[0], pairs[1], kicker))
+
+    if pairs:
+        kickers = [rank for rank in present if rank != pairs[0]][:3]
+        return score_value((ONE_PAIR, pairs[0], *kickers))
+
+    return score_value((HIGH_CARD, *present[:5]))
+
+
+def evaluate_holding(hole: Sequence[int], board: Sequence[int]) -> int:
+    # Four hole cards means Omaha: exactly two of them must play.
+    if len(hole) == 4:
+        return evaluate_omaha(hole, board)
+    return evaluate_indices(list(hole) + list(board))
+
+
+def evaluate_omaha(hole: Sequence[int], board: Sequence[int]) -> int:
+    """Best value using exactly two of the four hole cards and three board cards."""
+    # Rank keys are deduplicated before the multiset lookups, and flushes are
+    # tried only in the one suit that can make them; on an unpaired board a
+    # flush cannot be beaten, so the rank lookups are skipped.
+    if len(hole) != 4:
+        raise ValueError("evaluate_omaha expects exactly 4 hole cards")
+    if not 3 <= len(board) <= 5:
+        raise ValueError("evaluate_omaha expects 3 to 5 board cards")
+
+    best = 0
+    for suit in range(4):
+        suited_board = [index for index in board if index & 3 == suit]
+        if len(suited_board) < 3:
+            continue
+        suited_hole = [index for index in hole if index & 3 == suit]
+        if len(suited_hole) < 2:
+            break
+        board_masks = {
+            _RANK_BITS[a] | _RANK_BITS[b] | _RANK_BITS[c]
+            for a, b, c in combinations(suited_board, 3)
+        }
+        for a, b in combinations(suited_hole, 2):
+            hole_mask = _RANK_BITS[a] | _RANK_BITS[b]
+            for board_mask in board_masks:
+                mask = hole_mask | board_mask
+                value = _FLUSH_VALUES.get(mask)
+                if value is None:
+                    value = _flush_value(mask)
+                    _FLUSH_VALUES[mask] = value
+                if value > best:
+                    best = value
+        # Five board cards hold at most one suit three times.
+        break
+
+    board_keys = {
+        _RANK_KEYS[a] + _RANK_KEYS[b] + _RANK_KEYS[c]
+        for a, b, c in combinations(board, 3)
+    }
+    board_paired = len({index >> 2 for index in board}) < len(board)
+    if best and not board_paired:
+        return best
+
+    hole_keys = {_RANK_KEYS[a] + _RANK_KEYS[b] for a, b in combinations(hole, 2)}
+    keys = {hole_key + board_key for hole_key in hole_keys for board_key in board_keys}
+    for key in keys:
+        value = _MULTISET_VALUES.get(key)
+        if value is None:
+            value = _multiset_value(key)
+            _MULTISET_VALUES[key] = value
+        if value > best:
+            best = value
+    return best
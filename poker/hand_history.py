@@ -0,0 +1,441 @@
+"""Hand records and a compact binary hand-history format.
+
+File layout (little-endian)::
+
+    magic "PKHH" | version u16 | metadata length u32 | metadata (UTF-8 JSON)
+    then one entry per hand: payload length u32 | payload
+
+Each payload holds the hand header, one block per seat (name, starting stack,
+contribution, payout, hole cards, flags), the board and the action list.
+Cards are stored as their ``CARD_INDEX`` byte (255 when unknown).
+
+Since version 2, hands that were all-in before the river may carry an all-in
+EV block after the actions: street u8 | runouts u32 | exact u8 | pot count
+u8, then per pot the amount u32, an eligibility byte per seat and a f64
+equity per seat. Version 1 files are still read.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from dataclasses import dataclass, field
+from typing import BinaryIO, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from .actions import ActionType
+from .cards import CARD_INDEX, FULL_DECK, Card
+
+MAGIC = b"PKHH"
+FORMAT_VERSION = 2
+# First version whose hands may end with an all-in EV block.
+ALLIN_EV_VERSION = 2
+STREETS = ("preflop", "flop", "turn", "river")
+STREET_INDEX = {street: index for index, street in enumerate(STREETS)}
+ACTION_TYPES = tuple(ActionType)
+ACTION_TYPE_INDEX = {action: index for index, action in enumerate(ACTION_TYPES)}
+UNKNOWN_CARD = 255
+
+FLAG_SHOWDOWN = 1
+FLAG_WINNER = 2
+
+# Record layouts, shared with readers that scan the file without decoding
+# hands (see ``hand_store``).
+FILE_HEADER = struct.Struct("<4sHI")
+HAND_LENGTH = struct.Struct("<I")
+HAND_HEADER = struct.Struct("<IBBIIBBH")
+SEAT_FIELDS = struct.Struct("<III")
+ACTION_FIELDS = struct.Struct("<BBBII")
+_EV_HEADER = struct.Struct("<BIBB")
+_EV_POT = struct.Struct("<I")
+_EV_SHARE = struct.Struct("<d")
+
+
+@dataclass(frozen=True)
+class ActionRecord:
+    player: str
+    street: str
+    action: ActionType
+    # Chips the player put in with this action.
+    amount: int = 0
+    # Target bet for raises, as passed in ``Action.amount``.
+    raise_to: Optional[int] = None
+
+
+@dataclass
+class PotEquity:
+    amount: int
+    eligible: List[str]
+    # Expected share of the pot for each eligible player; sums to 1.
+    equity: Dict[str, float]
+
+
+@dataclass
+class AllInEV:
+    # Street on which the remaining players were all-in.
+    street: str
+    runouts: int
+    exact: bool
+    pots: List[PotEquity] = field(default_factory=list)
+
+    def expected_payouts(self) -> Dict[str, float]:
+        payouts: Dict[str, float] = {}
+        for pot in self.pots:
+            for player, share in pot.equity.items():
+                payouts[player] = payouts.get(player, 0.0) + share * pot.amount
+        return payouts
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "street": self.street,
+            "runouts": self.runouts,
+            "exact": self.exact,
+            "pots": [
+                {
+                    "amount": pot.amount,
+                    "eligible": list(pot.eligible),
+                    "equity": dict(pot.equity),
+                }
+                for pot in self.pots
+            ],
+        }
+
+
+@dataclass
+class HandRecord:
+    hand_number: int
+    players: List[str]
+    stacks: List[int]
+    dealer_index: int
+    small_blind: int
+    big_blind: int
+    hole_cards: List[List[Card]]
+    board: List[Card] = field(default_factory=list)
+    actions: List[ActionRecord] = field(default_factory=list)
+    contributions: List[int] = field(default_factory=list)
+    payouts: List[int] = field(default_factory=list)
+    showdown: List[str] = field(default_factory=list)
+    winner: Optional[str] = None
+    allin_ev: Optional[AllInEV] = None
+
+    @property
+    def pot(self) -> int:
+        return sum(self.contributions)
+
+    def net_results(self) -> Dict[str, int]:
+        return {
+            player: payout - contribution
+            for player, payout, contribution in zip(
+                self.players, self.payouts, self.contributions
+            )
+        }
+
+    def ev_results(self) -> Dict[str, float]:
+        # All-in adjusted net results: expected payouts over the runouts
+        # instead of the one that was dealt. Other hands use the actual result.
+        if self.allin_ev is None:
+            return {player: float(net) for player, net in self.net_results().items()}
+        expected = self.allin_ev.expected_payouts()
+        return {
+            player: expected.get(player, 0.0) - contribution
+            for player, contribution in zip(self.players, self.contributions)
+        }
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "hand_number": self.hand_number,
+            "dealer_index": self.dealer_index,
+            "small_blind": self.small_blind,
+            "big_blind": self.big_blind,
+            "seats": [
+                {
+                    "player": player,
+                    "stack": stack,
+                    "hole_cards": [str(card) for card in cards],
+                    "contribution": contribution,
+                    "payout": payout,
+                }
+                for player, stack, cards, contribution, payout in zip(
+                    self.players,
+                    self.stacks,
+                    self.hole_cards,
+                    self.contributions,
+                    self.payouts,
+                )
+            ],
+            "board": [str(card) for card in self.board],
+            "actions": [
+                {
+                    "player": action.player,
+                    "street": action.street,
+                    "action": action.action.value,
+                    "amount": action.amount,
+                    "raise_to": action.raise_to,
+                }
+                for action in self.actions
+            ],
+            "showdown": list(self.showdown),
+            "winner": self.winner,
+            "allin_ev": self.allin_ev.to_dict() if self.allin_ev else None,
+        }
+
+
+def encode_hand(record: HandRecord) -> bytes:
+    seat_of = {player: seat for seat, player in enumerate(record.players)}
+    hole_count = max((len(cards) for cards in record.hole_cards), default=0)
+    showdown = set(record.showdown)
+    parts = [
+        HAND_HEADER.pack(
+            record.hand_number,
+            len(record.players),
+            record.dealer_index,
+            record.small_blind,
+            record.big_blind,
+            len(record.board),
+            hole_count,
+            len(record.actions),
+        )
+    ]
+    for seat, player in enumerate(record.players):
+        name = player.encode("utf-8")
+        cards = [CARD_INDEX[card] for card in record.hole_cards[seat]]
+        cards += [UNKNOWN_CARD] * (hole_count - len(cards))
+        flags = 0
+        if player in showdown:
+            flags |= FLAG_SHOWDOWN
+        if player == record.winner:
+            flags |= FLAG_WINNER
+        parts.append(bytes((len(name),)))
+        parts.append(name)
+        parts.append(
+            SEAT_FIELDS.pack(
+                record.stacks[seat],
+                record.contributions[seat] if record.contributions else 0,
+                record.payouts[seat] if record.payouts else 0,
+            )
+        )
+        parts.append(bytes(cards + [flags]))
+    parts.append(bytes(CARD_INDEX[card] for card in record.board))
+    for action in record.actions:
+        parts.append(
+            ACTION_FIELDS.pack(
+                seat_of[action.player],
+                STREET_INDEX[action.street],
+                ACTION_TYPE_INDEX[action.action],
+                action.amount,
+                action.raise_to or 0,
+            )
+        )
+    if record.allin_ev is not None:
+        parts.append(_encode_allin_ev(record.allin_ev, record.players))
+    return b"".join(parts)
+
+
+def _encode_allin_ev(ev: AllInEV, players: List[str]) -> bytes:
+    parts = [
+        _EV_HEADER.pack(
+            STREET_INDEX[ev.street], ev.runouts, int(ev.exact), len(ev.pots)
+        )
+    ]
+    for pot in ev.pots:
+        eligible = set(pot.eligible)
+        parts.append(_EV_POT.pack(pot.amount))
+        parts.append(bytes(int(player in eligible) for player in players))
+        for player in players:
+            parts.append(_EV_SHARE.pack(pot.equity.get(player, 0.0)))
+    return b"".join(parts)
+
+
+def _decode_allin_ev(view: memoryview, offset: int, players: List[str]) -> AllInEV:
+    street, runouts, exact, pot_count = _EV_HEADER.unpack_from(view, offset)
+    offset += _EV_HEADER.size
+    pots: List[PotEquity] = []
+    for _ in range(pot_count):
+        (amount,) = _EV_POT.unpack_from(view, offset)
+        offset += _EV_POT.size
+        flags = view[offset : offset + len(players)]
+        offset += len(players)
+        eligible = [player for player, flag in zip(players, flags) if flag]
+        equity: Dict[str, float] = {}
+        for player in players:
+            (share,) = _EV_SHARE.unpack_from(view, offset)
+            offset += _EV_SHARE.size
+            if player in eligible:
+                equity[player] = share
+        pots.append(PotEquity(amount, eligible, equity))
+    return AllInEV(STREETS[street], runouts, bool(exact), pots)
+
+
+def decode_hand(payload, version: int = FORMAT_VERSION) -> HandRecord:
+    view = memoryview(payload)
+    (
+        hand_number,
+        seat_count,
+        dealer_index,
+        small_blind,
+        big_blind,
+        board_count,
+        hole_count,
+        action_count,
+    ) = HAND_HEADER.unpack_from(view, 0)
+    offset = HAND_HEADER.size
+    players: List[str] = []
+    stacks: List[int] = []
+    contributions: List[int] = []
+    payouts: List[int] = []
+    hole_cards: List[List[Card]] = []
+    showdown: List[str] = []
+    winner = None
+    for _ in range(seat_count):
+        name_length = view[offset]
+        offset += 1
+        player = bytes(view[offset : offset + name_length]).decode("utf-8")
+        offset += name_length
+        stack, contribution, payout = SEAT_FIELDS.unpack_from(view, offset)
+        offset += SEAT_FIELDS.size
+        cards = view[offset : offset + hole_count]
+        flags = view[offset + hole_count]
+        offset += hole_count + 1
+        players.append(player)
+        stacks.append(stack)
+        contributions.append(contribution)
+        payouts.append(payout)
+        hole_cards.append([FULL_DECK[card] for card in cards if card != UNKNOWN_CARD])
+        if flags & FLAG_SHOWDOWN:
+            showdown.append(player)
+        if flags & FLAG_WINNER:
+            winner = player
+    board = [FULL_DECK[card] for card in view[offset : offset + board_count]]
+    offset += board_count
+    actions: List[ActionRecord] = []
+    for _ in range(action_count):
+        seat, street, action_type, amount, raise_to = ACTION_FIELDS.unpack_from(
+            view, offset
+        )
+        offset += ACTION_FIELDS.size
+        action = ACTION_TYPES[action_type]
+        actions.append(
+            ActionRecord(
+                player=players[seat],
+                street=STREETS[street],
+                action=action,
+                amount=amount,
+                raise_to=raise_to if action == ActionType.RAISE else None,
+            )
+        )
+    allin_ev = None
+    if version >= ALLIN_EV_VERSION and offset < len(view):
+        allin_ev = _decode_allin_ev(view, offset, players)
+    return HandRecord(
+        hand_number=hand_number,
+        players=players,
+        stacks=stacks,
+        dealer_index=dealer_index,
+        small_blind=small_blind,
+        big_blind=big_blind,
+        hole_cards=hole_cards,
+        board=board,
+        actions=actions,
+        contributions=contributions,
+        payouts=payouts,
+        showdown=showdown,
+        winner=winner,
+        allin_ev=allin_ev,
+    )
+
+
+class HandHistoryWriter:
+    def __init__(
+        self,
+        path: str,
+        metadata: Optional[Mapping[str, object]] = None,
+        buffer_size: int = 1 << 20,
+    ) -> None:
+        self.path = path
+        self.buffer_size = buffer_size
+        self.hands_written = 0
+        self._buffer = bytearray()
+        self._handle: Optional[BinaryIO] = open(path, "wb")
+        meta = json.dumps(dict(metadata or {})).encode("utf-8")
+        self._buffer += FILE_HEADER.pack(MAGIC, FORMAT_VERSION, len(meta))
+        self._buffer += meta
+
+    def write(self, record: HandRecord) -> None:
+        if self._handle is None:
+            raise ValueError("Hand history writer is closed.")
+        payload = encode_hand(record)
+        self._buffer += HAND_LENGTH.pack(len(payload))
+        self._buffer += payload
+        self.hands_written += 1
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    # Engines call their hand listeners with the finished record.
+    __call__ = write
+
+    def flush(self) -> None:
+        if self._handle is None:
+            return
+        if self._buffer:
+            self._handle.write(self._buffer)
+            self._buffer.clear()
+        self._handle.flush()
+
+    def close(self) -> None:
+        if self._handle is None:
+            return
+        self.flush()
+        self._handle.close()
+        self._handle = None
+
+    def __enter__(self) -> "HandHistoryWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def unpack_file_header(buffer) -> Tuple[int, int]:
+    # (format version, metadata length) of a validated file header.
+    if len(buffer) < FILE_HEADER.size:
+        raise ValueError("Truncated hand history header.")
+    magic, version, meta_length = FILE_HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a hand history file.")
+    if not 1 <= version <= FORMAT_VERSION:
+        raise ValueError(f"Unsupported hand history version: {version}")
+    return version, meta_length
+
+
+def read_header(handle: BinaryIO) -> Tuple[int, Dict[str, object]]:
+    version, meta_length = unpack_file_header(handle.read(FILE_HEADER.size))
+    return version, json.loads(handle.read(meta_length).decode("utf-8"))
+
+
+def read_metadata(handle: BinaryIO) -> Dict[str, object]:
+    return read_header(handle)[1]
+
+
+def iter_hand_history(path: str) -> Iterator[HandRecord]:
+    with open(path, "rb") as handle:
+        version, _ = read_header(handle)
+        while True:
+            prefix = handle.read(HAND_LENGTH.size)
+            if not prefix:
+                return
+            if len(prefix) != HAND_LENGTH.size:
+                raise ValueError("Truncated hand history entry.")
+            (length,) = HAND_LENGTH.unpack(prefix)
+            payload = handle.read(length)
+            if len(payload) != length:
+                raise ValueError("Truncated hand history entry.")
+            yield decode_hand(payload, version)
+
+
+def export_jsonl(path: str, output_path: str) -> int:
+    count = 0
+    with open(output_path, "w", encoding="utf-8") as output:
+        for record in iter_hand_history(path):
+            output.write(json.dumps(record.to_dict()))
+            output.write("\n")
+            count += 1
+    return count
@@ -0,0 +1,578 @@
+"""Indexed, memory-mapped access to hand-history files.
+
+The sidecar index (``<data file>.idx``) holds fixed-width columns per hand
+(offset, length, pot, street reached, best showdown category) and posting
+lists of hand ids per player: one list of every hand the player was dealt
+into plus one list per (street, action type) they performed. The street and
+showdown category columns are also bucketed (one list of hand ids per
+value), and the hand ids are stored once more sorted by pot. Columns and
+lists are read straight out of the mapped index file, so opening a store and
+answering queries does not copy or decode hands.
+"""
+
+from __future__ import annotations
+
+import bisect
+import heapq
+import json
+import mmap
+import os
+import struct
+from array import array
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .actions import Action, ActionType
+from .cards import FULL_DECK
+from .deck import Deck
+from .engine import PokerEngine
+from .hand_evaluator import HAND_RANK_NAMES, evaluate_holding, hand_category
+from .hand_history import (
+    ACTION_FIELDS,
+    ACTION_TYPE_INDEX,
+    ACTION_TYPES,
+    FILE_HEADER,
+    FLAG_SHOWDOWN,
+    HAND_HEADER,
+    HAND_LENGTH,
+    SEAT_FIELDS,
+    STREET_INDEX,
+    STREETS,
+    UNKNOWN_CARD,
+    HandRecord,
+    decode_hand,
+    unpack_file_header,
+)
+from .variants import variant_for_hole_count
+
+INDEX_MAGIC = b"PKIX"
+INDEX_VERSION = 2
+# Street reached by a hand: 0-3 follow STREETS, 4 means it went to showdown.
+SHOWDOWN_LEVEL = len(STREETS)
+POSTINGS_PER_PLAYER = 1 + len(STREETS) * len(ACTION_TYPES)
+# Best showdown category; 0 when the hand had no showdown.
+RANK_LEVELS = max(HAND_RANK_NAMES) + 1
+
+_BOARD_STREET = {0: 0, 3: 1, 4: 2, 5: 3}
+_REPLAY_FIELDS = ("board", "actions", "contributions", "payouts", "showdown", "winner")
+_INDEX_HEADER = struct.Struct("<4sHQQQIQ")
+_PLAYER_ENTRY = struct.Struct("<H")
+_POSTING_SLOT = struct.Struct("<QI")
+
+
+def _posting_slot(street: int, action_type: int) -> int:
+    return 1 + street * len(ACTION_TYPES) + action_type
+
+
+def _align(blob: bytearray, size: int = 8) -> None:
+    blob.extend(b"\0" * (-len(blob) % size))
+
+
+def build_index(path: str, index_path: Optional[str] = None) -> str:
+    index_path = index_path or f"{path}.idx"
+    offsets = array("Q")
+    lengths = array("I")
+    pots = array("Q")
+    streets = array("B")
+    ranks = array("B")
+    street_buckets = [array("I") for _ in range(SHOWDOWN_LEVEL + 1)]
+    rank_buckets = [array("I") for _ in range(RANK_LEVELS)]
+    postings: Dict[str, List[array]] = {}
+    names: Dict[bytes, str] = {}
+
+    data_size = os.path.getsize(path)
+    with open(path, "rb") as handle, mmap.mmap(
+        handle.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mapped:
+        view = memoryview(mapped)
+        _, meta_length = unpack_file_header(view)
+        position = FILE_HEADER.size + meta_length
+        hand_id = 0
+        while position < data_size:
+            (length,) = HAND_LENGTH.unpack_from(view, position)
+            start = position + HAND_LENGTH.size
+            pot, street, rank, seat_players, performed = _scan_hand(
+                view, start, names
+            )
+            offsets.append(start)
+            lengths.append(length)
+            pots.append(pot)
+            streets.append(street)
+            ranks.append(rank)
+            street_buckets[street].append(hand_id)
+            rank_buckets[rank].append(hand_id)
+            for seat, player in enumerate(seat_players):
+                lists = postings.get(player)
+                if lists is None:
+                    lists = [array("I") for _ in range(POSTINGS_PER_PLAYER)]
+                    postings[player] = lists
+                lists[0].append(hand_id)
+                for slot in sorted(performed[seat]):
+                    lists[slot].append(hand_id)
+            position = start + length
+            hand_id += 1
+        view.release()
+
+    blob = bytearray(_INDEX_HEADER.size)
+    for column in (offsets, pots, lengths, streets, ranks):
+        _align(blob)
+        blob += column.tobytes()
+
+    # Player directory (name, then offset/count of each posting list) followed
+    # by every posting list as a u32 array.
+    _align(blob)
+    directory_offset = len(blob)
+    directory_size = sum(
+        _PLAYER_ENTRY.size + len(player.encode("utf-8"))
+        + POSTINGS_PER_PLAYER * _POSTING_SLOT.size
+        for player in postings
+    )
+    list_position = directory_offset + directory_size
+    list_position += -list_position % 8
+    lists_blob = bytearray()
+    for player, lists in postings.items():
+        name = player.encode("utf-8")
+        blob += _PLAYER_ENTRY.pack(len(name)) + name
+        for posting in lists:
+            blob += _POSTING_SLOT.pack(list_position + len(lists_blob), len(posting))
+            lists_blob += posting.tobytes()
+    _align(blob)
+    blob += lists_blob
+
+    # Bucket directory (street levels, then rank levels), the bucket lists
+    # and finally every hand id ordered by pot.
+    buckets = street_buckets + rank_buckets
+    buckets_offset = len(blob)
+    list_position = buckets_offset + len(buckets) * _POSTING_SLOT.size
+    for bucket in buckets:
+        blob += _POSTING_SLOT.pack(list_position, len(bucket))
+        list_position += 4 * len(bucket)
+    for bucket in buckets:
+        blob += bucket.tobytes()
+    blob += array("I", sorted(range(len(pots)), key=pots.__getitem__)).tobytes()
+    _INDEX_HEADER.pack_into(
+        blob,
+        0,
+        INDEX_MAGIC,
+        INDEX_VERSION,
+        len(offsets),
+        data_size,
+        directory_offset,
+        len(postings),
+        buckets_offset,
+    )
+
+    temp_path = f"{index_path}.tmp"
+    with open(temp_path, "wb") as output:
+        output.write(blob)
+    os.replace(temp_path, index_path)
+    return index_path
+
+
+def _scan_hand(view: memoryview, offset: int, names: Dict[bytes, str]):
+    # Lightweight decode for indexing: no Card or ActionRecord objects.
+    header = HAND_HEADER.unpack_from(view, offset)
+    seat_count, board_count, hole_count, action_count = (
+        header[1],
+        header[5],
+        header[6],
+        header[7],
+    )
+    position = offset + HAND_HEADER.size
+    players: List[str] = []
+    holes: List[List[int]] = []
+    showdown_seats: List[int] = []
+    pot = 0
+    for seat in range(seat_count):
+        name_length = view[position]
+        raw = bytes(view[position + 1 : position + 1 + name_length])
+        player = names.get(raw)
+        if player is None:
+            player = raw.decode("utf-8")
+            names[raw] = player
+        position += 1 + name_length
+        _, contribution, _ = SEAT_FIELDS.unpack_from(view, position)
+        position += SEAT_FIELDS.size
+        cards = view[position : position + hole_count]
+        holes.append([card for card in cards if card != UNKNOWN_CARD])
+        if view[position + hole_count] & FLAG_SHOWDOWN:
+            showdown_seats.append(seat)
+        position += hole_count + 1
+        players.append(player)
+        pot += contribution
+    board = list(view[position : position + board_count])
+    position += board_count
+
+    performed: List[set] = [set() for _ in range(seat_count)]
+    last_street = 0
+    for _ in range(action_count):
+        seat, street, action_type, _, _ = ACTION_FIELDS.unpack_from(view, position)
+        position += ACTION_FIELDS.size
+        performed[seat].add(_posting_slot(street, action_type))
+        last_street = max(last_street, street)
+
+    rank = 0
+    if showdown_seats and board_count == 5:
+        street_reached = SHOWDOWN_LEVEL
+        rank = max(
+            (
+                hand_category(evaluate_holding(holes[seat], board))
+                for seat in showdown_seats
+                if len(holes[seat]) in (2, 4)
+            ),
+            default=0,
+        )
+    else:
+        board_street = _BOARD_STREET.get(board_count, 0)
+        street_reached = max(last_street, board_street)
+    return pot, street_reached, rank, players, performed
+
+
+@dataclass
+class ReplayResult:
+    matches: bool
+    replayed: Optional[HandRecord]
+    mismatches: List[str] = field(default_factory=list)
+
+
+class HandHistoryStore:
+    def __init__(self, path: str, index_path: Optional[str] = None) -> None:
+        self.path = path
+        self.index_path = index_path or f"{path}.idx"
+        if not self._index_is_fresh():
+            build_index(path, self.index_path)
+
+        self._data_handle = open(path, "rb")
+        self._data = mmap.mmap(
+            self._data_handle.fileno(), 0, access=mmap.ACCESS_READ
+        )
+        self._data_view = memoryview(self._data)
+        self.version, meta_length = unpack_file_header(self._data_view)
+        meta_end = FILE_HEADER.size + meta_length
+        self.metadata = json.loads(
+            bytes(self._data_view[FILE_HEADER.size : meta_end]).decode("utf-8")
+        )
+
+        self._index_handle = open(self.index_path, "rb")
+        self._index = mmap.mmap(
+            self._index_handle.fileno(), 0, access=mmap.ACCESS_READ
+        )
+        self._index_view = memoryview(self._index)
+        (
+            _,
+            _,
+            self.hand_count,
+            _,
+            directory_offset,
+            player_count,
+            buckets_offset,
+        ) = _INDEX_HEADER.unpack_from(self._index_view, 0)
+
+        position = _INDEX_HEADER.size
+        columns = []
+        for typecode, width in (("Q", 8), ("Q", 8), ("I", 4), ("B", 1), ("B", 1)):
+            position += -position % 8
+            end = position + width * self.hand_count
+            columns.append(self._index_view[position:end].cast(typecode))
+            position = end
+        self.offsets, self.pots, self.lengths, self.streets, self.ranks = columns
+
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        position = directory_offset
+        for _ in range(player_count):
+            (name_length,) = _PLAYER_ENTRY.unpack_from(self._index_view, position)
+            position += _PLAYER_ENTRY.size
+            raw_name = self._index_view[position : position + name_length]
+            name = bytes(raw_name).decode("utf-8")
+            position += name_length
+            slots = []
+            for _ in range(POSTINGS_PER_PLAYER):
+                slots.append(_POSTING_SLOT.unpack_from(self._index_view, position))
+                position += _POSTING_SLOT.size
+            self._postings[name] = slots
+
+        buckets = []
+        position = buckets_offset
+        for _ in range(SHOWDOWN_LEVEL + 1 + RANK_LEVELS):
+            offset, count = _POSTING_SLOT.unpack_from(self._index_view, position)
+            buckets.append(self._index_view[offset : offset + 4 * count].cast("I"))
+            position += _POSTING_SLOT.size
+        self._street_buckets = buckets[: SHOWDOWN_LEVEL + 1]
+        self._rank_buckets = buckets[SHOWDOWN_LEVEL + 1 :]
+        pot_order_offset = offset + 4 * count
+        self.pot_order = self._index_view[
+            pot_order_offset : pot_order_offset + 4 * self.hand_count
+        ].cast("I")
+
+    def _index_is_fresh(self) -> bool:
+        if not os.path.exists(self.index_path):
+            return False
+        with open(self.index_path, "rb") as handle:
+            header = handle.read(_INDEX_HEADER.size)
+        if len(header) != _INDEX_HEADER.size:
+            return False
+        magic, version, _, data_size, _, _, _ = _INDEX_HEADER.unpack(header)
+        return (
+            magic == INDEX_MAGIC
+            and version == INDEX_VERSION
+            and data_size == os.path.getsize(self.path)
+        )
+
+    def __len__(self) -> int:
+        return self.hand_count
+
+    @property
+    def players(self) -> List[str]:
+        return list(self._postings)
+
+    def players_with_style(self, style: str) -> List[str]:
+        styles = self.metadata.get("styles", {})
+        return [player for player, value in styles.items() if value == style]
+
+    def posting(
+        self,
+        player: str,
+        street: Optional[str] = None,
+        action: Optional[ActionType] = None,
+    ) -> memoryview:
+        slots = self._postings.get(player)
+        if slots is None:
+            return memoryview(array("I"))
+        if street is None and action is None:
+            slot = 0
+        elif street is None or action is None:
+            raise ValueError("Posting lookups need both street and action or neither.")
+        else:
+            slot = _posting_slot(STREET_INDEX[street], ACTION_TYPE_INDEX[action])
+        offset, count = slots[slot]
+        return self._index_view[offset : offset + 4 * count].cast("I")
+
+    def get(self, hand_id: int) -> HandRecord:
+        offset = self.offsets[hand_id]
+        return decode_hand(
+            self._data_view[offset : offset + self.lengths[hand_id]], self.version
+        )
+
+    def query(
+        self,
+        player: Optional[str] = None,
+        style: Optional[str] = None,
+        street: Optional[str] = None,
+        action: Optional[ActionType] = None,
+        min_street: Optional[str] = None,
+        min_pot: Optional[int] = None,
+        max_pot: Optional[int] = None,
+        min_rank: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[int]:
+        """Ids (ascending) of the hands that match every given filter."""
+        # Each filter has a sorted source of ids (posting lists, street or
+        # rank buckets, a slice of pot order). Only the smallest is walked and
+        # the rest are checked per candidate, so the cost follows the most
+        # selective filter; only an unfiltered query walks every hand.
+        if (street is None) != (action is None):
+            raise ValueError("street and action filters must be given together.")
+        if player is not None and style is not None:
+            players: Optional[List[str]] = (
+                [player] if player in self.players_with_style(style) else []
+            )
+        elif player is not None:
+            players = [player]
+        elif style is not None:
+            players = self.players_with_style(style)
+        elif action is not None:
+            players = self.players
+        else:
+            players = None
+
+        # (size, sorted ids, membership test) per filter.
+        sources: List[Tuple[int, Callable[[], Iterable[int]], Callable[[int], bool]]]
+        sources = []
+        if players is not None:
+            lists = [self.posting(name, street, action) for name in players]
+            sources.append(
+                (
+                    sum(len(posting) for posting in lists),
+                    lambda: _merged(lists),
+                    lambda hand_id: any(
+                        _contains(posting, hand_id) for posting in lists
+                    ),
+                )
+            )
+        if min_street is not None:
+            if min_street == "showdown":
+                level = SHOWDOWN_LEVEL
+            else:
+                level = STREET_INDEX[min_street]
+            sources.append(
+                _bucket_source(self._street_buckets[level:], self.streets, level)
+            )
+        if min_rank is not None:
+            sources.append(
+                _bucket_source(
+                    self._rank_buckets[max(0, min_rank) :], self.ranks, min_rank
+                )
+            )
+        if min_pot is not None or max_pot is not None:
+            low = 0 if min_pot is None else min_pot
+            start = self._pot_position(low)
+            if max_pot is None:
+                end = self.hand_count
+            else:
+                end = max(start, self._pot_position(max_pot + 1))
+            pots = self.pots
+
+            def in_pot_range(hand_id: int) -> bool:
+                return pots[hand_id] >= low and (
+                    max_pot is None or pots[hand_id] <= max_pot
+                )
+
+            def pot_ids() -> Iterable[int]:
+                # Sorting a wide slice costs more than scanning the column.
+                if 2 * (end - start) < self.hand_count:
+                    return sorted(self.pot_order[start:end])
+                return filter(in_pot_range, range(self.hand_count))
+
+            sources.append((end - start, pot_ids, in_pot_range))
+
+        if not sources:
+            candidates: Iterable[int] = range(self.hand_count)
+            checks: List[Callable[[int], bool]] = []
+        else:
+            sources.sort(key=lambda source: source[0])
+            candidates = sources[0][1]()
+            checks = [source[2] for source in sources[1:]]
+
+        results: List[int] = []
+        for hand_id in candidates:
+            if all(check(hand_id) for check in checks):
+                results.append(hand_id)
+                if limit is not None and len(results) >= limit:
+                    break
+        return results
+
+    def _pot_position(self, pot: int) -> int:
+        # First position in ``pot_order`` whose pot is at least ``pot``.
+        order = self.pot_order
+        pots = self.pots
+        low, high = 0, self.hand_count
+        while low < high:
+            middle = (low + high) // 2
+            if pots[order[middle]] < pot:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def replay(self, hand_id: int) -> ReplayResult:
+        return replay_hand(self.get(hand_id))
+
+    def close(self) -> None:
+        for view in (
+            self.offsets,
+            self.pots,
+            self.lengths,
+            self.streets,
+            self.ranks,
+            self.pot_order,
+            *self._street_buckets,
+            *self._rank_buckets,
+            self._data_view,
+            self._index_view,
+        ):
+            view.release()
+        self._data.close()
+        self._index.close()
+        self._data_handle.close()
+        self._index_handle.close()
+
+    def __enter__(self) -> "HandHistoryStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _bucket_source(
+    buckets: Sequence[memoryview], column: memoryview, level: int
+) -> Tuple[int, Callable[[], Iterable[int]], Callable[[int], bool]]:
+    return (
+        sum(len(bucket) for bucket in buckets),
+        lambda: _merged(buckets),
+        lambda hand_id: column[hand_id] >= level,
+    )
+
+
+def _merged(lists: Sequence[memoryview]) -> Iterable[int]:
+    if len(lists) == 1:
+        return lists[0]
+    return _unique(heapq.merge(*lists))
+
+
+def _contains(posting: memoryview, hand_id: int) -> bool:
+    position = bisect.bisect_left(posting, hand_id)
+    return position < len(posting) and posting[position] == hand_id
+
+
+def _unique(sorted_ids: Iterable[int]) -> Iterable[int]:
+    previous = None
+    for hand_id in sorted_ids:
+        if hand_id != previous:
+            yield hand_id
+            previous = hand_id
+
+
+def stacked_deck(record: HandRecord) -> Deck:
+    # Rebuild the deck so the engine deals exactly the recorded cards: hole
+    # cards seat by seat, then the board in flop/turn/river chunks. Unknown
+    # cards go underneath.
+    chunks: List[Sequence] = [list(cards) for cards in record.hole_cards]
+    board = list(record.board)
+    if board:
+        chunks.append(board[:3])
+        chunks.extend([card] for card in board[3:])
+    known = {card for chunk in chunks for card in chunk}
+    rest = [card for card in FULL_DECK if card not in known]
+    ordered = rest + [card for chunk in reversed(chunks) for card in chunk]
+    return Deck.from_cards(ordered)
+
+
+def replay_hand(record: HandRecord) -> ReplayResult:
+    engine = PokerEngine(
+        players=[],
+        starting_stack=0,
+        small_blind=record.small_blind,
+        big_blind=record.big_blind,
+        verbose=False,
+        variant=variant_for_hole_count(
+            max((len(cards) for cards in record.hole_cards), default=0)
+        ),
+    )
+    for player, stack in zip(record.players, record.stacks):
+        engine.add_player(player, stack)
+    engine.dealer_index = record.dealer_index
+    engine.start_hand(deck=stacked_deck(record))
+
+    mismatches: List[str] = []
+    for step, recorded in enumerate(record.actions):
+        state = engine.game_state
+        if state is None or state.street == "showdown":
+            mismatches.append(f"action {step}: hand already finished")
+            break
+        if state.current_player != recorded.player:
+            mismatches.append(
+                f"action {step}: expected {recorded.player} to act, "
+                f"engine has {state.current_player}"
+            )
+            break
+        amount = recorded.raise_to if recorded.action == ActionType.RAISE else None
+        engine.apply_action(recorded.player, Action(recorded.action, amount))
+
+    replayed = engine.last_hand_record
+    if replayed is None:
+        mismatches.append("hand did not finish")
+    else:
+        for name in _REPLAY_FIELDS:
+            if getattr(replayed, name) != getattr(record, name):
+                mismatches.append(f"{name} differs")
+    return ReplayResult(not mismatches, replayed, mismatches)
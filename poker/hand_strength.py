@@ -0,0 +1,469 @@
+"""Hand strength, hand potential and EHS² bucketing.
+
+``hand_features`` measures a Hold'em holding on a board against one random
+opponent hand:
+
+* ``strength`` (HS): share of opponent holdings currently beaten, ties half.
+* ``positive_potential`` / ``negative_potential`` (PPot / NPot): chance of
+  moving from behind to ahead, or from ahead to behind, by the river.
+* ``ehs``: ``HS * (1 - NPot) + (1 - HS) * PPot``.
+* ``ehs2``: mean of the squared river strength over the runouts, which
+  rewards draws and made hands that stay ahead.
+
+``HandBuckets`` does not cluster hands: a bucket is a quantile range of the
+single EHS² number, with boundaries chosen so each bucket is equally likely.
+The offline build (``HandBuckets().build()``) computes EHS² for the 169
+preflop classes and for every hole combo on each of the 1755 suit-isomorphic
+flops and stores their buckets, so preflop and flop buckets are one table
+read. Turn and river buckets are not precomputed: each call runs
+``hand_features`` (every opponent holding, up to ``runouts`` runouts) and
+compares the result with quantile thresholds sampled at build time.
+``BotPlayer`` does not use the buckets; they are for analysis tools.
+"""
+
+from __future__ import annotations
+
+import random
+from array import array
+from bisect import bisect_right
+from collections import Counter
+from dataclasses import dataclass
+from itertools import combinations, permutations
+from math import comb
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .cards import CARD_INDEX, Card
+from .hand_evaluator import evaluate_indices, evaluate_pairs
+from .shared_tables import TableRegistry, get_registry
+from .starting_hands import CLASS_COUNT, class_index_from_indices, combo_count
+
+HAND_STRENGTH_TABLE_VERSION = 1
+DEFAULT_RUNOUTS = 32
+DEFAULT_BUCKET_COUNT = 8
+PREFLOP_BOARDS = 2000
+BOUNDARY_BOARDS = 200
+_HISTOGRAM_BINS = 4096
+
+_COMBOS = tuple((first, second) for first in range(52) for second in range(first))
+COMBO_COUNT = len(_COMBOS)
+_COMBO_INDEX: Dict[Tuple[int, int], int] = {}
+for _position, (_first, _second) in enumerate(_COMBOS):
+    _COMBO_INDEX[_first, _second] = _COMBO_INDEX[_second, _first] = _position
+
+_SUIT_PERMUTATIONS = tuple(permutations(range(4)))
+
+_FLOPS: Optional[List[Tuple[int, ...]]] = None
+_FLOP_WEIGHTS: Optional[List[int]] = None
+_FLOP_LOOKUP: Optional[Dict[Tuple[int, ...], Tuple[int, Tuple[int, ...]]]] = None
+
+
+@dataclass(frozen=True)
+class HandStrength:
+    strength: float
+    positive_potential: float
+    negative_potential: float
+    ehs: float
+    ehs2: float
+
+
+def hand_features(
+    hole_cards: Sequence[Card],
+    board_cards: Sequence[Card],
+    runouts: int = DEFAULT_RUNOUTS,
+    rng: Optional[random.Random] = None,
+) -> HandStrength:
+    # Every opponent holding is enumerated; runouts are enumerated when there
+    # are at most ``runouts`` of them and sampled otherwise.
+    if len(hole_cards) != 2:
+        raise ValueError("hand_features expects two hole cards")
+    if not 3 <= len(board_cards) <= 5:
+        raise ValueError("hand_features expects 3 to 5 board cards")
+    hole = [CARD_INDEX[card] for card in hole_cards]
+    board = [CARD_INDEX[card] for card in board_cards]
+    dead = set(hole + board)
+    live = [index for index in range(52) if index not in dead]
+    opponents = list(combinations(live, 2))
+
+    hero_now = evaluate_indices(hole + board)
+    # 0 = hero ahead, 1 = tied, 2 = behind.
+    now = [
+        0 if hero_now > value else 1 if hero_now == value else 2
+        for value in evaluate_pairs(board, opponents)
+    ]
+    totals = Counter(now)
+    strength = (totals[0] + totals[1] / 2) / len(opponents)
+
+    missing = 5 - len(board)
+    if not missing:
+        return HandStrength(strength, 0.0, 0.0, strength, strength * strength)
+
+    total_runouts = comb(len(live), missing)
+    if total_runouts <= runouts:
+        draws = [list(runout) for runout in combinations(live, missing)]
+    else:
+        sampler = rng or random
+        draws = [sampler.sample(live, missing) for _ in range(runouts)]
+
+    transitions = [[0] * 3 for _ in range(3)]
+    started = [0, 0, 0]
+    squared = 0.0
+    for runout in draws:
+        full_board = board + runout
+        hero_final = evaluate_indices(hole + full_board)
+        blocked = set(runout)
+        live_opponents = [
+            position
+            for position, (first, second) in enumerate(opponents)
+            if first not in blocked and second not in blocked
+        ]
+        finals = evaluate_pairs(
+            full_board, [opponents[position] for position in live_opponents]
+        )
+        beaten = 0.0
+        for position, value in zip(live_opponents, finals):
+            final = 0 if hero_final > value else 1 if hero_final == value else 2
+            transitions[now[position]][final] += 1
+            started[now[position]] += 1
+            beaten += 1.0 if final == 0 else 0.5 if final == 1 else 0.0
+        river_strength = beaten / len(live_opponents)
+        squared += river_strength * river_strength
+
+    behind_total = started[2] + started[1] / 2
+    ahead_total = started[0] + started[1] / 2
+    positive = (
+        (transitions[2][0] + transitions[2][1] / 2 + transitions[1][0] / 2)
+        / behind_total
+        if behind_total
+        else 0.0
+    )
+    negative = (
+        (transitions[0][2] + transitions[0][1] / 2 + transitions[1][2] / 2)
+        / ahead_total
+        if ahead_total
+        else 0.0
+    )
+    ehs = strength * (1 - negative) + (1 - strength) * positive
+    return HandStrength(strength, positive, negative, ehs, squared / len(draws))
+
+
+def board_strengths(
+    board: Sequence[int], live: Sequence[int]
+) -> Tuple[List[Tuple[int, int]], List[float]]:
+    # Each holding is evaluated once; the holdings it beats or ties are read
+    # from value counts, minus the ones sharing one of its cards.
+    pairs = list(combinations(live, 2))
+    values = evaluate_pairs(board, pairs)
+    by_card: List[List[int]] = [[] for _ in range(52)]
+    for (first, second), value in zip(pairs, values):
+        by_card[first].append(value)
+        by_card[second].append(value)
+    overall = _below_and_equal(values)
+    per_card = {card: _below_and_equal(by_card[card]) for card in live}
+    opponents = comb(len(live) - 2, 2)
+    strengths = []
+    for (first, second), value in zip(pairs, values):
+        below, equal = overall[value]
+        first_below, first_equal = per_card[first][value]
+        second_below, second_equal = per_card[second][value]
+        beaten = below - first_below - second_below
+        # The holding itself is in all three counts of equal values.
+        tied = equal - first_equal - second_equal + 1
+        strengths.append((beaten + tied / 2) / opponents)
+    return pairs, strengths
+
+
+def _below_and_equal(values: Sequence[int]) -> Dict[int, Tuple[int, int]]:
+    counts = Counter(values)
+    table = {}
+    below = 0
+    for value in sorted(counts):
+        table[value] = (below, counts[value])
+        below += counts[value]
+    return table
+
+
+def _relabel(cards: Sequence[int], mapping: Sequence[int]) -> Tuple[int, ...]:
+    return tuple(sorted((index & ~3) | mapping[index & 3] for index in cards))
+
+
+def _flop_tables() -> Tuple[
+    List[Tuple[int, ...]],
+    List[int],
+    Dict[Tuple[int, ...], Tuple[int, Tuple[int, ...]]],
+]:
+    # Canonical flops (smallest suit relabelling), how many raw flops each
+    # stands for, and for every raw flop its canonical index and relabelling.
+    global _FLOPS, _FLOP_WEIGHTS, _FLOP_LOOKUP
+    if _FLOP_LOOKUP is None:
+        canonical_of = {}
+        for flop in combinations(range(52), 3):
+            canonical_of[flop] = min(
+                (_relabel(flop, mapping), mapping) for mapping in _SUIT_PERMUTATIONS
+            )
+        flops = sorted({canonical for canonical, _ in canonical_of.values()})
+        position = {flop: index for index, flop in enumerate(flops)}
+        weights = [0] * len(flops)
+        lookup = {}
+        for flop, (canonical, mapping) in canonical_of.items():
+            weights[position[canonical]] += 1
+            lookup[flop] = (position[canonical], mapping)
+        _FLOPS, _FLOP_WEIGHTS, _FLOP_LOOKUP = flops, weights, lookup
+    return _FLOPS, _FLOP_WEIGHTS, _FLOP_LOOKUP
+
+
+def build_preflop_ehs2(
+    boards: int = PREFLOP_BOARDS, rng: Optional[random.Random] = None
+) -> List[float]:
+    # Every sampled five-card board gives a river strength for all holdings
+    # that miss it; averaging their squares per class gives preflop EHS².
+    sampler = rng or random
+    sums = [0.0] * CLASS_COUNT
+    counts = [0] * CLASS_COUNT
+    deck = list(range(52))
+    for _ in range(boards):
+        board = sampler.sample(deck, 5)
+        live = [index for index in deck if index not in board]
+        for (first, second), strength in zip(*board_strengths(board, live)):
+            class_index = class_index_from_indices(first, second)
+            sums[class_index] += strength * strength
+            counts[class_index] += 1
+    return [total / count if count else 0.0 for total, count in zip(sums, counts)]
+
+
+def build_flop_ehs2(
+    runouts: int = DEFAULT_RUNOUTS, rng: Optional[random.Random] = None
+) -> List[float]:
+    # Flop-major. Sampled runouts are shared by every holding on the flop,
+    # suit-isomorphic combos are pooled and combos touching the flop stay 0.
+    sampler = rng or random
+    flops, _, _ = _flop_tables()
+    values: List[float] = []
+    for flop in flops:
+        live = [index for index in range(52) if index not in flop]
+        sums = [0.0] * COMBO_COUNT
+        counts = [0] * COMBO_COUNT
+        for _ in range(runouts):
+            runout = sampler.sample(live, 2)
+            rest = [index for index in live if index not in runout]
+            for pair, strength in zip(*board_strengths(list(flop) + runout, rest)):
+                combo = _COMBO_INDEX[pair]
+                sums[combo] += strength * strength
+                counts[combo] += 1
+
+        stabilizer = [
+            mapping for mapping in _SUIT_PERMUTATIONS if _relabel(flop, mapping) == flop
+        ]
+        if len(stabilizer) > 1:
+            for combo, pair in enumerate(_COMBOS):
+                orbit = {
+                    _COMBO_INDEX[_relabel(pair, mapping)] for mapping in stabilizer
+                }
+                if combo != min(orbit):
+                    continue
+                total = sum(sums[member] for member in orbit)
+                count = sum(counts[member] for member in orbit)
+                for member in orbit:
+                    sums[member], counts[member] = total, count
+
+        # Holdings that collided with every sampled runout fall back to their
+        # strength on the flop itself.
+        pairs, strengths = board_strengths(list(flop), live)
+        for pair, strength in zip(pairs, strengths):
+            combo = _COMBO_INDEX[pair]
+            if not counts[combo]:
+                sums[combo] = strength * strength
+                counts[combo] = 1
+        values.extend(
+            total / count if count else 0.0 for total, count in zip(sums, counts)
+        )
+    return values
+
+
+def _sample_street_ehs2(
+    board_size: int, boards: int, runouts: int, rng: random.Random
+) -> List[float]:
+    values: List[float] = []
+    deck = list(range(52))
+    for _ in range(boards):
+        board = rng.sample(deck, board_size)
+        live = [index for index in deck if index not in board]
+        if board_size == 5:
+            _, strengths = board_strengths(board, live)
+            values.extend(strength * strength for strength in strengths)
+            continue
+        sums: Dict[Tuple[int, int], float] = {}
+        counts: Dict[Tuple[int, int], int] = {}
+        for _ in range(runouts):
+            river = rng.choice(live)
+            rest = [index for index in live if index != river]
+            for pair, strength in zip(*board_strengths(board + [river], rest)):
+                sums[pair] = sums.get(pair, 0.0) + strength * strength
+                counts[pair] = counts.get(pair, 0) + 1
+        values.extend(sums[pair] / counts[pair] for pair in sums)
+    return values
+
+
+def quantile_boundaries(
+    values: Sequence[float],
+    weights: Optional[Sequence[float]],
+    bucket_count: int,
+) -> List[float]:
+    """Cut points splitting EHS² values in [0, 1] into equal-weight buckets."""
+    histogram = [0.0] * _HISTOGRAM_BINS
+    top = _HISTOGRAM_BINS - 1
+    if weights is None:
+        for value in values:
+            histogram[min(top, int(value * _HISTOGRAM_BINS))] += 1.0
+    else:
+        for value, weight in zip(values, weights):
+            histogram[min(top, int(value * _HISTOGRAM_BINS))] += weight
+    total = sum(histogram)
+    boundaries = []
+    covered = 0.0
+    target = 1
+    for bin_index, weight in enumerate(histogram):
+        covered += weight
+        while target < bucket_count and covered >= total * target / bucket_count:
+            boundaries.append((bin_index + 1) / _HISTOGRAM_BINS)
+            target += 1
+    while len(boundaries) < bucket_count - 1:
+        boundaries.append(1.0)
+    return boundaries
+
+
+class HandBuckets:
+    # Bucket 0 holds the weakest situations. Tables are keyed by bucket count
+    # and runouts, built on first use (or by ``build``) and memory-mapped.
+
+    STREETS = ("preflop", "flop", "turn", "river")
+
+    def __init__(
+        self,
+        bucket_count: int = DEFAULT_BUCKET_COUNT,
+        runouts: int = DEFAULT_RUNOUTS,
+        cache_dir: Optional[str] = None,
+        registry: Optional[TableRegistry] = None,
+    ) -> None:
+        if not 2 <= bucket_count <= 255:
+            raise ValueError("bucket_count must be between 2 and 255.")
+        if registry is not None and cache_dir is not None:
+            raise ValueError("Pass either cache_dir or registry, not both.")
+        self.bucket_count = bucket_count
+        self.runouts = runouts
+        self.registry = registry or get_registry(cache_dir)
+        self._preflop_name = "ehs2_preflop"
+        self._flop_name = f"ehs2_flop_{runouts}"
+        self._bounds_name = f"ehs2_bounds_{bucket_count}_{runouts}"
+        self._buckets_name = f"hand_buckets_{bucket_count}_{runouts}"
+        version = HAND_STRENGTH_TABLE_VERSION
+        self.registry.register(
+            self._preflop_name,
+            "f",
+            lambda: build_preflop_ehs2(rng=random.Random(PREFLOP_BOARDS)),
+            version=version,
+        )
+        self.registry.register(
+            self._flop_name,
+            "f",
+            lambda: build_flop_ehs2(runouts, rng=random.Random(runouts)),
+            version=version,
+        )
+        self.registry.register(
+            self._bounds_name, "f", self._build_boundaries, version=version
+        )
+        self.registry.register(
+            self._buckets_name, "B", self._build_buckets, version=version
+        )
+        self._buckets = None
+        self._bounds: Optional[List[List[float]]] = None
+
+    @property
+    def table_names(self) -> List[str]:
+        # In build order: the bucket tables are derived from the EHS² tables.
+        return [
+            self._preflop_name,
+            self._flop_name,
+            self._bounds_name,
+            self._buckets_name,
+        ]
+
+    def build(self, force: bool = False) -> List[str]:
+        return [self.registry.build(name, force=force) for name in self.table_names]
+
+    def boundaries(self, street: str) -> List[float]:
+        if self._bounds is None:
+            self._bounds = [
+                list(row) for row in self.registry.get(self._bounds_name).rows(
+                    self.bucket_count - 1
+                )
+            ]
+        return self._bounds[self.STREETS.index(street)]
+
+    def bucket(self, hole_cards: Sequence[Card], board_cards: Sequence[Card]) -> int:
+        if len(hole_cards) != 2:
+            raise ValueError("Hand buckets are defined for Hold'em holdings only.")
+        board_size = len(board_cards)
+        if board_size in (0, 3):
+            if self._buckets is None:
+                self._buckets = self.registry.get(self._buckets_name).values
+            first, second = (CARD_INDEX[card] for card in hole_cards)
+            if board_size == 0:
+                return self._buckets[class_index_from_indices(first, second)]
+            _, _, lookup = _flop_tables()
+            flop_index, mapping = lookup[
+                tuple(sorted(CARD_INDEX[card] for card in board_cards))
+            ]
+            combo = _COMBO_INDEX[_relabel((first, second), mapping)]
+            return self._buckets[CLASS_COUNT + flop_index * COMBO_COUNT + combo]
+        if board_size not in (4, 5):
+            raise ValueError("Board must have 0, 3, 4 or 5 cards.")
+        # Turn and river: EHS² is computed now and placed against the
+        # quantile thresholds sampled at build time.
+        ehs2 = hand_features(hole_cards, board_cards, runouts=self.runouts).ehs2
+        return bisect_right(self.boundaries(self.STREETS[board_size - 2]), ehs2)
+
+    def _build_boundaries(self) -> List[float]:
+        flops, flop_weights, _ = _flop_tables()
+        preflop = self.registry.get(self._preflop_name).values
+        flop = self.registry.get(self._flop_name).values
+        flop_weight: List[int] = []
+        for cards, weight in zip(flops, flop_weights):
+            flop_weight.extend(
+                0 if first in cards or second in cards else weight
+                for first, second in _COMBOS
+            )
+        rng = random.Random(self.bucket_count * 1000 + self.runouts)
+        bounds = [
+            quantile_boundaries(
+                preflop,
+                [combo_count(index) for index in range(CLASS_COUNT)],
+                self.bucket_count,
+            ),
+            quantile_boundaries(flop, flop_weight, self.bucket_count),
+        ]
+        for board_size in (4, 5):
+            samples = _sample_street_ehs2(
+                board_size, BOUNDARY_BOARDS, self.runouts, rng
+            )
+            bounds.append(quantile_boundaries(samples, None, self.bucket_count))
+        return [value for row in bounds for value in row]
+
+    def _build_buckets(self) -> array:
+        preflop_bounds = self.boundaries("preflop")
+        flop_bounds = self.boundaries("flop")
+        buckets = array(
+            "B",
+            (
+                bisect_right(preflop_bounds, value)
+                for value in self.registry.get(self._preflop_name).values
+            ),
+        )
+        buckets.extend(
+            bisect_right(flop_bounds, value)
+            for value in self.registry.get(self._flop_name).values
+        )
+        return buckets
+
+
+def register_tables(registry: TableRegistry) -> List[str]:
+    return HandBuckets(registry=registry).table_names
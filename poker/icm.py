@@ -0,0 +1,174 @@
+"""Independent Chip Model (ICM) tournament equity."""
+
+from __future__ import annotations
+
+import heapq
+import random
+from math import comb
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+Stacks = Mapping[str, int]
+
+# Exact Malmuth-Harville is used while the number of "already placed" subsets
+# stays below this bound; bigger fields fall back to Monte Carlo.
+DEFAULT_EXACT_STATES = 50_000
+DEFAULT_SAMPLES = 10_000
+
+
+class ICMCalculator:
+    def __init__(
+        self,
+        payouts: Sequence[float],
+        exact_states: int = DEFAULT_EXACT_STATES,
+        samples: int = DEFAULT_SAMPLES,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        if not payouts:
+            raise ValueError("Payout structure cannot be empty.")
+        if any(payout < 0 for payout in payouts):
+            raise ValueError("Payouts cannot be negative.")
+        self.payouts = tuple(float(payout) for payout in payouts)
+        self.exact_states = exact_states
+        self.samples = samples
+        self.rng = rng or random.Random()
+        self._cache: Dict[Tuple[int, ...], Tuple[float, ...]] = {}
+
+    def equities(self, stacks: Stacks) -> Dict[str, float]:
+        alive = [(player, stack) for player, stack in stacks.items() if stack > 0]
+        busted = [player for player, stack in stacks.items() if stack <= 0]
+        if any(stack < 0 for stack in stacks.values()):
+            raise ValueError("Stacks cannot be negative.")
+
+        result: Dict[str, float] = {}
+        # Busted players share the places below every surviving player.
+        if busted:
+            tail = self.payouts[len(alive) : len(alive) + len(busted)]
+            share = sum(tail) / len(busted)
+            for player in busted:
+                result[player] = share
+        if not alive:
+            return result
+
+        # Equity only depends on the multiset of stacks, so the cache key is the
+        # sorted stack tuple and results are mapped back to players by rank.
+        order = sorted(
+            range(len(alive)), key=lambda index: alive[index][1], reverse=True
+        )
+        key = tuple(alive[index][1] for index in order)
+        values = self._cache.get(key)
+        if values is None:
+            values = self._compute(key)
+            self._cache[key] = values
+        for position, index in enumerate(order):
+            result[alive[index][0]] = values[position]
+        return result
+
+    def evaluate_outcomes(self, outcomes: Iterable[Stacks]) -> List[Dict[str, float]]:
+        return [self.equities(outcome) for outcome in outcomes]
+
+    def expected_equity(
+        self, outcomes: Sequence[Stacks], probabilities: Sequence[float]
+    ) -> Dict[str, float]:
+        if len(outcomes) != len(probabilities):
+            raise ValueError("Each outcome needs a probability.")
+        expected: Dict[str, float] = {}
+        evaluated = self.evaluate_outcomes(outcomes)
+        for equities, probability in zip(evaluated, probabilities):
+            for player, value in equities.items():
+                expected[player] = expected.get(player, 0.0) + probability * value
+        return expected
+
+    def allin_equity(
+        self,
+        stacks: Stacks,
+        hero: str,
+        villain: str,
+        win_probability: float,
+        tie_probability: float = 0.0,
+        pot: int = 0,
+    ) -> float:
+        win, lose, tie = allin_outcomes(stacks, hero, villain, pot)
+        lose_probability = max(0.0, 1.0 - win_probability - tie_probability)
+        expected = self.expected_equity(
+            [win, lose, tie], [win_probability, lose_probability, tie_probability]
+        )
+        return expected[hero]
+
+    def _compute(self, stacks: Tuple[int, ...]) -> Tuple[float, ...]:
+        places = min(len(self.payouts), len(stacks))
+        states = sum(comb(len(stacks), placed) for placed in range(places))
+        if states <= self.exact_states:
+            return _malmuth_harville(stacks, self.payouts[:places])
+        return _monte_carlo(stacks, self.payouts[:places], self.samples, self.rng)
+
+
+def allin_outcomes(
+    stacks: Stacks, hero: str, villain: str, pot: int = 0
+) -> Tuple[Dict[str, int], Dict[str, int], Dict[str, int]]:
+    risk = min(stacks[hero], stacks[villain])
+    win = dict(stacks)
+    win[hero] += risk + pot
+    win[villain] -= risk
+    lose = dict(stacks)
+    lose[hero] -= risk
+    lose[villain] += risk + pot
+    tie = dict(stacks)
+    tie[hero] += pot - pot // 2
+    tie[villain] += pot // 2
+    return win, lose, tie
+
+
+def icm_equities(stacks: Stacks, payouts: Sequence[float]) -> Dict[str, float]:
+    return ICMCalculator(payouts).equities(stacks)
+
+
+def _malmuth_harville(
+    stacks: Tuple[int, ...], payouts: Sequence[float]
+) -> Tuple[float, ...]:
+    count = len(stacks)
+    total = sum(stacks)
+    equities = [0.0] * count
+    # layer[mask]: chance that exactly the players in ``mask`` took the
+    # first popcount(mask) places. Processed one place at a time.
+    layer: Dict[int, float] = {0: 1.0}
+    remaining_chips: Dict[int, int] = {0: total}
+    for place, payout in enumerate(payouts):
+        next_layer: Dict[int, float] = {}
+        for mask, probability in layer.items():
+            chips_left = remaining_chips[mask]
+            for player in range(count):
+                bit = 1 << player
+                if mask & bit:
+                    continue
+                share = probability * stacks[player] / chips_left
+                equities[player] += share * payout
+                if place + 1 < len(payouts):
+                    next_mask = mask | bit
+                    next_layer[next_mask] = next_layer.get(next_mask, 0.0) + share
+                    remaining_chips[next_mask] = chips_left - stacks[player]
+        layer = next_layer
+    return tuple(equities)
+
+
+def _monte_carlo(
+    stacks: Tuple[int, ...],
+    payouts: Sequence[float],
+    samples: int,
+    rng: random.Random,
+) -> Tuple[float, ...]:
+    # Harville finishing orders can be sampled directly: give every player an
+    # exponential clock with rate equal to their stack and finish them in
+    # order of arrival. The first arrival is player i with probability
+    # stack_i / total, and memorylessness makes each later place follow the
+    # same rule among the players left.
+    count = len(stacks)
+    totals = [0.0] * count
+    places = len(payouts)
+    expovariate = rng.expovariate
+    players = range(count)
+    for _ in range(samples):
+        clocks = [expovariate(stack) for stack in stacks]
+        finishers = heapq.nsmallest(places, players, key=clocks.__getitem__)
+        for place, player in enumerate(finishers):
+            totals[player] += payouts[place]
+    return tuple(total / samples for total in totals)
@@ -1,41 +1,44 @@
-"""Monte Carlo equity estimation for Texas Hold'em."""
+"""Monte Carlo equity estimation for Texas Hold'em and Omaha."""
 
 from __future__ import annotations
 
 import random
 
-from poker.cards import Card, RANKS, SUITS
-from poker.hand_evaluator import evaluate_hand
+from typing import Callable, Optional, Sequence
+
+from poker.cards import CARD_INDEX, Card
+from poker.hand_evaluator import evaluate_holding, evaluate_indices
+from poker.starting_hands import class_index_from_indices
 
 
 def estimate_equity(
     hero_cards: list[Card],
     board_cards: list[Card],
     iterations: int = 300,
+    evaluator: Callable[[Sequence[int], Sequence[int]], int] = evaluate_holding,
 ) -> float:
     if iterations <= 0:
         return 0.0
 
-    used_cards = {(card.rank, card.suit) for card in hero_cards + board_cards}
-    deck = [
-        Card(rank=rank, suit=suit)
-        for rank in RANKS
-        for suit in SUITS
-        if (rank, suit) not in used_cards
-    ]
+    hero = [CARD_INDEX[card] for card in hero_cards]
+    board = [CARD_INDEX[card] for card in board_cards]
+    used_cards = set(hero + board)
+    deck = [index for index in range(52) if index not in used_cards]
 
     wins = 0
     ties = 0
     missing_board = max(0, 5 - len(board_cards))
+    # The opponent holds as many cards as the hero (two in Hold'em, four in PLO).
+    hole_count = len(hero)
 
     for _ in range(iterations):
-        drawn = random.sample(deck, 2 + missing_board)
-        opponent_cards = drawn[:2]
-        board_fill = drawn[2:]
-        full_board = list(board_cards) + board_fill
+        drawn = random.sample(deck, hole_count + missing_board)
+        opponent_cards = drawn[:hole_count]
+        board_fill = drawn[hole_count:]
+        full_board = board + board_fill
 
-        hero_score = evaluate_hand(hero_cards + full_board)
-        opponent_score = evaluate_hand(opponent_cards + full_board)
+        hero_score = evaluator(hero, full_board)
+        opponent_score = evaluator(opponent_cards, full_board)
 
         if hero_score > opponent_score:
             wins += 1
@@ -43,3 +46,53 @@ def estimate_equity(
             ties += 1
 
     return (wins + 0.5 * ties) / iterations
+
+
+def estimate_equity_weighted(
+    hero_cards: list[Card],
+    board_cards: list[Card],
+    opponent_weights: Sequence[Optional[Sequence[float]]],
+    iterations: int = 300,
+) -> float:
+    # Opponent hands are dealt uniformly and each trial is weighted by the
+    # product of their class weights (``None`` is a uniform range), so ranges
+    # are never expanded into combos.
+    if iterations <= 0 or not opponent_weights:
+        return 0.0
+
+    hero = [CARD_INDEX[card] for card in hero_cards]
+    board = [CARD_INDEX[card] for card in board_cards]
+    used_cards = set(hero + board)
+    deck = [index for index in range(52) if index not in used_cards]
+    missing_board = max(0, 5 - len(board_cards))
+    opponents = len(opponent_weights)
+
+    won = 0.0
+    total = 0.0
+    for _ in range(iterations):
+        drawn = random.sample(deck, 2 * opponents + missing_board)
+        weight = 1.0
+        for opponent, weights in enumerate(opponent_weights):
+            if weights is not None:
+                first, second = drawn[2 * opponent], drawn[2 * opponent + 1]
+                weight *= weights[class_index_from_indices(first, second)]
+        if weight == 0.0:
+            continue
+        full_board = board + drawn[2 * opponents :]
+        hero_score = evaluate_indices(hero + full_board)
+        best = 0
+        tied = 0
+        for opponent in range(opponents):
+            hole = drawn[2 * opponent : 2 * opponent + 2]
+            score = evaluate_indices(hole + full_board)
+            if score > best:
+                best, tied = score, 1
+            elif score == best:
+                tied += 1
+        if hero_score > best:
+            won += weight
+        elif hero_score == best:
+            won += weight / (tied + 1)
+        total += weight
+
+    return won / total if total else 0.0
@@ -0,0 +1,157 @@
+"""Per-opponent tendencies and the hand ranges they imply.
+
+``OpponentModel`` counts, for every player it has watched, how often they
+voluntarily enter the pot, raise preflop and bet or raise after the flop.
+Counters are updated once per finished hand. The smoothed VPIP and PFR rates
+are turned into soft ranges over the 169 preflop classes: classes are ranked
+by strength and weighted by a logistic cut at the player's rate, so a 20%
+VPIP player mostly holds the top 20% of combos. The weight vectors are cached
+per player and only rebuilt after that player's counters change.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .action_log import CALL, PREFLOP, RAISE, ActionLog
+from .game_state import GameState
+from .hand_history import HandRecord
+from .players.preflop_tables import class_strength_order
+from .starting_hands import CLASS_COUNT, combo_count
+
+DEFAULT_PRIOR_HANDS = 20
+DEFAULT_PRIOR_VPIP = 0.3
+DEFAULT_PRIOR_PFR = 0.12
+# Width of the logistic edge of a range, as a fraction of all combos.
+DEFAULT_RANGE_SOFTNESS = 0.04
+
+RANGE_VPIP = "vpip"
+RANGE_PFR = "pfr"
+
+
+_CLASS_PERCENTILES: Optional[List[float]] = None
+
+
+def _class_percentiles() -> List[float]:
+    # Position of each class's combos in the strength order, as the fraction
+    # of all 1326 combos ranked above the middle of the class.
+    global _CLASS_PERCENTILES
+    if _CLASS_PERCENTILES is None:
+        percentiles = [0.0] * CLASS_COUNT
+        covered = 0
+        for class_index in class_strength_order():
+            size = combo_count(class_index)
+            percentiles[class_index] = (covered + size / 2) / 1326
+            covered += size
+        _CLASS_PERCENTILES = percentiles
+    return _CLASS_PERCENTILES
+
+
+def range_weights(
+    width: float, softness: float = DEFAULT_RANGE_SOFTNESS
+) -> List[float]:
+    weights = []
+    for percentile in _class_percentiles():
+        exponent = (percentile - width) / softness
+        weights.append(0.0 if exponent > 50 else 1.0 / (1.0 + math.exp(exponent)))
+    return weights
+
+
+@dataclass
+class OpponentTendencies:
+    hands: int = 0
+    vpip: int = 0
+    pfr: int = 0
+    postflop_raises: int = 0
+    postflop_calls: int = 0
+
+    def vpip_rate(self, prior_hands: int, prior: float = DEFAULT_PRIOR_VPIP) -> float:
+        return (self.vpip + prior * prior_hands) / (self.hands + prior_hands)
+
+    def pfr_rate(self, prior_hands: int, prior: float = DEFAULT_PRIOR_PFR) -> float:
+        return (self.pfr + prior * prior_hands) / (self.hands + prior_hands)
+
+    @property
+    def aggression_factor(self) -> float:
+        # One pseudo-call keeps the factor finite for players who never call.
+        return self.postflop_raises / (self.postflop_calls + 1)
+
+
+class OpponentModel:
+    def __init__(
+        self,
+        prior_hands: int = DEFAULT_PRIOR_HANDS,
+        softness: float = DEFAULT_RANGE_SOFTNESS,
+    ) -> None:
+        self.prior_hands = prior_hands
+        self.softness = softness
+        self.tendencies: Dict[str, OpponentTendencies] = {}
+        self._ranges: Dict[Tuple[str, str], List[float]] = {}
+
+    def attach(self, engine) -> None:
+        engine.hand_listeners.append(self.update)
+
+    def observe(self, players: Sequence[str], log: ActionLog) -> None:
+        vpip = [False] * len(players)
+        pfr = [False] * len(players)
+        raises = [0] * len(players)
+        calls = [0] * len(players)
+        for seat, street, action, amount in zip(
+            log.seats, log.streets, log.actions, log.amounts
+        ):
+            if street == PREFLOP:
+                if action == RAISE:
+                    vpip[seat] = pfr[seat] = True
+                elif action == CALL and amount > 0:
+                    vpip[seat] = True
+            elif action == RAISE:
+                raises[seat] += 1
+            elif action == CALL:
+                calls[seat] += 1
+        for seat, player in enumerate(players):
+            tendencies = self.tendencies.setdefault(player, OpponentTendencies())
+            tendencies.hands += 1
+            tendencies.vpip += vpip[seat]
+            tendencies.pfr += pfr[seat]
+            tendencies.postflop_raises += raises[seat]
+            tendencies.postflop_calls += calls[seat]
+            self._ranges.pop((player, RANGE_VPIP), None)
+            self._ranges.pop((player, RANGE_PFR), None)
+
+    def update(self, record: HandRecord) -> None:
+        self.observe(record.players, ActionLog.from_record(record))
+
+    # Engines call their hand listeners with the finished record.
+    __call__ = update
+
+    def range_for(self, player: str, kind: str = RANGE_VPIP) -> List[float]:
+        key = (player, kind)
+        weights = self._ranges.get(key)
+        if weights is None:
+            tendencies = self.tendencies.get(player, OpponentTendencies())
+            if kind == RANGE_PFR:
+                width = tendencies.pfr_rate(self.prior_hands)
+            else:
+                width = tendencies.vpip_rate(self.prior_hands)
+            weights = range_weights(width, self.softness)
+            self._ranges[key] = weights
+        return weights
+
+    def weights_for(self, player: str, game_state: GameState) -> Optional[List[float]]:
+        # Preflop raisers get their PFR range and callers their VPIP range;
+        # players who only posted a blind stay uniform (``None``).
+        if player not in game_state.players:
+            return None
+        seat = game_state.players.index(player)
+        log = game_state.action_log
+        called = False
+        for position in range(len(log)):
+            if log.seats[position] != seat or log.streets[position] != PREFLOP:
+                continue
+            if log.actions[position] == RAISE:
+                return self.range_for(player, RANGE_PFR)
+            if log.actions[position] == CALL and log.amounts[position] > 0:
+                called = True
+        return self.range_for(player, RANGE_VPIP) if called else None
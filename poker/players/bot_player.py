@@ -1,11 +1,35 @@
 """Bot player implementation."""
 
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional
+
 from poker.actions import Action, ActionType
-from poker.cards import Card, RANKS, SUITS
+from poker.cards import CARD_INDEX, Card, RANKS, SUITS
 from poker.game_state import GameState
-from poker.hand_evaluator import HIGH_CARD, ONE_PAIR, TWO_PAIR, evaluate_hand
-from poker.monte_carlo import estimate_equity
+from poker.hand_evaluator import (
+    HIGH_CARD,
+    ONE_PAIR,
+    TWO_PAIR,
+    evaluate_indices,
+    evaluate_omaha,
+    hand_category,
+)
+from poker.monte_carlo import estimate_equity, estimate_equity_weighted
 from poker.players.base_player import BasePlayer
+from poker.players.preflop_tables import get_preflop_table, position_index
+from poker.starting_hands import hand_class_index
+
+if TYPE_CHECKING:
+    # Only needed for annotations; importing them would pull in threading,
+    # the shared table cache and the opponent model at startup.
+    from poker.equity_service import EquityService
+    from poker.opponent_model import OpponentModel
+    from poker.pushfold import PushFoldChart
+
+
+# Monte Carlo trials behind each postflop equity estimate.
+DEFAULT_EQUITY_ITERATIONS = 300
 
 
 class BotPlayer(BasePlayer):
@@ -42,14 +66,37 @@ class BotPlayer(BasePlayer):
         },
     }
 
-    def __init__(self, player_id: str, style: str = "balanced") -> None:
+    def __init__(
+        self,
+        player_id: str,
+        style: str = "balanced",
+        preflop_overrides: Optional[str] = None,
+        pushfold_chart: Optional[PushFoldChart] = None,
+        equity_service: Optional[EquityService] = None,
+        opponent_model: Optional[OpponentModel] = None,
+        equity_iterations: int = DEFAULT_EQUITY_ITERATIONS,
+    ) -> None:
         super().__init__(player_id)
         self.style = style
         self.style_profile = self.STYLE_PROFILES.get(
             style, self.STYLE_PROFILES["balanced"]
         )
+        self.preflop_table = get_preflop_table(
+            style, self.style_profile, preflop_overrides
+        )
+        self.pushfold_chart = pushfold_chart
+        self.equity_service = equity_service
+        self.opponent_model = opponent_model
+        self.equity_iterations = equity_iterations
 
     def decide(self, game_state: GameState):
+        action = self._decide(game_state)
+        limit = game_state.max_raise_to(self.id)
+        if action.type == ActionType.RAISE and limit is not None:
+            action = Action(ActionType.RAISE, min(action.amount, limit))
+        return action
+
+    def _decide(self, game_state: GameState):
         legal_types = set(self._get_legal_actions())
 
         hole_cards = game_state.hands.get(self.id, [])
@@ -60,8 +107,17 @@ class BotPlayer(BasePlayer):
             return self._decide_preflop(hole_cards, legal_types, game_state)
 
         combined = hole_cards + game_state.board
-        filled = self._complete_to_seven_cards(combined)
-        hand_rank = evaluate_hand(filled)[0]
+        if len(hole_cards) == 4:
+            hand_rank = hand_category(
+                evaluate_omaha(
+                    [CARD_INDEX[card] for card in hole_cards],
+                    [CARD_INDEX[card] for card in game_state.board],
+                )
+            )
+        else:
+            hand_rank = hand_category(
+                evaluate_indices([CARD_INDEX[card] for card in combined])
+            )
         call_amount = game_state.to_call(self.id)
         raise_to = self._default_raise_to(game_state)
         aggression = self.style_profile["aggression"]
@@ -72,7 +128,9 @@ class BotPlayer(BasePlayer):
                 legal_types, ActionType.CHECK, fallback=ActionType.CALL
             )
         if hand_rank == ONE_PAIR:
-            equity = estimate_equity(hole_cards, game_state.board, iterations=300)
+            equity = self._estimate_equity(
+                hole_cards, game_state.board, self.equity_iterations, game_state
+            )
             pot_odds = self.calculate_pot_odds(game_state, call_amount)
             effective_equity = equity + self.style_profile["equity_threshold_modifier"]
             if effective_equity >= pot_odds:
@@ -85,7 +143,9 @@ class BotPlayer(BasePlayer):
                 combined
             )
             if has_draw:
-                equity = estimate_equity(hole_cards, game_state.board, iterations=300)
+                equity = self._estimate_equity(
+                    hole_cards, game_state.board, self.equity_iterations, game_state
+                )
                 pot_odds = self.calculate_pot_odds(game_state, call_amount)
                 effective_equity = equity + self.style_profile["equity_threshold_modifier"]
                 if effective_equity >= pot_odds:
@@ -96,6 +156,30 @@ class BotPlayer(BasePlayer):
 
         return self._pick_action(legal_types, ActionType.CHECK)
 
+    def _estimate_equity(
+        self, hole_cards, board, iterations: int, game_state: GameState
+    ) -> float:
+        if self.opponent_model is not None and len(hole_cards) == 2:
+            narrowed = [
+                weights
+                for weights in (
+                    self.opponent_model.weights_for(player, game_state)
+                    for player in game_state.players
+                    if player != self.id and player in game_state.players_in_hand
+                )
+                if weights is not None
+            ]
+            # Heads-up like the default estimate, so the style thresholds keep
+            # their meaning: against the tightest narrowed range, or against
+            # one random hand when nobody's range is narrowed yet.
+            if narrowed:
+                return estimate_equity_weighted(
+                    hole_cards, board, [min(narrowed, key=sum)], iterations=iterations
+                )
+        if self.equity_service is not None:
+            return self.equity_service.estimate(hole_cards, board, iterations)
+        return estimate_equity(hole_cards, board, iterations=iterations)
+
     def _get_legal_actions(self):
         if self.engine and hasattr(self.engine, "get_legal_actions"):
             return self.engine.get_legal_actions(self.id)
@@ -123,69 +207,86 @@ class BotPlayer(BasePlayer):
         return False
 
     def _decide_preflop(self, hole_cards, legal_types, game_state):
-        ranks = [card.rank for card in hole_cards]
-        rank_set = frozenset(ranks)
-        raise_to = self._default_raise_to(game_state)
-        preflop_tightness = self.style_profile["preflop_tightness"]
-        aggression = self.style_profile["aggression"]
-
-        strong_pairs = {"A", "K", "Q", "J"}
-        medium_pairs = {"10", "9", "8"}
-        strong_offsuit = {frozenset({"A", "K"})}
-        medium_offsuit = {
-            frozenset({"A", "Q"}),
-            frozenset({"A", "J"}),
-            frozenset({"K", "Q"}),
-        }
-
-        if len(rank_set) == 1:
-            pair_rank = ranks[0]
-            if pair_rank in strong_pairs:
-                if aggression >= 0.5:
-                    return self._pick_action(legal_types, ActionType.RAISE, amount=raise_to)
-                return self._pick_action(
-                    legal_types, ActionType.CHECK, fallback=ActionType.CALL
-                )
-            if pair_rank in medium_pairs:
-                if preflop_tightness >= 0.6:
-                    return self._pick_action(legal_types, ActionType.FOLD)
-                return self._pick_action(
-                    legal_types, ActionType.CHECK, fallback=ActionType.CALL
-                )
-            return self._pick_action(legal_types, ActionType.FOLD)
-
-        if rank_set in strong_offsuit:
-            if aggression >= 0.5:
-                return self._pick_action(legal_types, ActionType.RAISE, amount=raise_to)
-            return self._pick_action(legal_types, ActionType.CHECK, fallback=ActionType.CALL)
-        if rank_set in medium_offsuit:
-            if preflop_tightness >= 0.6:
-                return self._pick_action(legal_types, ActionType.FOLD)
-            return self._pick_action(legal_types, ActionType.CHECK, fallback=ActionType.CALL)
-
+        if len(hole_cards) == 4:
+            return self._decide_omaha_preflop(hole_cards, legal_types, game_state)
+        if self.pushfold_chart is not None:
+            action = self._decide_push_fold(hole_cards, legal_types, game_state)
+            if action is not None:
+                return action
+        seat = game_state.players.index(self.id)
+        action, size = self.preflop_table.lookup(
+            position_index(seat, game_state.dealer_index, len(game_state.players)),
+            hand_class_index(hole_cards),
+            facing_raise=game_state.current_bet > game_state.big_blind,
+        )
+        # One table-driven raise per hand: once the bot has raised preflop,
+        # re-raise entries only call, so two bots cannot raise each other
+        # all-in from their tables.
+        if action == ActionType.RAISE and game_state.action_log.count(
+            seat, ActionType.RAISE, "preflop"
+        ):
+            action = ActionType.CALL
+        if action == ActionType.RAISE:
+            raise_to = self._sized_raise_to(game_state, size)
+            return self._pick_action(legal_types, ActionType.RAISE, amount=raise_to)
+        if action == ActionType.CALL:
+            return self._pick_action(
+                legal_types, ActionType.CHECK, fallback=ActionType.CALL
+            )
         return self._pick_action(legal_types, ActionType.FOLD)
 
-    def _complete_to_seven_cards(self, cards):
-        if len(cards) >= 7:
-            return cards[:7]
+    def _decide_omaha_preflop(self, hole_cards, legal_types, game_state):
+        # The Hold'em class tables do not apply to four-card hands; judge the
+        # hand by its equity against one random holding instead.
+        equity = self._estimate_equity(
+            hole_cards, [], self.equity_iterations // 2, game_state
+        )
+        play_threshold = 0.48 + 0.12 * (self.style_profile["preflop_tightness"] - 0.5)
+        raise_threshold = play_threshold + 0.12 * (1 - self.style_profile["aggression"])
+        if equity >= raise_threshold:
+            raise_to = game_state.max_raise_to(self.id) or self._default_raise_to(
+                game_state
+            )
+            return self._pick_action(legal_types, ActionType.RAISE, amount=raise_to)
+        if equity >= play_threshold:
+            return self._pick_action(
+                legal_types, ActionType.CHECK, fallback=ActionType.CALL
+            )
+        return self._pick_action(legal_types, ActionType.FOLD)
 
-        existing = {(card.rank, card.suit) for card in cards}
-        existing_ranks = {card.rank for card in cards}
-        filled = list(cards)
+    def _decide_push_fold(self, hole_cards, legal_types, game_state):
+        if len(game_state.players_in_hand) != 2 or game_state.big_blind <= 0:
+            return None
+        opponent = next(
+            player for player in game_state.players_in_hand if player != self.id
+        )
+        my_total = game_state.stacks[self.id] + game_state.bets.get(self.id, 0)
+        opponent_total = game_state.stacks[opponent] + game_state.bets.get(opponent, 0)
+        stack_bb = min(my_total, opponent_total) / game_state.big_blind
+        if stack_bb > self.pushfold_chart.max_stack:
+            return None
 
-        for rank in RANKS:
-            if rank in existing_ranks:
-                continue
-            for suit in SUITS:
-                candidate = (rank, suit)
-                if candidate in existing:
-                    continue
-                filled.append(Card(rank=rank, suit=suit))
-                existing.add(candidate)
-                if len(filled) == 7:
-                    return filled
+        class_index = hand_class_index(hole_cards)
+        my_bet = game_state.bets.get(self.id, 0)
+        if (
+            game_state.current_bet <= game_state.big_blind
+            and my_bet < game_state.big_blind
+        ):
+            if not self.pushfold_chart.should_push(class_index, stack_bb):
+                return self._pick_action(legal_types, ActionType.FOLD)
+            if my_total > game_state.current_bet:
+                return self._pick_action(legal_types, ActionType.RAISE, amount=my_total)
+            return self._pick_action(legal_types, ActionType.CALL)
 
-        return filled
+        facing_shove = (
+            opponent in game_state.all_in_players
+            or game_state.bets.get(opponent, 0) >= my_total
+        )
+        if facing_shove:
+            if self.pushfold_chart.should_call(class_index, stack_bb):
+                return self._pick_action(legal_types, ActionType.CALL)
+            return self._pick_action(legal_types, ActionType.FOLD)
+        return None
 
     def _pick_action(self, legal_types, primary, amount=None, fallback=None):
         if primary in legal_types:
@@ -198,6 +299,12 @@ class BotPlayer(BasePlayer):
             return Action(ActionType.CALL)
         return Action(ActionType.FOLD)
 
+    def _sized_raise_to(self, game_state: GameState, size: float) -> int:
+        return max(
+            game_state.current_bet + game_state.big_blind,
+            int(game_state.current_bet * size),
+        )
+
     def _default_raise_to(self, game_state: GameState) -> int:
         if game_state.current_bet > 0:
             return max(
@@ -0,0 +1,222 @@
+"""Compiled preflop decision tables for bot players."""
+
+from __future__ import annotations
+
+import json
+import math
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from poker.actions import ActionType
+from poker.cards import RANKS
+from poker.starting_hands import (
+    CLASS_COUNT,
+    class_ranks,
+    combo_count,
+    is_pair,
+    is_suited,
+    parse_hand_class,
+)
+
+POSITIONS = ("EP", "MP", "CO", "BTN", "SB", "BB")
+POSITION_INDEX = {name: index for index, name in enumerate(POSITIONS)}
+
+# How much wider than the style baseline each position plays.
+POSITION_WIDTH = {"EP": 0.6, "MP": 0.8, "CO": 1.0, "BTN": 1.4, "SB": 0.9, "BB": 1.0}
+
+# Unraised pot (blinds and limpers only) vs. facing a raise.
+SITUATIONS = ("open", "facing_raise")
+SITUATION_INDEX = {name: index for index, name in enumerate(SITUATIONS)}
+# Share of the opening-raise range that re-raises.
+RERAISE_WIDTH = 0.5
+
+PreflopEntry = Tuple[ActionType, float]
+
+_CHEN_HIGH_CARD = {"A": 10.0, "K": 8.0, "Q": 7.0, "J": 6.0}
+_RANK_ORDER = {rank: index for index, rank in enumerate(RANKS)}
+_ACTION_NAMES = {
+    "fold": ActionType.FOLD,
+    "call": ActionType.CALL,
+    "check": ActionType.CALL,
+    "raise": ActionType.RAISE,
+}
+_TABLE_CACHE: Dict[Tuple[object, ...], "PreflopTable"] = {}
+
+
+class PreflopTable:
+    def __init__(self, style: str, entries: List[PreflopEntry]) -> None:
+        if len(entries) != len(SITUATIONS) * len(POSITIONS) * CLASS_COUNT:
+            raise ValueError("Preflop table has the wrong number of entries.")
+        self.style = style
+        self.entries = entries
+
+    def lookup(
+        self, position_index: int, class_index: int, facing_raise: bool = False
+    ) -> PreflopEntry:
+        offset = len(POSITIONS) * CLASS_COUNT if facing_raise else 0
+        return self.entries[offset + position_index * CLASS_COUNT + class_index]
+
+
+def chen_score(class_index: int) -> float:
+    high, low = class_ranks(class_index)
+    score = _CHEN_HIGH_CARD[high] if high in _CHEN_HIGH_CARD else int(high) / 2
+    if is_pair(class_index):
+        return max(5.0, score * 2)
+    if is_suited(class_index):
+        score += 2
+    gap = _RANK_ORDER[high] - _RANK_ORDER[low] - 1
+    score -= (0, 1, 2, 4)[gap] if gap < 4 else 5
+    if gap <= 1 and _RANK_ORDER[high] < _RANK_ORDER["Q"]:
+        score += 1
+    return float(math.ceil(score))
+
+
+def class_strength_order() -> List[int]:
+    return sorted(
+        range(CLASS_COUNT),
+        key=lambda index: (-chen_score(index), combo_count(index), index),
+    )
+
+
+def compile_preflop_table(
+    style: str,
+    profile: Mapping[str, float],
+    overrides: Optional[Mapping[str, object]] = None,
+) -> PreflopTable:
+    tightness = profile["preflop_tightness"]
+    aggression = profile["aggression"]
+    raise_size = round(2.0 + aggression, 2)
+    base_width = 0.45 * (1.0 - tightness) ** 1.5
+
+    # Percentile of the 1326 combos at which each class starts, strongest first.
+    percentile = [0.0] * CLASS_COUNT
+    covered = 0
+    for class_index in class_strength_order():
+        covered += combo_count(class_index)
+        percentile[class_index] = covered / 1326
+
+    entries: List[PreflopEntry] = []
+    for situation in SITUATIONS:
+        for position in POSITIONS:
+            play_width = min(1.0, base_width * POSITION_WIDTH[position])
+            raise_width = play_width * aggression
+            if situation == "facing_raise":
+                # Against a raise only the opening-raise range continues, and
+                # just its top re-raises.
+                play_width = max(raise_width, play_width * 0.5)
+                raise_width = raise_width * RERAISE_WIDTH
+            for class_index in range(CLASS_COUNT):
+                if percentile[class_index] <= raise_width:
+                    entries.append((ActionType.RAISE, raise_size))
+                elif percentile[class_index] <= play_width:
+                    entries.append((ActionType.CALL, 0.0))
+                else:
+                    entries.append((ActionType.FOLD, 0.0))
+
+    if overrides:
+        _apply_overrides(entries, overrides, raise_size)
+    return PreflopTable(style, entries)
+
+
+def load_preflop_overrides(path: str) -> Dict[str, Mapping[str, object]]:
+    with open(path, "r", encoding="utf-8") as handle:
+        data = json.load(handle)
+    if not isinstance(data, dict):
+        raise ValueError("Preflop override file must contain a JSON object.")
+    return data
+
+
+def get_preflop_table(
+    style: str,
+    profile: Mapping[str, float],
+    overrides_path: Optional[str] = None,
+) -> PreflopTable:
+    key = (style, tuple(sorted(profile.items())), overrides_path)
+    table = _TABLE_CACHE.get(key)
+    if table is None:
+        overrides = None
+        if overrides_path is not None:
+            overrides = load_preflop_overrides(overrides_path).get(style)
+        table = compile_preflop_table(style, profile, overrides)
+        _TABLE_CACHE[key] = table
+    return table
+
+
+def position_index(seat: int, dealer_index: int, player_count: int) -> int:
+    offset = (seat - dealer_index) % player_count
+    if player_count == 2:
+        return POSITION_INDEX["SB"] if offset == 0 else POSITION_INDEX["BB"]
+    if offset == 0:
+        return POSITION_INDEX["BTN"]
+    if offset == 1:
+        return POSITION_INDEX["SB"]
+    if offset == 2:
+        return POSITION_INDEX["BB"]
+    seats_to_button = player_count - offset
+    if seats_to_button == 1:
+        return POSITION_INDEX["CO"]
+    if seats_to_button == 2:
+        return POSITION_INDEX["MP"]
+    return POSITION_INDEX["EP"]
+
+
+def _apply_overrides(
+    entries: List[PreflopEntry],
+    overrides: Mapping[str, object],
+    default_size: float,
+) -> None:
+    # Override format: {"<position or *>": {"<class>": "fold" | "call" |
+    # {"action": "raise", "size": 2.5}}}, plus optionally the same mapping
+    # under "facing_raise" for spots where the pot has already been raised.
+    facing_raise = overrides.get("facing_raise", {})
+    if not isinstance(facing_raise, Mapping):
+        raise ValueError("Overrides for facing_raise must be an object.")
+    unraised = {
+        position: hands
+        for position, hands in overrides.items()
+        if position != "facing_raise"
+    }
+    _apply_situation_overrides(
+        entries, unraised, default_size, SITUATION_INDEX["open"]
+    )
+    _apply_situation_overrides(
+        entries, facing_raise, default_size, SITUATION_INDEX["facing_raise"]
+    )
+
+
+def _apply_situation_overrides(
+    entries: List[PreflopEntry],
+    overrides: Mapping[str, object],
+    default_size: float,
+    situation: int,
+) -> None:
+    offset = situation * len(POSITIONS) * CLASS_COUNT
+    for position, hands in overrides.items():
+        if position == "*":
+            positions = range(len(POSITIONS))
+        elif position in POSITION_INDEX:
+            positions = [POSITION_INDEX[position]]
+        else:
+            raise ValueError(f"Unknown preflop position: {position}")
+        if not isinstance(hands, Mapping):
+            raise ValueError(f"Overrides for {position} must be an object.")
+        for hand, spec in hands.items():
+            class_index = parse_hand_class(hand)
+            entry = _parse_entry(spec, default_size)
+            for pos in positions:
+                entries[offset + pos * CLASS_COUNT + class_index] = entry
+
+
+def _parse_entry(spec: object, default_size: float) -> PreflopEntry:
+    if isinstance(spec, str):
+        action_name, size = spec, default_size
+    elif isinstance(spec, Mapping):
+        action_name = str(spec.get("action", ""))
+        size = float(spec.get("size", default_size))
+    else:
+        raise ValueError(f"Invalid preflop override: {spec!r}")
+    action = _ACTION_NAMES.get(action_name.lower())
+    if action is None:
+        raise ValueError(f"Unknown preflop action: {action_name}")
+    if action != ActionType.RAISE:
+        size = 0.0
+    return (action, size)
@@ -0,0 +1,312 @@
+"""Heads-up push/fold equilibrium charts.
+
+The solver works on the 169 preflop hand classes. It needs two 169x169
+tables: the all-in equity of every class against every other class, and the
+number of card-disjoint combo pairs for each class pair (used as the joint
+probability of being dealt that matchup). The equity table is a Monte Carlo
+estimate that is built once and cached on disk.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+from bisect import bisect_left
+from operator import add, mul, sub
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .hand_evaluator import evaluate_indices
+from .shared_tables import TableRegistry, get_registry
+from .starting_hands import CLASS_COUNT, class_index_from_indices
+
+EQUITY_TABLE_VERSION = 1
+DEFAULT_EQUITY_SAMPLES = 3000
+DEFAULT_STACKS = tuple(float(stack) for stack in range(1, 21))
+
+_PAIR_COUNTS: Optional[List[List[int]]] = None
+
+
+def combo_pair_counts() -> List[List[int]]:
+    global _PAIR_COUNTS
+    if _PAIR_COUNTS is None:
+        combos = [(first, second) for first in range(52) for second in range(first)]
+        class_of = [class_index_from_indices(first, second) for first, second in combos]
+        class_sizes = [0] * CLASS_COUNT
+        for class_index in class_of:
+            class_sizes[class_index] += 1
+        by_card: List[List[int]] = [[] for _ in range(52)]
+        for position, (first, second) in enumerate(combos):
+            by_card[first].append(position)
+            by_card[second].append(position)
+
+        counts = [[0] * CLASS_COUNT for _ in range(CLASS_COUNT)]
+        for position, (first, second) in enumerate(combos):
+            row = counts[class_of[position]]
+            blocked = [0] * CLASS_COUNT
+            for other in set(by_card[first] + by_card[second]):
+                blocked[class_of[other]] += 1
+            for class_index in range(CLASS_COUNT):
+                row[class_index] += class_sizes[class_index] - blocked[class_index]
+        _PAIR_COUNTS = counts
+    return _PAIR_COUNTS
+
+
+def build_preflop_equity_table(
+    samples: int = DEFAULT_EQUITY_SAMPLES,
+    rng: Optional[random.Random] = None,
+) -> List[List[float]]:
+    # Every sampled board yields one observation for all 169x169 matchups:
+    # each class draws one combo for the row role and one for the column role
+    # among the combos the board leaves live. Because the number of live
+    # combos depends on the board, each observation is importance-weighted by
+    # live_row * live_col so the estimate is unbiased for a uniform deal.
+    sampler = rng or random
+    class_combos: List[List[tuple]] = [[] for _ in range(CLASS_COUNT)]
+    for first in range(52):
+        for second in range(first):
+            class_combos[class_index_from_indices(first, second)].append(
+                (first, second)
+            )
+
+    wins = [[0.0] * CLASS_COUNT for _ in range(CLASS_COUNT)]
+    weights = [[0.0] * CLASS_COUNT for _ in range(CLASS_COUNT)]
+    deck = list(range(52))
+    for _ in range(samples):
+        board = sampler.sample(deck, 5)
+        dead = set(board)
+        live_counts = [0] * CLASS_COUNT
+        row_combo = [None] * CLASS_COUNT
+        col_combo = [None] * CLASS_COUNT
+        for class_index, combos in enumerate(class_combos):
+            live = [
+                combo for combo in combos if combo[0] not in dead and combo[1] not in dead
+            ]
+            live_counts[class_index] = len(live)
+            if live:
+                row_combo[class_index] = sampler.choice(live)
+                col_combo[class_index] = sampler.choice(live)
+
+        col_values = [0] * CLASS_COUNT
+        col_by_card: List[List[int]] = [[] for _ in range(52)]
+        for class_index, combo in enumerate(col_combo):
+            if combo is None:
+                col_values[class_index] = -1
+                continue
+            col_values[class_index] = evaluate_indices(board + list(combo))
+            col_by_card[combo[0]].append(class_index)
+            col_by_card[combo[1]].append(class_index)
+
+        for class_index, combo in enumerate(row_combo):
+            if combo is None:
+                continue
+            value = evaluate_indices(board + list(combo))
+            live = live_counts[class_index]
+            row_weight = [live * count for count in live_counts]
+            for blocked in col_by_card[combo[0]] + col_by_card[combo[1]]:
+                row_weight[blocked] = 0
+            outcome = [
+                1.0 if value > other else 0.5 if value == other else 0.0
+                for other in col_values
+            ]
+            wins[class_index] = list(
+                map(add, wins[class_index], map(mul, outcome, row_weight))
+            )
+            weights[class_index] = list(map(add, weights[class_index], row_weight))
+
+    table = [[0.5] * CLASS_COUNT for _ in range(CLASS_COUNT)]
+    for row in range(CLASS_COUNT):
+        for col in range(row + 1, CLASS_COUNT):
+            forward_weight = weights[row][col]
+            backward_weight = weights[col][row]
+            total = forward_weight + backward_weight
+            if total == 0:
+                continue
+            equity = (
+                wins[row][col] + backward_weight - wins[col][row]
+            ) / total
+            table[row][col] = equity
+            table[col][row] = 1.0 - equity
+    return table
+
+
+def register_tables(
+    registry: TableRegistry, samples: int = DEFAULT_EQUITY_SAMPLES
+) -> List[str]:
+    name = f"preflop_equity_{samples}"
+    registry.register(
+        name,
+        "f",
+        lambda: (
+            value
+            for row in build_preflop_equity_table(samples, rng=random.Random(samples))
+            for value in row
+        ),
+        version=EQUITY_TABLE_VERSION,
+    )
+    return [name]
+
+
+def load_preflop_equity_table(
+    samples: int = DEFAULT_EQUITY_SAMPLES,
+    cache_dir: Optional[str] = None,
+) -> List[Sequence[float]]:
+    # Rows are zero-copy views of the shared, memory-mapped table, so every
+    # worker process solving charts reads the same pages.
+    registry = get_registry(cache_dir)
+    (name,) = register_tables(registry, samples)
+    return registry.get(name).rows(CLASS_COUNT)
+
+
+class PushFoldChart:
+    def __init__(
+        self,
+        stacks: Sequence[float],
+        push: List[List[float]],
+        call: List[List[float]],
+    ) -> None:
+        if not stacks:
+            raise ValueError("A push/fold chart needs at least one stack depth.")
+        self.stacks = list(stacks)
+        self.push = push
+        self.call = call
+        if self.stacks != sorted(self.stacks):
+            raise ValueError("Push/fold chart stacks must be sorted.")
+        self.max_stack = self.stacks[-1]
+        steps = {
+            round(high - low, 9) for low, high in zip(self.stacks, self.stacks[1:])
+        }
+        self._step = steps.pop() if len(steps) == 1 else None
+
+    def _depth_index(self, stack_bb: float) -> int:
+        # Nearest solved depth; charts on a uniform grid resolve arithmetically.
+        if self._step:
+            index = int(round((stack_bb - self.stacks[0]) / self._step))
+            return min(max(index, 0), len(self.stacks) - 1)
+        position = bisect_left(self.stacks, stack_bb)
+        if position == 0:
+            return 0
+        if position == len(self.stacks):
+            return position - 1
+        below, above = self.stacks[position - 1], self.stacks[position]
+        return position if above - stack_bb < stack_bb - below else position - 1
+
+    def push_frequency(self, class_index: int, stack_bb: float) -> float:
+        return self.push[self._depth_index(stack_bb)][class_index]
+
+    def call_frequency(self, class_index: int, stack_bb: float) -> float:
+        return self.call[self._depth_index(stack_bb)][class_index]
+
+    def should_push(self, class_index: int, stack_bb: float) -> bool:
+        return self.push_frequency(class_index, stack_bb) >= 0.5
+
+    def should_call(self, class_index: int, stack_bb: float) -> bool:
+        return self.call_frequency(class_index, stack_bb) >= 0.5
+
+    def to_dict(self) -> Dict[str, object]:
+        return {"stacks": self.stacks, "push": self.push, "call": self.call}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> "PushFoldChart":
+        return cls(data["stacks"], data["push"], data["call"])  # type: ignore[arg-type]
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(self.to_dict(), handle)
+
+    @classmethod
+    def load(cls, path: str) -> "PushFoldChart":
+        with open(path, "r", encoding="utf-8") as handle:
+            return cls.from_dict(json.load(handle))
+
+
+def solve_push_fold(
+    stack_bb: float,
+    equity: Sequence[Sequence[float]],
+    iterations: int = 2000,
+    small_blind_bb: float = 0.5,
+) -> Tuple[List[float], List[float]]:
+    counts = combo_pair_counts()
+    weighted_equity = [
+        list(map(mul, counts[row], equity[row])) for row in range(CLASS_COUNT)
+    ]
+    weighted_equity_cols = [list(column) for column in zip(*weighted_equity)]
+    row_totals = [sum(row) for row in counts]
+
+    push = [1] * CLASS_COUNT
+    call = [0] * CLASS_COUNT
+    # Dot products of the current pure responses with every row/column,
+    # maintained incrementally because few classes flip per iteration.
+    push_counts = [sum(column) for column in zip(*counts)]
+    push_equity = [sum(column) for column in zip(*weighted_equity)]
+    call_counts = [0.0] * CLASS_COUNT
+    call_equity = [0.0] * CLASS_COUNT
+    cum_call_counts = [0.0] * CLASS_COUNT
+    cum_call_equity = [0.0] * CLASS_COUNT
+    cum_push_counts = [0.0] * CLASS_COUNT
+    cum_push_equity = [0.0] * CLASS_COUNT
+    push_total = [0] * CLASS_COUNT
+    call_total = [0] * CLASS_COUNT
+
+    two_stack = 2.0 * stack_bb
+    pushed_lose = stack_bb + 1.0
+    fold_loss = small_blind_bb
+    for step in range(1, iterations + 1):
+        cum_push_counts = list(map(add, cum_push_counts, push_counts))
+        cum_push_equity = list(map(add, cum_push_equity, push_equity))
+        cum_call_counts = list(map(add, cum_call_counts, call_counts))
+        cum_call_equity = list(map(add, cum_call_equity, call_equity))
+
+        # Small blind best response to the big blind's average calling range:
+        # push EV (times frequency weight) versus losing the small blind.
+        for cls in range(CLASS_COUNT):
+            push_ev = (
+                two_stack * cum_call_equity[cls]
+                - pushed_lose * cum_call_counts[cls]
+                + row_totals[cls] * step
+            )
+            wants_push = 1 if push_ev > -fold_loss * row_totals[cls] * step else 0
+            if wants_push != push[cls]:
+                if wants_push:
+                    push_counts = list(map(add, push_counts, counts[cls]))
+                    push_equity = list(map(add, push_equity, weighted_equity[cls]))
+                else:
+                    push_counts = list(map(sub, push_counts, counts[cls]))
+                    push_equity = list(map(sub, push_equity, weighted_equity[cls]))
+                push[cls] = wants_push
+
+        # Big blind best response to the small blind's average pushing range.
+        for cls in range(CLASS_COUNT):
+            call_ev = pushed_lose * cum_push_counts[cls] - two_stack * cum_push_equity[cls]
+            wants_call = 1 if call_ev > 0 else 0
+            if wants_call != call[cls]:
+                if wants_call:
+                    call_counts = list(map(add, call_counts, counts[cls]))
+                    call_equity = list(map(add, call_equity, weighted_equity_cols[cls]))
+                else:
+                    call_counts = list(map(sub, call_counts, counts[cls]))
+                    call_equity = list(map(sub, call_equity, weighted_equity_cols[cls]))
+                call[cls] = wants_call
+
+        push_total = list(map(add, push_total, push))
+        call_total = list(map(add, call_total, call))
+
+    return (
+        [total / iterations for total in push_total],
+        [total / iterations for total in call_total],
+    )
+
+
+def solve_push_fold_chart(
+    stacks: Iterable[float] = DEFAULT_STACKS,
+    equity: Optional[Sequence[Sequence[float]]] = None,
+    iterations: int = 2000,
+) -> PushFoldChart:
+    table = equity if equity is not None else load_preflop_equity_table()
+    depths = sorted(stacks)
+    push_rows: List[List[float]] = []
+    call_rows: List[List[float]] = []
+    for depth in depths:
+        push, call = solve_push_fold(depth, table, iterations=iterations)
+        push_rows.append(push)
+        call_rows.append(call)
+    return PushFoldChart(depths, push_rows, call_rows)
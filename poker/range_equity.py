@@ -0,0 +1,233 @@
+"""Range-vs-range equity matrices for Texas Hold'em."""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from itertools import combinations
+from math import comb
+from operator import add, mul
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+from .cards import CARD_INDEX, FULL_DECK, Card
+from .hand_evaluator import evaluate_indices
+
+Combo = Tuple[Card, Card]
+RangeSpec = Union[None, Iterable[Combo], Mapping[Combo, float]]
+
+# Sentinel value for combos blocked by a runout: it never beats or ties a real
+# hand value, so blocked columns contribute nothing to a hero row.
+_BLOCKED = 1 << 30
+
+
+@dataclass
+class RangeEquityResult:
+    board: List[Card]
+    hero_combos: List[Combo]
+    villain_combos: List[Combo]
+    matrix: Union[List[List[Optional[float]]], Dict[Tuple[Combo, Combo], float]]
+    hero_combo_equity: Dict[Combo, float]
+    villain_combo_equity: Dict[Combo, float]
+    hero_equity: float
+    runouts: int
+    exact: bool
+
+    @property
+    def villain_equity(self) -> float:
+        return 1.0 - self.hero_equity
+
+
+def all_combos() -> List[Combo]:
+    return [
+        (FULL_DECK[high], FULL_DECK[low])
+        for high in range(51, -1, -1)
+        for low in range(high - 1, -1, -1)
+    ]
+
+
+def canonical_combo(combo: Sequence[Card]) -> Combo:
+    if len(combo) != 2:
+        raise ValueError("A combo must contain exactly two cards.")
+    first, second = combo
+    if first == second:
+        raise ValueError(f"Duplicate card in combo: {first}")
+    if CARD_INDEX[first] < CARD_INDEX[second]:
+        return (second, first)
+    return (first, second)
+
+
+def range_equity_matrix(
+    board: List[Card],
+    hero_range: RangeSpec = None,
+    villain_range: RangeSpec = None,
+    dense: bool = True,
+    max_runouts: int = 50,
+    rng: Optional[random.Random] = None,
+) -> RangeEquityResult:
+    if len(board) not in (0, 3, 4, 5):
+        raise ValueError("Board must have 0, 3, 4 or 5 cards.")
+    board_idx = [CARD_INDEX[card] for card in board]
+    dead = set(board_idx)
+    if len(dead) != len(board_idx):
+        raise ValueError("Board contains duplicate cards.")
+
+    hero_pairs, hero_weights = _normalize_range(hero_range, dead)
+    villain_pairs, villain_weights = _normalize_range(villain_range, dead)
+    if not hero_pairs or not villain_pairs:
+        raise ValueError("Both ranges need a combo not blocked by the board.")
+
+    deck = [index for index in range(52) if index not in dead]
+    missing = 5 - len(board_idx)
+    total_runouts = comb(len(deck), missing)
+    exact = total_runouts <= max_runouts
+    if exact:
+        runouts: Iterable[Tuple[int, ...]] = combinations(deck, missing)
+        runout_count = total_runouts
+    else:
+        sampler = rng or random
+        runouts = [tuple(sampler.sample(deck, missing)) for _ in range(max_runouts)]
+        runout_count = max_runouts
+
+    villain_count = len(villain_pairs)
+    villain_cols_by_card: List[List[int]] = [[] for _ in range(52)]
+    for col, (high, low) in enumerate(villain_pairs):
+        villain_cols_by_card[high].append(col)
+        villain_cols_by_card[low].append(col)
+
+    # Hand values are computed once per distinct combo and runout, shared by
+    # both ranges; the matrix is then filled purely by value comparison.
+    union_pairs = list(dict.fromkeys(hero_pairs + villain_pairs))
+    acc: List[List[float]] = [[0.0] * villain_count for _ in hero_pairs]
+    counts: Optional[List[List[int]]] = (
+        None if exact else [[0] * villain_count for _ in hero_pairs]
+    )
+
+    for runout in runouts:
+        blocked = set(runout)
+        full_board = board_idx + list(runout)
+        values = {
+            pair: evaluate_indices(full_board + [pair[0], pair[1]])
+            for pair in union_pairs
+            if pair[0] not in blocked and pair[1] not in blocked
+        }
+        villain_values = [values.get(pair, _BLOCKED) for pair in villain_pairs]
+        valid = None
+        if counts is not None:
+            valid = [0 if value == _BLOCKED else 1 for value in villain_values]
+        for row, pair in enumerate(hero_pairs):
+            hero_value = values.get(pair)
+            if hero_value is None:
+                continue
+            scores = [
+                1.0 if hero_value > value else 0.5 if hero_value == value else 0.0
+                for value in villain_values
+            ]
+            if runout_count == 1:
+                acc[row] = scores
+            else:
+                acc[row] = list(map(add, acc[row], scores))
+            if counts is not None:
+                counts[row] = list(map(add, counts[row], valid))
+
+    per_pair_runouts = comb(len(deck) - 4, missing)
+    hero_combos = [_to_combo(pair) for pair in hero_pairs]
+    villain_combos = [_to_combo(pair) for pair in villain_pairs]
+    villain_num = [0.0] * villain_count
+    villain_den = [0.0] * villain_count
+    hero_combo_equity: Dict[Combo, float] = {}
+    weighted_num = 0.0
+    weighted_den = 0.0
+    dense_rows: List[List[Optional[float]]] = []
+    sparse: Dict[Tuple[Combo, Combo], float] = {}
+
+    for row, pair in enumerate(hero_pairs):
+        if counts is None:
+            if per_pair_runouts == 1:
+                equities: List[Optional[float]] = list(acc[row])
+            else:
+                equities = [total / per_pair_runouts for total in acc[row]]
+        else:
+            equities = [
+                total / seen if seen else None
+                for total, seen in zip(acc[row], counts[row])
+            ]
+        for col in villain_cols_by_card[pair[0]] + villain_cols_by_card[pair[1]]:
+            equities[col] = None
+
+        masked = [0.0 if value is None else value for value in equities]
+        present = [0.0 if value is None else 1.0 for value in equities]
+        row_den = sum(map(mul, present, villain_weights))
+        row_num = sum(map(mul, masked, villain_weights))
+        if row_den > 0:
+            hero_combo_equity[hero_combos[row]] = row_num / row_den
+
+        hero_weight = hero_weights[row]
+        weighted_num += hero_weight * row_num
+        weighted_den += hero_weight * row_den
+        villain_num = list(
+            map(
+                add,
+                villain_num,
+                [hero_weight * (flag - value) for flag, value in zip(present, masked)],
+            )
+        )
+        villain_den = list(
+            map(add, villain_den, [hero_weight * flag for flag in present])
+        )
+
+        if dense:
+            dense_rows.append(equities)
+        else:
+            hero_combo = hero_combos[row]
+            for col, value in enumerate(equities):
+                if value is not None and villain_weights[col] > 0:
+                    sparse[(hero_combo, villain_combos[col])] = value
+
+    villain_combo_equity = {
+        villain_combos[col]: villain_num[col] / villain_den[col]
+        for col in range(villain_count)
+        if villain_den[col] > 0
+    }
+    hero_equity = weighted_num / weighted_den if weighted_den > 0 else 0.0
+
+    return RangeEquityResult(
+        board=list(board),
+        hero_combos=hero_combos,
+        villain_combos=villain_combos,
+        matrix=dense_rows if dense else sparse,
+        hero_combo_equity=hero_combo_equity,
+        villain_combo_equity=villain_combo_equity,
+        hero_equity=hero_equity,
+        runouts=runout_count,
+        exact=exact,
+    )
+
+
+def _normalize_range(
+    spec: RangeSpec, dead: set
+) -> Tuple[List[Tuple[int, int]], List[float]]:
+    if spec is None:
+        weighted: Dict[Combo, float] = {combo: 1.0 for combo in all_combos()}
+    elif isinstance(spec, Mapping):
+        weighted = {}
+        for combo, weight in spec.items():
+            if weight < 0:
+                raise ValueError("Range weights cannot be negative.")
+            weighted[canonical_combo(combo)] = float(weight)
+    else:
+        weighted = {canonical_combo(combo): 1.0 for combo in spec}
+
+    pairs: List[Tuple[int, int]] = []
+    weights: List[float] = []
+    for (high, low), weight in weighted.items():
+        high_idx = CARD_INDEX[high]
+        low_idx = CARD_INDEX[low]
+        if weight <= 0 or high_idx in dead or low_idx in dead:
+            continue
+        pairs.append((high_idx, low_idx))
+        weights.append(weight)
+    return pairs, weights
+
+
+def _to_combo(pair: Tuple[int, int]) -> Combo:
+    return (FULL_DECK[pair[0]], FULL_DECK[pair[1]])
@@ -0,0 +1,191 @@
+"""Precomputed lookup tables shared between processes.
+
+A ``TableRegistry`` maps table names to builder functions. The first call to
+``get`` builds the table and writes it to ``<directory>/<name>.v<version>.tbl``;
+every later call, in this process or any other, memory-maps that file
+read-only and returns a typed ``memoryview`` over it. Bumping a table's
+version changes its file name, so installs of different versions sharing a
+cache directory never rebuild over each other. The mapping is backed by the OS
+page cache, so any number of worker processes attached to the same table
+share one copy of its pages and nothing is unpickled or copied.
+
+File layout (little-endian)::
+
+    magic "PKTB" | format version u16 | typecode u8 | pad u8
+    table version u32 | item count u64 | pad to 64 bytes | items
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from array import array
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+TABLE_MAGIC = b"PKTB"
+TABLE_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sHcxIQ")
+_DATA_OFFSET = 64
+
+Builder = Callable[[], Iterable]
+
+
+def default_cache_dir() -> str:
+    override = os.environ.get("POKER_CACHE_DIR")
+    if override:
+        return override
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "poker-game")
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    name: str
+    typecode: str
+    builder: Builder
+    version: int = 1
+
+
+class SharedTable:
+    def __init__(self, spec: TableSpec, path: str) -> None:
+        self.spec = spec
+        self.path = path
+        with open(path, "rb") as handle:
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, fmt, typecode, version, count = _HEADER.unpack_from(self._mmap, 0)
+        if (
+            magic != TABLE_MAGIC
+            or fmt != TABLE_FORMAT_VERSION
+            or typecode.decode("ascii") != spec.typecode
+            or version != spec.version
+        ):
+            self._mmap.close()
+            raise ValueError(f"Stale or foreign table file: {path}")
+        itemsize = array(spec.typecode).itemsize
+        end = _DATA_OFFSET + count * itemsize
+        if len(self._mmap) < end:
+            self._mmap.close()
+            raise ValueError(f"Truncated table file: {path}")
+        self.values = memoryview(self._mmap)[_DATA_OFFSET:end].cast(spec.typecode)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, index):
+        return self.values[index]
+
+    def rows(self, width: int) -> List[memoryview]:
+        # Zero-copy row views for tables stored row-major.
+        return [
+            self.values[start : start + width]
+            for start in range(0, len(self.values), width)
+        ]
+
+    def close(self) -> None:
+        self.values.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Row views handed out are still alive; the mapping is released
+            # together with the last of them.
+            pass
+
+
+class TableRegistry:
+    def __init__(self, directory: Optional[str] = None) -> None:
+        self.directory = directory or default_cache_dir()
+        self._specs: Dict[str, TableSpec] = {}
+        self._attached: Dict[str, SharedTable] = {}
+
+    def register(
+        self, name: str, typecode: str, builder: Builder, version: int = 1
+    ) -> TableSpec:
+        existing = self._specs.get(name)
+        if existing is None:
+            spec = TableSpec(name, typecode, builder, version)
+            self._specs[name] = spec
+            return spec
+        if (existing.typecode, existing.version) != (typecode, version):
+            raise ValueError(f"Table {name} is already registered differently.")
+        return existing
+
+    def names(self) -> List[str]:
+        return sorted(self._specs)
+
+    def path_for(self, name: str) -> str:
+        version = self._specs[name].version
+        return os.path.join(self.directory, f"{name}.v{version}.tbl")
+
+    def is_built(self, name: str) -> bool:
+        spec = self._specs[name]
+        try:
+            with open(self.path_for(name), "rb") as handle:
+                header = handle.read(_HEADER.size)
+        except OSError:
+            return False
+        if len(header) != _HEADER.size:
+            return False
+        magic, fmt, typecode, version, _ = _HEADER.unpack(header)
+        return (
+            magic == TABLE_MAGIC
+            and fmt == TABLE_FORMAT_VERSION
+            and typecode.decode("ascii") == spec.typecode
+            and version == spec.version
+        )
+
+    def build(self, name: str, force: bool = False) -> str:
+        spec = self._specs[name]
+        path = self.path_for(name)
+        if not force and self.is_built(name):
+            return path
+        values = array(spec.typecode, spec.builder())
+        os.makedirs(self.directory, exist_ok=True)
+        # Concurrent builders each write a private file; the rename is atomic
+        # and every attached reader keeps the mapping it already has.
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as handle:
+            header = _HEADER.pack(
+                TABLE_MAGIC,
+                TABLE_FORMAT_VERSION,
+                spec.typecode.encode("ascii"),
+                spec.version,
+                len(values),
+            )
+            handle.write(header.ljust(_DATA_OFFSET, b"\0"))
+            values.tofile(handle)
+        os.replace(temp_path, path)
+        return path
+
+    def build_all(self, force: bool = False) -> List[str]:
+        return [self.build(name, force=force) for name in self.names()]
+
+    def get(self, name: str) -> SharedTable:
+        table = self._attached.get(name)
+        if table is None:
+            path = self.build(name)
+            table = SharedTable(self._specs[name], path)
+            self._attached[name] = table
+        return table
+
+    def close(self) -> None:
+        for table in self._attached.values():
+            table.close()
+        self._attached.clear()
+
+
+_REGISTRIES: Dict[str, TableRegistry] = {}
+
+
+def get_registry(directory: Optional[str] = None) -> TableRegistry:
+    # One registry per directory and process, so every caller shares the
+    # same attached mappings.
+    key = os.path.abspath(directory or default_cache_dir())
+    registry = _REGISTRIES.get(key)
+    if registry is None:
+        registry = TableRegistry(key)
+        _REGISTRIES[key] = registry
+    return registry
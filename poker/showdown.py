@@ -0,0 +1,129 @@
+"""Single-pass showdown and side-pot resolution.
+
+Players still in the hand are sorted once by hand value. Pots are the
+contribution levels of those players, swept from the lowest: each level's
+eligible players are the ones who put in at least that much, so the set only
+shrinks as the sweep goes up and the best eligible player can be found by
+moving a single cursor down the value order. Ties are the run of equal values
+at the cursor. Chips that do not split evenly go to the first winner in seat
+order.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Sequence
+
+from .hand_evaluator import HAND_RANK_NAMES, hand_category
+
+
+@dataclass
+class PotAward:
+    amount: int
+    # Both in seat order.
+    eligible: List[str]
+    winners: List[str]
+    shares: Dict[str, int]
+    value: int
+
+    @property
+    def hand_rank(self) -> str:
+        return HAND_RANK_NAMES[hand_category(self.value)]
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "amount": self.amount,
+            "eligible": list(self.eligible),
+            "winners": list(self.winners),
+            "shares": dict(self.shares),
+            "hand_rank": self.hand_rank,
+        }
+
+
+@dataclass
+class ShowdownResult:
+    values: Dict[str, int]
+    pots: List[PotAward] = field(default_factory=list)
+    payouts: Dict[str, int] = field(default_factory=dict)
+    # First seat-order winner of the last pot awarded.
+    winner: Optional[str] = None
+
+    def side_pots(self) -> List[Dict[str, object]]:
+        # The ``GameState.side_pots`` representation.
+        return [
+            {"amount": pot.amount, "eligible": set(pot.eligible)} for pot in self.pots
+        ]
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "pots": [pot.to_dict() for pot in self.pots],
+            "payouts": dict(self.payouts),
+            "winner": self.winner,
+        }
+
+
+def resolve_pots(
+    players: Sequence[str],
+    values: Mapping[str, int],
+    contributions: Mapping[str, int],
+    dead_money: int = 0,
+) -> ShowdownResult:
+    """Split the pots between ``players`` (still in the hand, seat order)."""
+    # ``dead_money`` (chips from folded players) goes to the first pot, as
+    # ``GameState.compute_side_pots`` callers have always done.
+    result = ShowdownResult(values={player: values[player] for player in players})
+    contenders = [player for player in players if contributions.get(player, 0) > 0]
+    if not contenders:
+        if players:
+            best = max(result.values.values())
+            winners = [player for player in players if result.values[player] == best]
+            result.winner = winners[0]
+            if dead_money:
+                _award(result, dead_money, list(players), winners, best)
+        return result
+
+    by_contribution = sorted(contenders, key=lambda player: contributions[player])
+    # Stable sort: tied players stay in seat order.
+    by_value = sorted(contenders, key=lambda player: -result.values[player])
+    cursor = 0
+    previous_level = 0
+    start = 0
+    while start < len(by_contribution):
+        level = contributions[by_contribution[start]]
+        eligible_count = len(by_contribution) - start
+        amount = (level - previous_level) * eligible_count
+        if not result.pots:
+            amount += dead_money
+        while contributions[by_value[cursor]] < level:
+            cursor += 1
+        best = result.values[by_value[cursor]]
+        winners = []
+        position = cursor
+        while position < len(by_value) and result.values[by_value[position]] == best:
+            if contributions[by_value[position]] >= level:
+                winners.append(by_value[position])
+            position += 1
+        eligible = [player for player in contenders if contributions[player] >= level]
+        _award(result, amount, eligible, winners, best)
+        previous_level = level
+        while start < len(by_contribution) and (
+            contributions[by_contribution[start]] == level
+        ):
+            start += 1
+    return result
+
+
+def _award(
+    result: ShowdownResult,
+    amount: int,
+    eligible: List[str],
+    winners: List[str],
+    value: int,
+) -> None:
+    share, remainder = divmod(amount, len(winners))
+    shares = {player: share for player in winners}
+    shares[winners[0]] += remainder
+    for player, won in shares.items():
+        result.payouts[player] = result.payouts.get(player, 0) + won
+    result.pots.append(PotAward(amount, eligible, winners, shares, value))
+    result.winner = winners[0]
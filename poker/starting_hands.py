@@ -0,0 +1,104 @@
+"""The 169 Texas Hold'em starting-hand classes."""
+
+from __future__ import annotations
+
+from typing import List, Sequence, Tuple
+
+from .cards import CARD_INDEX, FULL_DECK, RANKS, Card
+
+CLASS_COUNT = 169
+
+# Class names use the conventional single-character ten ("T") so that names
+# such as "ATs" or "T9o" stay two ranks long.
+_RANK_CHARS = tuple("T" if rank == "10" else rank for rank in RANKS)
+_RANK_BY_CHAR = {char: rank for rank, char in zip(RANKS, _RANK_CHARS)}
+
+
+def _grid_index(high: int, low: int, suited: bool) -> int:
+    # 13x13 grid with ranks descending: pairs on the diagonal, suited hands
+    # above it and offsuit hands below it.
+    row, col = 12 - high, 12 - low
+    if suited:
+        return row * 13 + col
+    return col * 13 + row
+
+
+def _class_name(index: int) -> str:
+    row, col = divmod(index, 13)
+    if row == col:
+        return _RANK_CHARS[12 - row] * 2
+    if row < col:
+        return f"{_RANK_CHARS[12 - row]}{_RANK_CHARS[12 - col]}s"
+    return f"{_RANK_CHARS[12 - col]}{_RANK_CHARS[12 - row]}o"
+
+
+HAND_CLASSES: Tuple[str, ...] = tuple(_class_name(index) for index in range(CLASS_COUNT))
+HAND_CLASS_INDEX = {name: index for index, name in enumerate(HAND_CLASSES)}
+
+
+def _build_class_by_pair() -> List[int]:
+    # Class index for every ordered pair of card indices (52 * 52 entries).
+    table = [-1] * (52 * 52)
+    for first in range(52):
+        for second in range(52):
+            if first == second:
+                continue
+            high = max(first >> 2, second >> 2)
+            low = min(first >> 2, second >> 2)
+            suited = (first & 3) == (second & 3)
+            table[first * 52 + second] = _grid_index(high, low, suited)
+    return table
+
+
+_CLASS_BY_PAIR = _build_class_by_pair()
+
+
+def class_index_from_indices(first: int, second: int) -> int:
+    return _CLASS_BY_PAIR[first * 52 + second]
+
+
+def hand_class_index(cards: Sequence[Card]) -> int:
+    return _CLASS_BY_PAIR[CARD_INDEX[cards[0]] * 52 + CARD_INDEX[cards[1]]]
+
+
+def hand_class_name(cards: Sequence[Card]) -> str:
+    return HAND_CLASSES[hand_class_index(cards)]
+
+
+def parse_hand_class(name: str) -> int:
+    normalized = name.strip().replace("10", "T")
+    if normalized not in HAND_CLASS_INDEX:
+        raise ValueError(f"Unknown starting hand class: {name}")
+    return HAND_CLASS_INDEX[normalized]
+
+
+def is_pair(index: int) -> bool:
+    row, col = divmod(index, 13)
+    return row == col
+
+
+def is_suited(index: int) -> bool:
+    row, col = divmod(index, 13)
+    return row < col
+
+
+def class_ranks(index: int) -> Tuple[str, str]:
+    name = HAND_CLASSES[index]
+    return _RANK_BY_CHAR[name[0]], _RANK_BY_CHAR[name[1]]
+
+
+def combo_count(index: int) -> int:
+    if is_pair(index):
+        return 6
+    if is_suited(index):
+        return 4
+    return 12
+
+
+def class_combos(index: int) -> List[Tuple[Card, Card]]:
+    return [
+        (FULL_DECK[first], FULL_DECK[second])
+        for first in range(51, -1, -1)
+        for second in range(first - 1, -1, -1)
+        if _CLASS_BY_PAIR[first * 52 + second] == index
+    ]
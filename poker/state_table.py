@@ -0,0 +1,176 @@
+"""Card-by-card state machine for 7-card Hold'em evaluation.
+
+In the style of the "two-plus-two" evaluator, every set of up to six cards is
+a state and the table holds, for each state and each of the 52 cards, the
+offset of the state reached by adding that card. Transitions out of six-card
+states hold the final hand value instead, so a 7-card hand is evaluated with
+seven array reads::
+
+    value = table[table[table[... table[0 + c1] ... + c6] + c7]
+
+Values are exactly those of ``evaluate_indices`` (and so order-compatible
+with ``evaluate_hand`` tuples). Cards can be fed in any order.
+
+States only remember the rank counts plus, for each suit that can still make
+a flush, the ranks seen in it; suits that can no longer reach five cards are
+forgotten, which keeps the machine to about 600k states (a ~120 MB table).
+Generating it takes a few minutes; it is written once to the shared table
+cache and memory-mapped afterwards.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import Dict, List, Optional, Sequence
+
+from .hand_evaluator import evaluate_holding, evaluate_rank_key
+from .shared_tables import TableRegistry, get_registry
+
+try:  # NumPy is optional and only used by ``evaluate_batch``.
+    import numpy
+except ImportError:
+    numpy = None
+
+STATE_TABLE_VERSION = 1
+STATE_TABLE_NAME = "hand_states_7"
+_CARDS = 52
+_HAND_SIZE = 7
+_MASK_BITS = 13
+_MASK_SHIFT = 32
+_RANK_MASK = (1 << _MASK_BITS) - 1
+
+_POWERS = tuple(5 ** (index >> 2) for index in range(_CARDS))
+_BITS = tuple(1 << (index >> 2) for index in range(_CARDS))
+_POPCOUNT = tuple(bin(mask).count("1") for mask in range(1 << _MASK_BITS))
+
+
+def build_state_table() -> array:
+    # State keys pack the base-5 rank key in the low bits and one 13-bit rank
+    # mask per suit above it. Card-count levels are walked breadth first, so
+    # each level's rows are written in the order its states were discovered.
+    table = array("I")
+    level: Dict[int, int] = {0: 0}
+    next_id = 1
+    for depth in range(_HAND_SIZE - 1):
+        remaining = _HAND_SIZE - depth - 1
+        following: Dict[int, int] = {}
+        for key in level:
+            row = _transitions(key, depth, remaining)
+            for new_key in row:
+                if new_key is None:
+                    table.append(0)
+                    continue
+                state = following.get(new_key)
+                if state is None:
+                    state = next_id
+                    following[new_key] = state
+                    next_id += 1
+                table.append(state * _CARDS)
+        level = following
+
+    for key in level:
+        table.extend(_final_values(key))
+    return table
+
+
+def _transitions(key: int, depth: int, remaining: int) -> List[Optional[int]]:
+    rank_key = key & ((1 << _MASK_SHIFT) - 1)
+    masks = [
+        (key >> (_MASK_SHIFT + _MASK_BITS * suit)) & _RANK_MASK for suit in range(4)
+    ]
+    row: List[Optional[int]] = []
+    for card in range(_CARDS):
+        power = _POWERS[card]
+        bit = _BITS[card]
+        suit = card & 3
+        if (rank_key // power) % 5 == 4 or masks[suit] & bit:
+            row.append(None)
+            continue
+        new_key = rank_key + power
+        for other in range(4):
+            mask = masks[other]
+            # A suit with no cards yet is still live while five can arrive.
+            if other == suit and (mask or depth + 5 <= _HAND_SIZE):
+                mask |= bit
+            if _POPCOUNT[mask] + remaining >= 5:
+                new_key |= mask << (_MASK_SHIFT + _MASK_BITS * other)
+        row.append(new_key)
+    return row
+
+
+def _final_values(key: int) -> List[int]:
+    rank_key = key & ((1 << _MASK_SHIFT) - 1)
+    masks = [
+        (key >> (_MASK_SHIFT + _MASK_BITS * suit)) & _RANK_MASK for suit in range(4)
+    ]
+    values = []
+    for card in range(_CARDS):
+        power = _POWERS[card]
+        bit = _BITS[card]
+        suit = card & 3
+        if (rank_key // power) % 5 == 4 or masks[suit] & bit:
+            values.append(0)
+            continue
+        flush_mask = 0
+        for other in range(4):
+            mask = masks[other] | bit if other == suit else masks[other]
+            if _POPCOUNT[mask] >= 5:
+                flush_mask = mask
+        values.append(evaluate_rank_key(rank_key + power, flush_mask))
+    return values
+
+
+class StateTable:
+    def __init__(self, values: Sequence[int]) -> None:
+        self.values = values
+
+    def evaluate(self, cards: Sequence[int]) -> int:
+        table = self.values
+        offset = 0
+        for card in cards:
+            offset = table[offset + card]
+        return offset
+
+    def evaluate_holding(self, hole: Sequence[int], board: Sequence[int]) -> int:
+        # Drop-in for ``hand_evaluator.evaluate_holding``: seven-card Hold'em
+        # hands use the table, anything else the regular evaluator.
+        if len(hole) != 2 or len(board) != 5:
+            return evaluate_holding(hole, board)
+        table = self.values
+        return table[
+            table[
+                table[
+                    table[table[table[table[hole[0]] + hole[1]] + board[0]] + board[1]]
+                    + board[2]
+                ]
+                + board[3]
+            ]
+            + board[4]
+        ]
+
+    def evaluate_batch(self, hands):
+        """Values of many 7-card hands given as an ``(n, 7)`` array of indices."""
+        # With NumPy each step is one vectorised gather over all hands. Shared
+        # cards (the board) in the first columns keep the early gathers on a
+        # few table rows, roughly doubling throughput.
+        if numpy is None:
+            return [self.evaluate(hand) for hand in hands]
+        table = numpy.frombuffer(self.values, dtype=numpy.uint32)
+        cards = numpy.asarray(hands, dtype=numpy.int64)
+        offsets = numpy.zeros(len(cards), dtype=numpy.int64)
+        for column in range(_HAND_SIZE):
+            offsets = table[offsets + cards[:, column]]
+        return offsets
+
+
+def register_tables(registry: TableRegistry) -> List[str]:
+    registry.register(
+        STATE_TABLE_NAME, "I", build_state_table, version=STATE_TABLE_VERSION
+    )
+    return [STATE_TABLE_NAME]
+
+
+def load_state_table(cache_dir: Optional[str] = None) -> StateTable:
+    registry = get_registry(cache_dir)
+    register_tables(registry)
+    return StateTable(registry.get(STATE_TABLE_NAME).values)
@@ -0,0 +1,262 @@
+"""Streaming per-player and per-style statistics, mergeable across workers."""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+from .actions import ActionType
+from .hand_history import HandRecord, iter_hand_history, read_metadata
+
+Interval = Tuple[float, float]
+
+# Two-sided 95% normal quantile.
+DEFAULT_Z = 1.96
+
+
+@dataclass
+class RunningMoments:
+    """Welford running mean/variance; ``merge`` uses Chan's parallel update."""
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, other: "RunningMoments") -> None:
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+
+    @property
+    def variance(self) -> float:
+        if self.count < 2:
+            return 0.0
+        return self.m2 / (self.count - 1)
+
+    @property
+    def stderr(self) -> float:
+        if self.count == 0:
+            return 0.0
+        return math.sqrt(self.variance / self.count)
+
+    def interval(self, z: float = DEFAULT_Z) -> Interval:
+        margin = z * self.stderr
+        return self.mean - margin, self.mean + margin
+
+
+def rate_interval(successes: int, trials: int, z: float = DEFAULT_Z) -> Interval:
+    """Wilson score interval for a success rate."""
+    if trials == 0:
+        return 0.0, 1.0
+    rate = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (rate + z * z / (2 * trials)) / denominator
+    margin = (
+        z * math.sqrt(rate * (1 - rate) / trials + z * z / (4 * trials * trials))
+        / denominator
+    )
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+def _ratio(numerator: int, denominator: int) -> float:
+    return numerator / denominator if denominator else 0.0
+
+
+@dataclass
+class PlayerStats:
+    hands: int = 0
+    # Hands with a voluntary preflop call or raise (blinds do not count).
+    vpip: int = 0
+    pfr: int = 0
+    # Postflop raises (bets included) and calls, for the aggression factor.
+    aggressive: int = 0
+    passive: int = 0
+    saw_flop: int = 0
+    showdowns: int = 0
+    showdown_wins: int = 0
+    # Net result of each hand in big blinds, as dealt and all-in adjusted.
+    winnings: RunningMoments = field(default_factory=RunningMoments)
+    ev_winnings: RunningMoments = field(default_factory=RunningMoments)
+
+    @property
+    def vpip_rate(self) -> float:
+        return _ratio(self.vpip, self.hands)
+
+    @property
+    def pfr_rate(self) -> float:
+        return _ratio(self.pfr, self.hands)
+
+    @property
+    def aggression_factor(self) -> float:
+        if self.passive == 0:
+            return math.inf if self.aggressive else 0.0
+        return self.aggressive / self.passive
+
+    @property
+    def wtsd_rate(self) -> float:
+        return _ratio(self.showdowns, self.saw_flop)
+
+    @property
+    def wsd_rate(self) -> float:
+        return _ratio(self.showdown_wins, self.showdowns)
+
+    @property
+    def bb_per_100(self) -> float:
+        return self.winnings.mean * 100
+
+    def bb_per_100_interval(self, z: float = DEFAULT_Z) -> Interval:
+        low, high = self.winnings.interval(z)
+        return low * 100, high * 100
+
+    @property
+    def ev_bb_per_100(self) -> float:
+        return self.ev_winnings.mean * 100
+
+    def ev_bb_per_100_interval(self, z: float = DEFAULT_Z) -> Interval:
+        low, high = self.ev_winnings.interval(z)
+        return low * 100, high * 100
+
+    def merge(self, other: "PlayerStats") -> None:
+        self.hands += other.hands
+        self.vpip += other.vpip
+        self.pfr += other.pfr
+        self.aggressive += other.aggressive
+        self.passive += other.passive
+        self.saw_flop += other.saw_flop
+        self.showdowns += other.showdowns
+        self.showdown_wins += other.showdown_wins
+        self.winnings.merge(other.winnings)
+        self.ev_winnings.merge(other.ev_winnings)
+
+    def summary(self, z: float = DEFAULT_Z) -> Dict[str, object]:
+        return {
+            "hands": self.hands,
+            "vpip": self.vpip_rate,
+            "vpip_ci": rate_interval(self.vpip, self.hands, z),
+            "pfr": self.pfr_rate,
+            "pfr_ci": rate_interval(self.pfr, self.hands, z),
+            "af": self.aggression_factor,
+            "wtsd": self.wtsd_rate,
+            "wtsd_ci": rate_interval(self.showdowns, self.saw_flop, z),
+            "wsd": self.wsd_rate,
+            "wsd_ci": rate_interval(self.showdown_wins, self.showdowns, z),
+            "bb_per_100": self.bb_per_100,
+            "bb_per_100_ci": self.bb_per_100_interval(z),
+            "ev_bb_per_100": self.ev_bb_per_100,
+            "ev_bb_per_100_ci": self.ev_bb_per_100_interval(z),
+        }
+
+
+# Fixed counters per player and style, so memory does not grow with hands.
+class StatsAggregator:
+    def __init__(self, styles: Optional[Mapping[str, str]] = None) -> None:
+        self.style_of: Dict[str, str] = dict(styles or {})
+        self.players: Dict[str, PlayerStats] = {}
+        self.styles: Dict[str, PlayerStats] = {}
+        self.hands = 0
+
+    def attach(self, engine) -> None:
+        engine.hand_listeners.append(self.update)
+
+    def set_style(self, player_id: str, style: str) -> None:
+        self.style_of[player_id] = style
+
+    def update(self, record: HandRecord) -> None:
+        self.hands += 1
+        seat_of = {player: seat for seat, player in enumerate(record.players)}
+        vpip = [False] * len(record.players)
+        pfr = [False] * len(record.players)
+        folded_preflop = [False] * len(record.players)
+        aggressive = [0] * len(record.players)
+        passive = [0] * len(record.players)
+        for action in record.actions:
+            seat = seat_of[action.player]
+            if action.street == "preflop":
+                if action.action == ActionType.RAISE:
+                    vpip[seat] = pfr[seat] = True
+                elif action.action == ActionType.CALL and action.amount > 0:
+                    vpip[seat] = True
+                elif action.action == ActionType.FOLD:
+                    folded_preflop[seat] = True
+            elif action.action == ActionType.RAISE:
+                aggressive[seat] += 1
+            elif action.action == ActionType.CALL:
+                passive[seat] += 1
+
+        flop_dealt = len(record.board) >= 3
+        showdown = set(record.showdown)
+        # An uncalled bet comes back to its owner as a pot nobody contested;
+        # getting it back is not a showdown win.
+        ordered = sorted(record.contributions, reverse=True) + [0, 0]
+        uncalled = ordered[0] - ordered[1]
+        ev_results = record.ev_results()
+        for seat, player in enumerate(record.players):
+            went_to_showdown = player in showdown
+            net = record.payouts[seat] - record.contributions[seat]
+            ev_net = ev_results[player]
+            returned = uncalled if record.contributions[seat] == ordered[0] else 0
+            won_showdown = record.payouts[seat] > returned
+            targets = [self.players.setdefault(player, PlayerStats())]
+            style = self.style_of.get(player)
+            if style is not None:
+                targets.append(self.styles.setdefault(style, PlayerStats()))
+            for stats in targets:
+                stats.hands += 1
+                stats.vpip += vpip[seat]
+                stats.pfr += pfr[seat]
+                stats.aggressive += aggressive[seat]
+                stats.passive += passive[seat]
+                if flop_dealt and not folded_preflop[seat]:
+                    stats.saw_flop += 1
+                if went_to_showdown:
+                    stats.showdowns += 1
+                    stats.showdown_wins += won_showdown
+                stats.winnings.add(net / record.big_blind)
+                stats.ev_winnings.add(ev_net / record.big_blind)
+
+    # Engines call their hand listeners with the finished record.
+    __call__ = update
+
+    def consume(self, records: Iterable[HandRecord]) -> "StatsAggregator":
+        for record in records:
+            self.update(record)
+        return self
+
+    def merge(self, other: "StatsAggregator") -> "StatsAggregator":
+        for player, style in other.style_of.items():
+            self.style_of.setdefault(player, style)
+        for player, stats in other.players.items():
+            self.players.setdefault(player, PlayerStats()).merge(stats)
+        for style, stats in other.styles.items():
+            self.styles.setdefault(style, PlayerStats()).merge(stats)
+        self.hands += other.hands
+        return self
+
+    def summary(self, z: float = DEFAULT_Z) -> Dict[str, Dict[str, Dict[str, object]]]:
+        return {
+            "players": {
+                player: stats.summary(z) for player, stats in self.players.items()
+            },
+            "styles": {style: stats.summary(z) for style, stats in self.styles.items()},
+        }
+
+
+def aggregate_history(path: str) -> StatsAggregator:
+    with open(path, "rb") as handle:
+        metadata = read_metadata(handle)
+    styles = metadata.get("styles") or {}
+    return StatsAggregator(styles).consume(iter_hand_history(path))
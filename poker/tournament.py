@@ -0,0 +1,255 @@
+"""Multi-table tournament driver."""
+
+from __future__ import annotations
+
+import math
+import random
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+from .engine import PokerEngine
+from .players.base_player import BasePlayer
+from .players.bot_player import BotPlayer
+
+
+@dataclass(frozen=True)
+class BlindLevel:
+    small_blind: int
+    big_blind: int
+    hands: int
+
+
+# Equity trials per bot decision in ``simulate_style_finishes``. Monte Carlo
+# equity is most of the cost of a headless tournament: with six default bots
+# this plays roughly 700-1200 tournaments per minute on one core, against
+# about 250 at the interactive default of 300 trials.
+HEADLESS_EQUITY_ITERATIONS = 60
+
+DEFAULT_BLIND_SCHEDULE = (
+    BlindLevel(10, 20, 10),
+    BlindLevel(15, 30, 10),
+    BlindLevel(25, 50, 10),
+    BlindLevel(50, 100, 10),
+    BlindLevel(75, 150, 10),
+    BlindLevel(100, 200, 10),
+    BlindLevel(150, 300, 10),
+    BlindLevel(200, 400, 10),
+    BlindLevel(300, 600, 10),
+    BlindLevel(500, 1000, 10),
+)
+
+
+@dataclass
+class TournamentResult:
+    # Player ids from first place to last.
+    finish_order: List[str]
+    hands_played: int
+    payouts: Dict[str, float] = field(default_factory=dict)
+
+    def place_of(self, player_id: str) -> int:
+        return self.finish_order.index(player_id) + 1
+
+
+class Tournament:
+    def __init__(
+        self,
+        players: Sequence[BasePlayer],
+        starting_stack: int,
+        blind_schedule: Sequence[BlindLevel] = DEFAULT_BLIND_SCHEDULE,
+        table_size: int = 9,
+        payouts: Sequence[float] = (),
+        rng: Optional[random.Random] = None,
+        verbose: bool = False,
+        table_workers: int = 1,
+    ) -> None:
+        if len(players) < 2:
+            raise ValueError("A tournament needs at least two players.")
+        if table_size < 2:
+            raise ValueError("Tables need at least two seats.")
+        if not blind_schedule:
+            raise ValueError("Blind schedule cannot be empty.")
+        self.players = list(players)
+        self.player_by_id = {player.id: player for player in self.players}
+        if len(self.player_by_id) != len(self.players):
+            raise ValueError("Player ids must be unique.")
+        self.starting_stack = starting_stack
+        self.blind_schedule = list(blind_schedule)
+        self.table_size = table_size
+        self.payouts = list(payouts)
+        self.rng = rng or random.Random()
+        self.verbose = verbose
+        # Tables play their hands of a round on this many threads, which lets
+        # bots sharing an EquityService have their requests coalesced.
+        self.table_workers = table_workers
+        self.tables: List[PokerEngine] = []
+        self.level_index = 0
+        self.rounds_played = 0
+        self.hands_played = 0
+        # Filled from last place upwards as players bust.
+        self._busted: List[str] = []
+
+    @property
+    def level(self) -> BlindLevel:
+        return self.blind_schedule[self.level_index]
+
+    def remaining_players(self) -> List[str]:
+        return [player for table in self.tables for player in table.players]
+
+    def run(self, max_rounds: int = 100_000) -> TournamentResult:
+        self._seat_players()
+        pool = None
+        if self.table_workers > 1:
+            pool = ThreadPoolExecutor(self.table_workers, thread_name_prefix="table")
+        try:
+            self._run_rounds(max_rounds, pool)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        finish_order = self.remaining_players() + list(reversed(self._busted))
+        payouts = {
+            player: self.payouts[place] if place < len(self.payouts) else 0.0
+            for place, player in enumerate(finish_order)
+        }
+        return TournamentResult(finish_order, self.hands_played, payouts)
+
+    def _run_rounds(
+        self, max_rounds: int, pool: Optional[ThreadPoolExecutor]
+    ) -> None:
+        level_rounds = 0
+        while len(self.remaining_players()) > 1:
+            if self.rounds_played >= max_rounds:
+                raise RuntimeError("Tournament did not finish within max_rounds.")
+            if (
+                level_rounds >= self.level.hands
+                and self.level_index < len(self.blind_schedule) - 1
+            ):
+                self.level_index += 1
+                level_rounds = 0
+
+            round_busted: List[tuple] = []
+            active = [table for table in self.tables if len(table.players) >= 2]
+            start_stacks = []
+            for table in active:
+                table.set_blinds(self.level.small_blind, self.level.big_blind)
+                start_stacks.append(
+                    dict(table.game_state.stacks) if table.game_state else {}
+                )
+            if pool is None:
+                for table in active:
+                    self._play_hand(table)
+            else:
+                list(pool.map(self._play_hand, active))
+            self.hands_played += len(active)
+            for table, stacks in zip(active, start_stacks):
+                for player in table.last_eliminated:
+                    start_stack = stacks.get(player, self.starting_stack)
+                    round_busted.append((start_stack, player))
+
+            # Players busting in the same round finish by starting stack,
+            # shortest first (the last-place finisher is appended first).
+            for _, player in sorted(round_busted):
+                self._busted.append(player)
+            self.rounds_played += 1
+            level_rounds += 1
+            self._balance_tables()
+
+    def _seat_players(self) -> None:
+        order = list(self.players)
+        self.rng.shuffle(order)
+        table_count = math.ceil(len(order) / self.table_size)
+        seating: List[List[str]] = [[] for _ in range(table_count)]
+        for index, player in enumerate(order):
+            seating[index % table_count].append(player.id)
+        self.tables = []
+        for seats in seating:
+            engine = PokerEngine(
+                players=seats,
+                starting_stack=self.starting_stack,
+                small_blind=self.level.small_blind,
+                big_blind=self.level.big_blind,
+                verbose=self.verbose,
+            )
+            engine.dealer_index = self.rng.randrange(len(seats))
+            for player_id in seats:
+                self.player_by_id[player_id].engine = engine
+            self.tables.append(engine)
+
+    def _play_hand(self, table: PokerEngine) -> None:
+        table.start_hand()
+        state = table.game_state
+        while state is not None and state.street != "showdown":
+            player_id = state.current_player
+            if player_id is None:
+                break
+            action = self.player_by_id[player_id].decide(state)
+            table.apply_action(player_id, action)
+            state = table.game_state
+
+    def _balance_tables(self) -> None:
+        self.tables = [table for table in self.tables if table.players]
+        remaining = sum(len(table.players) for table in self.tables)
+        needed = max(1, math.ceil(remaining / self.table_size))
+
+        # Break the shortest tables while the field fits on fewer of them.
+        while len(self.tables) > needed:
+            breaking = min(self.tables, key=lambda table: len(table.players))
+            self.tables.remove(breaking)
+            while breaking.players:
+                target = min(self.tables, key=lambda table: len(table.players))
+                self._move_player(breaking, breaking.players[0], target)
+
+        # Then even out the rest so no two tables differ by more than one seat.
+        while len(self.tables) > 1:
+            largest = max(self.tables, key=lambda table: len(table.players))
+            smallest = min(self.tables, key=lambda table: len(table.players))
+            if len(largest.players) - len(smallest.players) <= 1:
+                break
+            self._move_player(largest, _next_big_blind(largest), smallest)
+
+    def _move_player(
+        self, source: PokerEngine, player_id: str, target: PokerEngine
+    ) -> None:
+        stack = source.remove_player(player_id)
+        target.add_player(player_id, stack)
+        self.player_by_id[player_id].engine = target
+
+
+def _next_big_blind(table: PokerEngine) -> str:
+    # The player due to post the big blind moves, which is the seat that loses
+    # the least by leaving before their blinds come around.
+    player_count = len(table.players)
+    offset = 1 if player_count == 2 else 2
+    return table.players[(table.dealer_index + offset) % player_count]
+
+
+def simulate_style_finishes(
+    styles: Sequence[str],
+    tournaments: int,
+    starting_stack: int = 1500,
+    blind_schedule: Sequence[BlindLevel] = DEFAULT_BLIND_SCHEDULE,
+    table_size: int = 9,
+    rng: Optional[random.Random] = None,
+    equity_iterations: int = HEADLESS_EQUITY_ITERATIONS,
+) -> Dict[str, Counter]:
+    generator = rng or random.Random()
+    finishes: Dict[str, Counter] = {style: Counter() for style in styles}
+    for _ in range(tournaments):
+        players = [
+            BotPlayer(
+                f"{style}-{seat}", style=style, equity_iterations=equity_iterations
+            )
+            for seat, style in enumerate(styles)
+        ]
+        result = Tournament(
+            players,
+            starting_stack,
+            blind_schedule=blind_schedule,
+            table_size=table_size,
+            rng=generator,
+        ).run()
+        for player in players:
+            finishes[player.style][result.place_of(player.id)] += 1
+    return finishes
@@ -0,0 +1,21 @@
+"""Game variants supported by the engine."""
+
+HOLDEM = "holdem"
+PLO = "plo"
+
+HOLE_CARD_COUNTS = {HOLDEM: 2, PLO: 4}
+VARIANTS = tuple(HOLE_CARD_COUNTS)
+
+
+def validate_variant(variant: str) -> str:
+    if variant not in HOLE_CARD_COUNTS:
+        raise ValueError(f"Unknown variant: {variant}")
+    return variant
+
+
+def variant_for_hole_count(hole_count: int) -> str:
+    return PLO if hole_count == HOLE_CARD_COUNTS[PLO] else HOLDEM
+
+
+def is_pot_limit(variant: str) -> bool:
+    return variant == PLO
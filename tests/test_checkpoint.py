@@ -0,0 +1,72 @@
+import hashlib
+import os
+import random
+import subprocess
+import sys
+
+from poker.engine import PokerEngine
+from poker.hand_history import encode_hand
+from poker.players.bot_player import BotPlayer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STYLES = ("tight", "loose", "aggro", "passive", "balanced")
+
+RESUME = """
+import sys
+from tests.test_checkpoint import finish
+from poker.engine import PokerEngine
+
+print(finish(PokerEngine.from_checkpoint(sys.stdin.buffer.read())))
+"""
+
+
+def seat_bots(engine):
+    bots = {}
+    for seat, player in enumerate(engine.players):
+        bots[player] = BotPlayer(player, STYLES[seat])
+        bots[player].engine = engine
+    return bots
+
+
+def finish(engine, hands=40):
+    # Plays out the current hand and ``hands`` more; digest of every record.
+    bots = seat_bots(engine)
+    digest = hashlib.sha256()
+    engine.hand_listeners.append(lambda record: digest.update(encode_hand(record)))
+    for _ in range(hands + 1):
+        state = engine.game_state
+        while state.street != "showdown" and state.current_player:
+            player = state.current_player
+            engine.apply_action(player, bots[player].decide(state))
+        if len(engine.players) < 2:
+            break
+        engine.start_hand()
+    return digest.hexdigest()
+
+
+def mid_hand_engine():
+    random.seed(7)
+    engine = PokerEngine([f"P{seat}" for seat in range(5)], 300, verbose=False)
+    engine.start_hand()
+    bots = seat_bots(engine)
+    for _ in range(3):
+        state = engine.game_state
+        player = state.current_player
+        engine.apply_action(player, bots[player].decide(state))
+    return engine
+
+
+def test_checkpoint_resumes_identically_in_another_process():
+    data = mid_hand_engine().checkpoint()
+    expected = finish(PokerEngine.from_checkpoint(data))
+    for hash_seed in ("1", "2"):
+        env = dict(os.environ, PYTHONHASHSEED=hash_seed, PYTHONPATH=ROOT)
+        output = subprocess.run(
+            [sys.executable, "-c", RESUME],
+            input=data,
+            capture_output=True,
+            check=True,
+            cwd=ROOT,
+            env=env,
+        )
+        assert output.stdout.decode().strip() == expected
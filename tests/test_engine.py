@@ -0,0 +1,35 @@
+import random
+
+from poker.actions import Action, ActionType
+from poker.engine import PokerEngine
+
+
+def play_shove_called_by_bigger_stack(seed):
+    random.seed(seed)
+    engine = PokerEngine(["short"], 50, verbose=False, allin_ev=True)
+    engine.add_player("big", 200)
+    records = []
+    engine.hand_listeners.append(records.append)
+    engine.start_hand()
+    state = engine.game_state
+    while state.street != "showdown" and state.current_player:
+        player = state.current_player
+        if player == "short":
+            action = Action(ActionType.RAISE, state.bets[player] + state.stacks[player])
+        elif state.to_call(player):
+            action = Action(ActionType.CALL)
+        else:
+            action = Action(ActionType.CHECK)
+        engine.apply_action(player, action)
+    return records[0]
+
+
+def test_shove_called_by_bigger_stack_records_allin_ev():
+    for seed in range(4):
+        record = play_shove_called_by_bigger_stack(seed)
+        assert record.allin_ev is not None
+        assert record.allin_ev.street == "preflop"
+        assert len(record.board) == 5
+        # The caller is not left checking alone through the later streets.
+        assert all(action.street == "preflop" for action in record.actions)
+        assert sum(record.payouts) == record.pot == 100
@@ -0,0 +1,34 @@
+from poker.hand_history import HandRecord
+from poker.stats import StatsAggregator
+
+
+def showdown_record(payouts):
+    # "big" covers "short"'s all-in; the 150 nobody called goes back to "big".
+    return HandRecord(
+        hand_number=1,
+        players=["short", "big"],
+        stacks=[50, 200],
+        dealer_index=0,
+        small_blind=5,
+        big_blind=10,
+        hole_cards=[[], []],
+        contributions=[50, 200],
+        payouts=payouts,
+        showdown=["short", "big"],
+        winner="short",
+    )
+
+
+def test_bigger_stack_losing_at_showdown_is_not_a_win():
+    stats = StatsAggregator()
+    stats.update(showdown_record([100, 150]))
+    assert stats.players["short"].showdown_wins == 1
+    assert stats.players["big"].showdown_wins == 0
+    assert stats.players["big"].showdowns == 1
+
+
+def test_bigger_stack_winning_at_showdown_is_a_win():
+    stats = StatsAggregator()
+    stats.update(showdown_record([0, 250]))
+    assert stats.players["short"].showdown_wins == 0
+    assert stats.players["big"].showdown_wins == 1